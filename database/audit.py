@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Giriş və əməliyyat jurnalının (login_logs, admin_action_logs) arxa fonda yazılması.
+
+Giriş və satış ekranı hadisəni yalnız yaddaşdakı növbəyə qoyur - MySQL-ə
+gözləmə yoxdur. Yazıcı thread növbəni AUDIT_BATCH_SIZE hadisə yığılanda və
+ya AUDIT_FLUSH_INTERVAL saniyədən bir çoxsətirli INSERT-lərlə boşaldır.
+MySQL əlçatmaz olduqda hadisələr yerli fayla (JSON sətirləri) yazılır və
+növbəti uğurlu yazmada ilk olaraq göndərilir. Paket bağlantıdan başqa
+səbəbdən rədd edilərsə hadisələr bir-bir yazılır; yenə də rədd edilən
+sətir <AUDIT_SPILL_PATH>.rejected faylına keçirilir ki, qalan jurnalı
+əbədi saxlamasın.
+
+Konfiqurasiya (.env):
+  AUDIT_BATCH_SIZE       bir paketdəki hadisə sayı (standart 100)
+  AUDIT_FLUSH_INTERVAL   ən uzun gözləmə, saniyə (standart 5)
+  AUDIT_QUEUE_SIZE       yaddaşdakı növbənin həddi (standart 10000)
+  AUDIT_SPILL_PATH       ehtiyat fayl (standart ~/.bioscript/audit_spill.jsonl)
+"""
+
+import json
+import os
+import platform
+import queue
+import threading
+import time
+from datetime import datetime
+
+import pymysql
+
+from database.connection import DatabaseConnection
+
+QUERIES = {
+    'login_logs': """
+        INSERT INTO login_logs (user_type, user_id, ip_address, user_agent, login_time)
+        VALUES (%s, %s, %s, %s, %s)
+    """,
+    'admin_action_logs': """
+        INSERT INTO admin_action_logs (user, action, details, timestamp)
+        VALUES (%s, %s, %s, %s)
+    """,
+}
+
+# Sütun uzunluqları (admin_action_logs.user/action, login_logs.ip_address)
+MAX_USER = 100
+MAX_ACTION = 255
+MAX_IP_ADDRESS = 45
+
+# Bağlantı xətaları - hadisələr sonra təkrar göndərilir
+CONNECTION_ERRORS = (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+
+USER_AGENT = f"BioScript Aptek Sistemi (desktop; {platform.system()} {platform.release()})"
+
+_STOP = object()
+
+
+def default_spill_path():
+    return os.getenv('AUDIT_SPILL_PATH',
+                     os.path.join(os.path.expanduser("~"), ".bioscript", "audit_spill.jsonl"))
+
+
+def _now():
+    # Hadisənin vaxtı növbəyə düşdüyü an - yazılma anı deyil
+    return datetime.now().isoformat(sep=' ', timespec='seconds')
+
+
+class AuditWriter:
+    """Yaddaşdakı növbə + paketlərlə yazan daemon thread"""
+
+    def __init__(self, spill_path=None, batch_size=None, flush_interval=None, max_queue=None):
+        self.spill_path = spill_path or default_spill_path()
+        self.batch_size = batch_size or int(os.getenv('AUDIT_BATCH_SIZE', '100'))
+        self.flush_interval = flush_interval or float(os.getenv('AUDIT_FLUSH_INTERVAL', '5'))
+        self._queue = queue.Queue(maxsize=max_queue or int(os.getenv('AUDIT_QUEUE_SIZE', '10000')))
+        self._spill_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self.written = 0
+        self.spilled = 0
+
+    # --- Hadisələr (UI thread-dən çağırılır, bloklamır) ---
+
+    def log_login(self, user_type, user_id, ip_address=None, user_agent=USER_AGENT):
+        if ip_address is not None:
+            ip_address = str(ip_address)[:MAX_IP_ADDRESS]
+        self._put('login_logs', (user_type, user_id, ip_address, user_agent, _now()))
+
+    def log_action(self, user, action, details=None):
+        # Uzun dəyər bütün paketi rədd etdirməsin - sütuna sığacaq qədər kəs
+        user = str(user or '')[:MAX_USER]
+        action = str(action or '')[:MAX_ACTION]
+        if details is not None and not isinstance(details, str):
+            details = json.dumps(details, ensure_ascii=False, default=str)
+        self._put('admin_action_logs', (user, action, details, _now()))
+
+    def _put(self, table, values):
+        self.start()
+        try:
+            self._queue.put_nowait((table, values))
+        except queue.Full:
+            # Növbə dolubsa (uzun müddət MySQL yoxdur) kassanı gözlətmə - fayla yaz
+            self._spill([(table, values)])
+
+    # --- Yazıcı thread ---
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Növbədə qalanları yaz və thread-i dayandır (proqramdan çıxarkən)"""
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _run(self):
+        pending = []
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                event = self._queue.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                event = None
+
+            stopping = event is _STOP
+            if event is not None and not stopping:
+                pending.append(event)
+
+            if stopping or len(pending) >= self.batch_size or time.monotonic() >= next_flush:
+                if stopping:
+                    pending.extend(self._drain())
+                self.flush(pending)
+                pending = []
+                next_flush = time.monotonic() + self.flush_interval
+            if stopping:
+                return
+
+    def _drain(self):
+        events = []
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                return events
+            if event is not _STOP:
+                events.append(event)
+
+    def flush(self, events):
+        """Ehtiyat fayldakı və verilən hadisələri bir tranzaksiyada yaz (rədd edilərsə - bir-bir)"""
+        spilled = self._take_spill()
+        if not events and not spilled:
+            return 0
+
+        db = DatabaseConnection()
+        if not db.connect():
+            self._spill(events)
+            return 0
+
+        batch = spilled + list(events)
+        by_table = {}
+        for table, values in batch:
+            by_table.setdefault(table, []).append(tuple(values))
+        try:
+            with db.transaction():
+                for table, rows in by_table.items():
+                    db.execute_many(QUERIES[table], rows, chunk_size=self.batch_size)
+            written = len(batch)
+        except CONNECTION_ERRORS as e:
+            print(f"Jurnal yazılmadı, ehtiyat fayla keçirilir: {e}")
+            # Fayldan götürülənlər təkrar faylda qalır, yenilər əlavə olunur
+            self._spill(events)
+            return 0
+        except Exception as e:
+            print(f"Jurnal paketi rədd edildi, hadisələr bir-bir yazılır: {e}")
+            written = self._write_each(db, batch)
+        finally:
+            db.disconnect()
+
+        if spilled:
+            self._clear_replay()
+        self.written += written
+        return written
+
+    def _write_each(self, db, batch):
+        """Hər hadisəni ayrıca yaz; rədd edilənləri karantinə, bağlantı kəsiləndə
+        qalanları ehtiyat fayla keçir. Yazılan hadisələrin sayını qaytarır."""
+        written = 0
+        for position, (table, values) in enumerate(batch):
+            try:
+                db.execute_many(QUERIES[table], [tuple(values)])
+            except CONNECTION_ERRORS as e:
+                print(f"Jurnal yazılmadı, ehtiyat fayla keçirilir: {e}")
+                self._spill(batch[position:])
+                break
+            except Exception as e:
+                self._quarantine(table, values, e)
+                continue
+            written += 1
+        return written
+
+    # --- Ehtiyat fayl ---
+
+    @property
+    def _replay_path(self):
+        return f"{self.spill_path}.replay"
+
+    def _spill(self, events):
+        if not events:
+            return
+        try:
+            with self._spill_lock:
+                os.makedirs(os.path.dirname(os.path.abspath(self.spill_path)), exist_ok=True)
+                with open(self.spill_path, 'a', encoding='utf-8') as f:
+                    for table, values in events:
+                        f.write(json.dumps({'table': table, 'values': list(values)},
+                                           ensure_ascii=False, default=str) + "\n")
+                self.spilled += len(events)
+        except OSError as e:
+            print(f"Jurnal ehtiyat fayla yazılmadı ({len(events)} hadisə itdi): {e}")
+
+    def _quarantine(self, table, values, error):
+        """Bazanın qəbul etmədiyi hadisə - bir daha göndərilmir, əl ilə baxmaq üçün saxlanılır"""
+        print(f"Jurnal hadisəsi rədd edildi ({table}): {error}")
+        try:
+            with self._spill_lock:
+                os.makedirs(os.path.dirname(os.path.abspath(self.spill_path)), exist_ok=True)
+                with open(f"{self.spill_path}.rejected", 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'table': table, 'values': list(values), 'error': str(error)},
+                                       ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            print(f"Rədd edilmiş jurnal hadisəsi saxlanmadı: {e}")
+
+    def _take_spill(self):
+        """Göndəriləcək ehtiyat hadisələr.
+
+        Fayl əvvəlcə .replay adına köçürülür ki, göndərmə zamanı əlavə
+        olunan yeni hadisələr ayrıca qalsın; .replay yalnız uğurlu
+        yazmadan sonra silinir.
+        """
+        with self._spill_lock:
+            if not os.path.exists(self._replay_path):
+                if not os.path.exists(self.spill_path):
+                    return []
+                os.replace(self.spill_path, self._replay_path)
+            events = []
+            with open(self._replay_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # yarımçıq yazılmış sətir (elektrik kəsilməsi)
+                    if entry.get('table') in QUERIES:
+                        events.append((entry['table'], entry['values']))
+            return events
+
+    def _clear_replay(self):
+        with self._spill_lock:
+            try:
+                os.remove(self._replay_path)
+            except FileNotFoundError:
+                pass
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def audit_writer():
+    """Proses daxilində paylaşılan jurnal yazıcısı"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AuditWriter()
+        return _writer
+
+
+def log_login(user_type, user_id, **kwargs):
+    audit_writer().log_login(user_type, user_id, **kwargs)
+
+
+def log_action(user, action, details=None):
+    audit_writer().log_action(user, action, details)
+
+
+def close_audit_writer():
+    """Proqramdan çıxarkən növbəni boşalt"""
+    if _writer is not None:
+        _writer.stop()
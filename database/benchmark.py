@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Dashboard və satış ekranı sorğularının benchmark-ı.
+
+Hər addım bir neçə dəfə icra olunur, p50/p95 gecikmələri çap edilir.
+Nəticə JSON faylına yazılıb növbəti buraxılışın nəticəsi ilə müqayisə
+edilə bilər. Məlumatı əvvəlcə test_data generatoru ilə yaradın:
+
+    python -m database.test_data --large --sales 1000000
+    python -m database.benchmark --runs 30 --json bench.json
+    python -m database.benchmark --runs 30 --compare bench.json
+
+Satış yazma addımı bazaya həqiqi satış yazdığı üçün yalnız
+--with-writes ilə işə düşür (yalnız benchmark bazasında istifadə edin).
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime
+
+from database.connection import DatabaseConnection
+from database import queries
+from database.sale_sync import replay_sales
+from reports.sales_export import export_sales
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))]
+
+
+def measure(step, runs, warmup=1):
+    """step()-i warmup + runs dəfə icra et, millisaniyə ölçmələrini qaytar"""
+    for _ in range(warmup):
+        step()
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        step()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def summarize(timings):
+    return {
+        'runs': len(timings),
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'min_ms': round(min(timings), 2),
+        'max_ms': round(max(timings), 2),
+    }
+
+
+def default_pharmacy(db):
+    """Ən çox satışı olan aptek (benchmark məlumatı varsa onlardan biri)"""
+    rows = db.execute_query("""
+        SELECT pharmacy_id FROM pharmacy_daily_sales
+        GROUP BY pharmacy_id ORDER BY SUM(sale_count) DESC LIMIT 1
+    """)
+    if not rows:
+        raise RuntimeError("Satış məlumatı tapılmadı - əvvəlcə test_data --large işə salın")
+    return rows[0]['pharmacy_id']
+
+
+def build_steps(db, pharmacy_id, with_writes, export_dir):
+    """Benchmark addımları: ad -> (funksiya, təkrar sayının çarpanı)"""
+    first_page = queries.fetch_active_prescriptions_page(db)
+    if not first_page:
+        raise RuntimeError("Aktiv resept tapılmadı")
+    page_ids = [row['id'] for row in first_page]
+    search_term = first_page[0]['patient_name'][:3]
+    staff = db.execute_query("SELECT id FROM pharmacy_staff WHERE pharmacy_id = %s LIMIT 1", (pharmacy_id,))
+    month_start, next_month = queries.month_range(date.today())
+
+    def active_pages():
+        # İlk 5 səhifə keyset ilə - sürüşdürmə
+        after = None
+        for _ in range(5):
+            rows = queries.fetch_active_prescriptions_page(db, after)
+            if not rows:
+                break
+            after = (rows[-1]['issued_at'], rows[-1]['id'])
+
+    def excel_export():
+        export_sales(db, pharmacy_id, month_start, next_month,
+                     os.path.join(export_dir, "benchmark_export.xlsx"))
+
+    def unsold_prescriptions():
+        # Satılmış resept bir daha satılmır (konflikt) - hər satış növbəti aktiv reseptə
+        after = None
+        while True:
+            rows = queries.fetch_active_prescriptions_page(db, after)
+            if not rows:
+                raise RuntimeError("Satış üçün aktiv resept qalmadı")
+            yield from rows
+            after = (rows[-1]['issued_at'], rows[-1]['id'])
+
+    to_sell = unsold_prescriptions()
+
+    def sale_save():
+        prescription = next(to_sell)
+        replay_sales(db, [{
+            'client_sale_key': str(uuid.uuid4()),
+            'prescription_id': prescription['id'],
+            'pharmacy_id': pharmacy_id,
+            'staff_id': staff[0]['id'],
+            'patient_id': prescription['patient_id'],
+            'total_price': 10.0,
+            'commission_amount': 0.3,
+            'dispensed_at': datetime.now().replace(microsecond=0),
+        }])
+
+    steps = {
+        'dashboard_stats': (lambda: queries.fetch_dashboard_stats(db, pharmacy_id), 1.0),
+        'recent_sales': (lambda: queries.fetch_recent_sales(db, pharmacy_id), 1.0),
+        'recent_sales_incremental': (lambda: queries.fetch_new_sales(db, pharmacy_id, 2 ** 31 - 1), 1.0),
+        'active_prescriptions_first_page': (lambda: queries.fetch_active_prescriptions_page(db), 1.0),
+        'active_prescriptions_5_pages': (active_pages, 1.0),
+        'patient_search': (lambda: queries.search_active_prescriptions(db, search_term), 1.0),
+        'prescription_items_page': (lambda: queries.fetch_prescription_items(db, page_ids), 1.0),
+        'prescription_items_single': (lambda: queries.fetch_prescription_items(db, page_ids[:1]), 1.0),
+        # Export ağırdır - daha az təkrar
+        'excel_export_month': (excel_export, 0.2),
+    }
+    if with_writes and staff:
+        steps['sale_save'] = (sale_save, 1.0)
+    return steps
+
+
+def run(db, pharmacy_id, runs, warmup, with_writes, only=None):
+    results = {}
+    with tempfile.TemporaryDirectory() as export_dir:
+        steps = build_steps(db, pharmacy_id, with_writes, export_dir)
+        for name, (step, factor) in steps.items():
+            if only and name not in only:
+                continue
+            timings = measure(step, max(1, int(runs * factor)), warmup)
+            results[name] = summarize(timings)
+            print(f"{name:34} p50 {results[name]['p50_ms']:9.2f} ms   "
+                  f"p95 {results[name]['p95_ms']:9.2f} ms   ({results[name]['runs']} dəfə)")
+    return results
+
+
+def compare(results, baseline):
+    """Əvvəlki nəticə ilə müqayisə (p95 üzrə)"""
+    print("\nƏvvəlki nəticə ilə müqayisə (p95):")
+    for name, current in results.items():
+        previous = baseline.get('steps', {}).get(name)
+        if not previous or not previous['p95_ms']:
+            continue
+        change = (current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+        marker = "⚠️" if change > 20 else "  "
+        print(f"{marker} {name:34} {previous['p95_ms']:9.2f} -> {current['p95_ms']:9.2f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sorğu benchmark-ı (p50/p95)")
+    parser.add_argument('--pharmacy', type=int, help="Aptek ID (standart: ən çox satışı olan)")
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--step', action='append', help="Yalnız bu addım(lar)")
+    parser.add_argument('--with-writes', action='store_true', help="Satış yazma addımını da ölç")
+    parser.add_argument('--json', help="Nəticəni bu fayla yaz")
+    parser.add_argument('--compare', help="Əvvəlki JSON nəticə ilə müqayisə et")
+    args = parser.parse_args()
+
+    db = DatabaseConnection()
+    if not db.connect():
+        print("Verilənlər bazası qoşulma xətası!")
+        return 1
+    try:
+        pharmacy_id = args.pharmacy or default_pharmacy(db)
+        print(f"Aptek {pharmacy_id}, {args.runs} təkrar\n")
+        results = run(db, pharmacy_id, args.runs, args.warmup, args.with_writes, args.step)
+    except Exception as e:
+        print(f"Benchmark xətası: {e}")
+        return 1
+    finally:
+        db.disconnect()
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(results, json.load(f))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'at': datetime.now().isoformat(sep=' ', timespec='seconds'),
+                       'pharmacy_id': pharmacy_id, 'runs': args.runs, 'steps': results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\nNəticə yazıldı: {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
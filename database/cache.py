@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Ölçüsü məhdud, ən az istifadə olunanı atan thread-safe keş"""
+
+    _MISSING = object()
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, self._MISSING)
+            if value is self._MISSING:
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+# SELECT-in oxuduğu və yazı əmrinin dəyişdirdiyi cədvəllər
+_READ_TABLES = re.compile(r'\b(?:FROM|JOIN)\s+`?(\w+)`?', re.IGNORECASE)
+_WRITE_TABLE = re.compile(
+    r'^\s*(?:INSERT(?:\s+IGNORE)?(?:\s+INTO)?|REPLACE(?:\s+INTO)?|UPDATE(?:\s+IGNORE)?'
+    r'|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?|ALTER\s+TABLE|DROP\s+TABLE(?:\s+IF\s+EXISTS)?)'
+    r'\s+`?(\w+)`?', re.IGNORECASE)
+
+
+def normalize_sql(query):
+    """Boşluq fərqləri eyni sorğunu ayrı açar etməsin"""
+    return ' '.join(query.split())
+
+
+def read_tables(query):
+    """Sorğunun oxuduğu cədvəllər"""
+    return frozenset(name.lower() for name in _READ_TABLES.findall(query))
+
+
+def written_tables(query):
+    """Yazı əmrinin dəyişdirdiyi cədvəllər (SELECT üçün boş).
+
+    UPDATE ... JOIN və INSERT ... SELECT-də iştirak edən bütün cədvəllər
+    ehtiyatla dəyişmiş sayılır.
+    """
+    match = _WRITE_TABLE.match(query)
+    if not match:
+        return frozenset()
+    return frozenset({match.group(1).lower()}) | read_tables(query)
+
+
+class QueryCache:
+    """Sorğu nəticələri keşi: TTL, LRU limiti və cədvəl üzrə təmizləmə"""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # açar -> (bitmə vaxtı, cədvəllər, sətirlər)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(query, params=None):
+        if isinstance(params, list):
+            params = tuple(params)
+        elif isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        return normalize_sql(query), repr(params)
+
+    def get(self, key):
+        """Vaxtı keçməmiş nəticənin surətini qaytar, yoxdursa None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            rows = entry[2]
+        return [dict(row) for row in rows]
+
+    def put(self, key, rows, ttl, tables):
+        # Çağıran tərəf sətirləri dəyişsə keşdəki nəticə pozulmasın
+        rows = [dict(row) for row in rows]
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, frozenset(tables), rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_tables(self, tables):
+        """Verilən cədvəllərdən oxuyan bütün nəticələri at"""
+        tables = {table.lower() for table in tables}
+        if not tables:
+            return
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[1] & tables]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Keş statistikası"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+            }
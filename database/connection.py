@@ -3,60 +3,253 @@
 
 import pymysql
 import os
+import threading
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv
+from database.pool import ConnectionPool
+from database.cache import QueryCache, read_tables, written_tables
+from database import instrumentation
+from database.instrumentation import record_query, estimate_bytes
 
 # .env faylından dəyərləri yüklə
 load_dotenv()
 
+
+def _chunks(rows, size):
+    """Iterable-i size ölçülü siyahılara böl"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
 class DatabaseConnection:
+    # Bütün DatabaseConnection obyektləri eyni bağlantı hovuzunu paylaşır
+    _pool = None
+    _pool_pid = None
+    _pool_lock = threading.Lock()
+    # Proses daxilində paylaşılan sorğu nəticələri keşi (cache_ttl ilə istifadə olunur)
+    _query_cache = QueryCache(max_size=int(os.getenv('DB_QUERY_CACHE_SIZE', '256')))
+
     def __init__(self):
         self.host = os.getenv('DB_HOST')
         self.user = os.getenv('DB_USER') 
         self.password = os.getenv('DB_PASSWORD')
         self.database = os.getenv('DB_NAME')
         self.connection = None
+        self._depth = 0  # iç-içə connect() çağırışlarının sayı
+        self._owner_pool = None  # bağlantının götürüldüyü hovuz
+        self._in_transaction = False
+
+    def get_pool(self):
+        """Paylaşılan bağlantı hovuzunu qaytar (lazım olsa yarat)"""
+        with DatabaseConnection._pool_lock:
+            if DatabaseConnection._pool_pid != os.getpid():
+                # fork ilə yaradılmış proses valideynin soketlərini işlətməməlidir
+                DatabaseConnection._pool = None
+                DatabaseConnection._pool_pid = os.getpid()
+            if DatabaseConnection._pool is None:
+                DatabaseConnection._pool = ConnectionPool(
+                    dict(
+                        host=self.host,
+                        user=self.user,
+                        password=self.password,
+                        database=self.database,
+                        charset='utf8mb4',
+                        cursorclass=pymysql.cursors.DictCursor,
+                        autocommit=True,
+                        connect_timeout=int(os.getenv('DB_CONNECT_TIMEOUT', '10'))
+                    ),
+                    max_size=int(os.getenv('DB_POOL_SIZE', '5')),
+                    idle_timeout=float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300')),
+                    max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', '3600')),
+                    acquire_timeout=float(os.getenv('DB_POOL_ACQUIRE_TIMEOUT', '10')),
+                    ping_after=float(os.getenv('DB_POOL_PING_AFTER', '30'))
+                )
+            return DatabaseConnection._pool
+
+    @classmethod
+    def close_pool(cls):
+        """Hovuzdakı bütün bağlantıları bağla (proqramdan çıxarkən)"""
+        with cls._pool_lock:
+            pool, cls._pool = cls._pool, None
+        if pool is not None:
+            pool.close_all()
         
     def connect(self):
-        """MySQL verilənlər bazasına qoşul"""
+        """Hovuzdan MySQL bağlantısı götür"""
+        if self.connection is not None:
+            # Bağlantı artıq götürülüb - iç-içə çağırış eyni bağlantını paylaşır
+            self._depth += 1
+            return True
+        started = time.perf_counter()
         try:
-            self.connection = pymysql.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-                charset='utf8mb4',
-                cursorclass=pymysql.cursors.DictCursor,
-                autocommit=True
-            )
+            self._owner_pool = self.get_pool()
+            self.connection = self._owner_pool.acquire()
+            self._depth = 1
+            instrumentation.record_acquire(started, True)
             return True
         except Exception as e:
+            instrumentation.record_acquire(started, False)
             print(f"Verilənlər bazası qoşulma xətası: {e}")
             return False
     
     def disconnect(self):
-        """Bağlantını kəs"""
-        if self.connection and not self.connection._closed:
-            try:
-                self.connection.close()
-            except Exception:
-                pass  # Artıq bağlıdırsa xəta yaranmaz
+        """Bağlantını hovuza qaytar"""
+        if self.connection is None:
+            return
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        connection, self.connection = self.connection, None
+        self._owner_pool.release(connection)
     
-    def execute_query(self, query, params=None):
-        """SQL sorğusunu icra et"""
+    @classmethod
+    def invalidate_cache(cls, *tables):
+        """Bu cədvəllərdən oxunmuş keşlənmiş nəticələri at"""
+        cls._query_cache.invalidate_tables(tables)
+
+    @classmethod
+    def cache_stats(cls):
+        """Sorğu keşinin hit/miss statistikası"""
+        return cls._query_cache.stats()
+
+    def execute_query(self, query, params=None, cache_ttl=None):
+        """SQL sorğusunu icra et.
+
+        cache_ttl (saniyə) verilərsə nəticə keşdən oxunur və keşə yazılır;
+        həmin cədvəllərə yazı olduqda keş avtomatik təmizlənir.
+        """
+        if cache_ttl:
+            key = QueryCache.make_key(query, params)
+            cached = self._query_cache.get(key)
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
         try:
             with self.connection.cursor() as cursor:
                 cursor.execute(query, params)
-                return cursor.fetchall()
+                rows = cursor.fetchall()
         except Exception as e:
+            record_query(query, params, started, error=str(e))
             print(f"Sorğu xətası: {e}")
             return None
+        record_query(query, params, started, rows=rows)
+
+        if cache_ttl:
+            self._query_cache.put(key, rows, cache_ttl, read_tables(query))
+        else:
+            self._query_cache.invalidate_tables(written_tables(query))
+        return rows
             
     def execute_insert(self, query, params=None):
         """INSERT sorğusunu icra et və ID qaytır"""
+        started = time.perf_counter()
         try:
             with self.connection.cursor() as cursor:
-                cursor.execute(query, params)
-                return cursor.lastrowid
+                affected = cursor.execute(query, params)
+                lastrowid = cursor.lastrowid
         except Exception as e:
+            record_query(query, params, started, error=str(e))
             print(f"INSERT xətası: {e}")
-            return None
\ No newline at end of file
+            return None
+        record_query(query, params, started, row_count=affected or 0)
+        self._query_cache.invalidate_tables(written_tables(query))
+        return lastrowid
+
+    def execute_many(self, query, rows, chunk_size=1000, transaction=True, progress=None):
+        """Çoxlu sətiri hissə-hissə yaz və yazılan sətirlərin sayını qaytar.
+
+        rows - tuple-ların istənilən iterable-i (generator da ola bilər).
+        pymysql executemany hər hissəni tək çoxsətirli INSERT-ə çevirir.
+        transaction=True olduqda bütün hissələr bir tranzaksiyadadır, əks
+        halda hər hissə ayrıca yazılır. transaction() daxilində çağırılarsa
+        həmin tranzaksiyaya qoşulur. execute_insert-dən fərqli olaraq xətanı
+        udmur. progress(yazılan) hər hissədən sonra çağırılır.
+        """
+        own_transaction = transaction and not self._in_transaction
+        if own_transaction:
+            self.connection.begin()
+
+        written = 0
+        try:
+            with self.connection.cursor() as cursor:
+                for chunk in _chunks(rows, chunk_size):
+                    started = time.perf_counter()
+                    try:
+                        affected = cursor.executemany(query, chunk)
+                    except Exception as e:
+                        record_query(query, None, started, error=str(e))
+                        raise
+                    record_query(query, None, started, row_count=affected or 0)
+                    written += affected or 0
+                    if progress:
+                        progress(written)
+            if own_transaction:
+                self.connection.commit()
+        except Exception:
+            if own_transaction:
+                self.connection.rollback()
+            raise
+        finally:
+            self._query_cache.invalidate_tables(written_tables(query))
+        return written
+
+    def stream_query(self, query, params=None, chunk_size=500):
+        """Böyük nəticəni serverdən hissə-hissə oxu (unbuffered SSDictCursor).
+
+        Sətirlər yaddaşa birdəfəlik yığılmır, chunk_size ölçülü siyahılar
+        şəklində qaytarılır. Oxuma yarımçıq dayandırılarsa bağlantı
+        bağlanır ki, qalan sətirləri boş yerə oxumaq lazım olmasın.
+        """
+        cursor = self.connection.cursor(pymysql.cursors.SSDictCursor)
+        finished = False
+        started = time.perf_counter()
+        row_count = 0
+        size = 0
+        error = None
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                row_count += len(rows)
+                size += estimate_bytes(rows)
+                yield rows
+            finished = True
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            # Ölçmə bütün axını əhatə edir (istehlakçının emal vaxtı daxil)
+            record_query(query, params, started, row_count=row_count, size=size, error=error)
+            if finished:
+                cursor.close()
+            else:
+                # Hovuz bağlı bağlantını geri qəbul etmir, yenisini açacaq
+                self.connection.close()
+
+    @contextmanager
+    def transaction(self):
+        """Bir neçə əmri tək tranzaksiyada icra et.
+
+        Xəta baş verərsə hamısı geri qaytarılır (rollback). Verilən cursor
+        execute_query-dən fərqli olaraq xətanı udmur.
+        """
+        self.connection.begin()
+        self._in_transaction = True
+        try:
+            with self.connection.cursor() as cursor:
+                yield instrumentation.InstrumentedCursor(cursor)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            self._in_transaction = False
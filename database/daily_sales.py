@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""pharmacy_daily_sales yekun cədvəlinin yenidən qurulması.
+
+Gündəlik işdə cədvəl satışlar MySQL-ə göndərilərkən (sale_sync) yenilənir. Bu
+modul isə mövcud tarixçəni doldurmaq və ya yekunları dispensing_logs
+ilə yenidən tutuşdurmaq üçündür.
+
+İstifadə: python -m database.daily_sales --rebuild [--pharmacy ID] [--since YYYY-MM-DD]
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+from database.connection import DatabaseConnection
+
+
+def rebuild_daily_sales(db, pharmacy_id=None, since=None):
+    """Günlük yekunları dispensing_logs-dan toplu şəkildə yenidən hesabla.
+
+    Silmə və yenidən yazma bir tranzaksiyada aparılır, yəni dashboard
+    heç vaxt yarımçıq cədvəl görmür. Yazılmış gün sayını qaytarır.
+    """
+    conditions = []
+    params = []
+    if pharmacy_id is not None:
+        conditions.append("pharmacy_id = %s")
+        params.append(pharmacy_id)
+    if since is not None:
+        # dispensed_at funksiyasız müqayisə olunur - indeks istifadə edilsin
+        conditions.append("dispensed_at >= %s")
+        params.append(datetime.combine(since, datetime.min.time()))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    delete_conditions = []
+    delete_params = []
+    if pharmacy_id is not None:
+        delete_conditions.append("pharmacy_id = %s")
+        delete_params.append(pharmacy_id)
+    if since is not None:
+        delete_conditions.append("day >= %s")
+        delete_params.append(since)
+    delete_where = f"WHERE {' AND '.join(delete_conditions)}" if delete_conditions else ""
+
+    with db.transaction() as cursor:
+        cursor.execute(f"DELETE FROM pharmacy_daily_sales {delete_where}", delete_params)
+        cursor.execute(f"""
+            INSERT INTO pharmacy_daily_sales
+            (pharmacy_id, day, sale_count, total_price, commission_amount)
+            SELECT pharmacy_id, DATE(dispensed_at), COUNT(*),
+                   SUM(total_price), SUM(commission_amount)
+            FROM dispensing_logs
+            {where}
+            GROUP BY pharmacy_id, DATE(dispensed_at)
+        """, params)
+        return cursor.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Günlük satış yekunlarını yenidən qur")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Yekunları dispensing_logs-dan yenidən hesabla")
+    parser.add_argument('--pharmacy', type=int, help="Yalnız bu aptek üçün")
+    parser.add_argument('--since', type=lambda value: datetime.strptime(value, '%Y-%m-%d').date(),
+                        help="Yalnız bu tarixdən sonrakı günlər (YYYY-MM-DD)")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.error("--rebuild göstərilməlidir")
+
+    db = DatabaseConnection()
+    if not db.connect():
+        print("Verilənlər bazası qoşulma xətası!")
+        return 1
+    try:
+        days = rebuild_daily_sales(db, pharmacy_id=args.pharmacy, since=args.since)
+        print(f"✓ {days} günlük yekun yeniləndi")
+        return 0
+    except Exception as e:
+        print(f"Yekunlar yenidən qurularkən xəta: {e}")
+        return 1
+    finally:
+        db.disconnect()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
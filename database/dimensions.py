@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Həkim və xəstəxana adlarının yaddaşdakı surəti.
+
+Giriş zamanı bir dəfə yüklənir, sonra arxa fonda versiya yoxlaması ilə
+yenilənir. Resept sorğuları bu cədvəllərlə JOIN etmir - adlar göstərilərkən
+buradan oxunur.
+
+Versiya yoxlaması və surətdə olmayan ID-lərin oxunması DatabaseConnection-ın
+sorğu keşindən (cache_ttl) keçir: bir neçə pəncərə/thread eyni yoxlamanı
+DIMENSION_VERSION_TTL saniyə ərzində bir dəfə edir, tapılmayan ID isə hər
+səhifədə yenidən sorğulanmır. Versiya dəyişəndə bu cədvəllərin keşi atılır.
+"""
+
+import os
+import threading
+import time
+
+# Cədvəl -> reseptdəki sütun
+DIMENSIONS = {
+    'doctors': 'doctor_id',
+    'hospitals': 'hospital_id',
+}
+
+
+class DimensionCache:
+    """Soraq cədvəllərinin {id: ad} xəritələri"""
+
+    def __init__(self, max_age=None):
+        # Versiya dəyişməsə belə bu qədər saniyədən sonra tam yenidən yüklə
+        # (adın dəyişdirilməsi sətir sayını dəyişmir)
+        self.max_age = max_age if max_age is not None else float(os.getenv('DIMENSION_MAX_AGE', '3600'))
+        self.version_ttl = float(os.getenv('DIMENSION_VERSION_TTL', '60'))
+        self._names = {table: {} for table in DIMENSIONS}
+        self._version = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def is_loaded(self):
+        return self._loaded_at is not None
+
+    def name(self, table, dimension_id, default='—'):
+        """Yaddaşdan ad - verilənlər bazasına müraciət etmir"""
+        return self._names[table].get(dimension_id, default)
+
+    def doctor_name(self, doctor_id):
+        return self.name('doctors', doctor_id)
+
+    def hospital_name(self, hospital_id):
+        return self.name('hospitals', hospital_id)
+
+    def names(self):
+        """{cədvəl: {id: ad}} surəti (yerli anbara yazmaq üçün)"""
+        return {table: dict(names) for table, names in self._names.items()}
+
+    def seed(self, names):
+        """Bazaya qoşulmadan əvvəl yerli anbardakı adlarla doldur.
+
+        Surət yüklənmiş sayılmır - ilk uğurlu qoşulmada tam yüklənəcək.
+        """
+        if self.is_loaded():
+            return
+        with self._lock:
+            self._names = {table: dict(names.get(table, {})) for table in DIMENSIONS}
+
+    def version(self, db):
+        """Cədvəllərin ucuz versiya göstəricisi: sətir sayı və ən böyük ID"""
+        parts = []
+        for table in DIMENSIONS:
+            parts.append(f"(SELECT COUNT(*) FROM {table}) as {table}_count")
+            parts.append(f"(SELECT MAX(id) FROM {table}) as {table}_max_id")
+        rows = db.execute_query(f"SELECT {', '.join(parts)}", cache_ttl=self.version_ttl)
+        if not rows:
+            raise RuntimeError("Soraq cədvəllərinin versiyası oxunmadı")
+        return tuple(rows[0].values())
+
+    def load(self, db, version=None):
+        """Bütün adları yenidən yüklə"""
+        # Keşdəki ID sorğuları köhnə adları qaytarmasın
+        db.invalidate_cache(*DIMENSIONS)
+        if version is None:
+            version = self.version(db)
+        names = {}
+        for table in DIMENSIONS:
+            rows = db.execute_query(f"SELECT id, name FROM {table}")
+            if rows is None:
+                raise RuntimeError(f"{table} cədvəli yüklənmədi")
+            names[table] = {row['id']: row['name'] for row in rows}
+
+        with self._lock:
+            self._names = names
+            self._version = version
+            self._loaded_at = time.monotonic()
+
+    def refresh(self, db):
+        """Versiya dəyişibsə və ya surət köhnəlibsə yenidən yüklə"""
+        if not self.is_loaded() or time.monotonic() - self._loaded_at >= self.max_age:
+            self.load(db)
+            return True
+        version = self.version(db)
+        if version != self._version:
+            self.load(db, version)
+            return True
+        return False
+
+    def ensure(self, db, rows):
+        """Sətirlərdə olub yaddaşda olmayan ID-ləri primary key ilə oxu.
+
+        Resept sorğusunu icra edən arxa fon işinin içində çağırılır ki, UI
+        adları göstərərkən bazaya müraciət etməsin.
+        """
+        if not self.is_loaded():
+            self.load(db)
+
+        for table, id_key in DIMENSIONS.items():
+            known = self._names[table]
+            missing = {row[id_key] for row in rows if row.get(id_key) is not None} - known.keys()
+            if not missing:
+                continue
+
+            placeholders = ", ".join(["%s"] * len(missing))
+            found = db.execute_query(
+                f"SELECT id, name FROM {table} WHERE id IN ({placeholders})", sorted(missing),
+                cache_ttl=self.version_ttl)
+            if found is None:
+                raise RuntimeError(f"{table} adları oxunmadı")
+            with self._lock:
+                updated = dict(self._names[table])
+                updated.update((row['id'], row['name']) for row in found)
+                self._names = {**self._names, table: updated}
+        return rows
+
+
+# Proses daxilində paylaşılan surət
+dimensions = DimensionCache()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Vaxtı keçmiş reseptlərin 'expired' statusuna keçirilməsi.
+
+Aktiv reseptlər siyahısı yalnız status üzrə seçilir, ona görə vaxtı keçmiş
+reseptlər statusu dəyişməyincə satış dialoqunda yüklənməyə davam edir.
+Süpürgəçi onları kiçik paketlərlə yeniləyir: hər paket
+(status, expires_at) indeksi ilə ən köhnə N resepti seçən ayrıca qısa
+tranzaksiyadır, ona görə satışların kilidləri uzun müddət gözləmir.
+
+İstifadə (cron və ya əl ilə):
+    python -m database.expiry_sweeper [--batch-size 1000] [--max-batches N] [--dry-run]
+
+Proqram daxilində EXPIRY_SWEEP_INTERVAL (saniyə, 0 - söndürülüb) ilə
+dashboard-dan vaxtaşırı işə salınır. Taymer hər terminalda işləyə bilər:
+süpürmə MySQL-in GET_LOCK adlı kilidi altında aparılır, kilidi başqa
+terminal (və ya cron) tutubsa bu çağırış heç nə etmir. Yenə də taymeri
+bir hostda yandırmaq (və ya yalnız cron istifadə etmək) kifayətdir.
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from database.connection import DatabaseConnection
+
+# Satılmamış və qismən satılmış reseptlərin də vaxtı keçir
+SWEPT_STATUSES = ('active', 'partially_dispensed')
+# Eyni anda yalnız bir süpürgəçi işləsin (bağlantıya bağlı adlı kilid)
+SWEEP_LOCK = 'bioscript.expiry_sweep'
+
+
+def sweep_expired(db, batch_size=1000, max_batches=None, pause=0.05, now=None):
+    """Vaxtı keçmiş reseptləri paketlərlə 'expired' et, dəyişən sətir sayını qaytar.
+
+    max_batches - bir çağırışda ən çox paket sayı (qalanı növbəti dəfəyə);
+    pause - paketlər arasında gözləmə, digər tranzaksiyalara yol vermək üçün.
+    Başqa süpürgəçi işləyirsə (SWEEP_LOCK tutulub) dərhal 0 qaytarır.
+    """
+    rows = db.execute_query("SELECT GET_LOCK(%s, 0) as locked", (SWEEP_LOCK,))
+    if rows is None:
+        raise RuntimeError("Süpürmə kilidi alına bilmədi")
+    if rows[0]['locked'] != 1:
+        print("Vaxtı keçmiş reseptlər artıq başqa yerdə süpürülür - keçildi")
+        return 0
+    try:
+        return _sweep_batches(db, batch_size, max_batches, pause, now)
+    finally:
+        db.execute_query("SELECT RELEASE_LOCK(%s)", (SWEEP_LOCK,))
+
+
+def _sweep_batches(db, batch_size, max_batches, pause, now):
+    # Sərhəd bir dəfə götürülür - süpürmə zamanı vaxtı keçənlər növbəti dəfəyə qalır
+    now = now or datetime.now().replace(microsecond=0)
+    total = 0
+    batches = 0
+    for status in SWEPT_STATUSES:
+        while max_batches is None or batches < max_batches:
+            # status bərabərliyi + expires_at diapazonu: ORDER BY ... LIMIT indeksdən oxunur
+            with db.transaction() as cursor:
+                updated = cursor.execute("""
+                    UPDATE prescriptions SET status = 'expired'
+                    WHERE status = %s AND expires_at < %s
+                    ORDER BY expires_at
+                    LIMIT %s
+                """, (status, now, batch_size)) or 0
+            batches += 1
+            total += updated
+            if updated < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    return total
+
+
+def count_expired(db, now=None):
+    """Süpürülməli reseptlərin sayı (--dry-run üçün)"""
+    now = now or datetime.now().replace(microsecond=0)
+    total = 0
+    for status in SWEPT_STATUSES:
+        rows = db.execute_query("""
+            SELECT COUNT(*) as count FROM prescriptions
+            WHERE status = %s AND expires_at < %s
+        """, (status, now))
+        if rows is None:
+            raise RuntimeError("Sorğu icra olunmadı")
+        total += rows[0]['count']
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vaxtı keçmiş reseptləri 'expired' et")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Bir UPDATE-də ən çox sətir")
+    parser.add_argument('--max-batches', type=int, help="Ən çox paket sayı (standart: hamısı)")
+    parser.add_argument('--pause', type=float, default=0.05, help="Paketlər arası gözləmə, saniyə")
+    parser.add_argument('--dry-run', action='store_true', help="Yalnız sayı göstər")
+    args = parser.parse_args()
+
+    db = DatabaseConnection()
+    if not db.connect():
+        print("Verilənlər bazası qoşulma xətası!")
+        return 1
+    try:
+        if args.dry_run:
+            print(f"Vaxtı keçmiş resept: {count_expired(db)}")
+            return 0
+        started = time.perf_counter()
+        swept = sweep_expired(db, batch_size=args.batch_size, max_batches=args.max_batches,
+                              pause=args.pause)
+        print(f"✓ {swept} resept 'expired' edildi ({time.perf_counter() - started:.1f} s)")
+        return 0
+    except Exception as e:
+        print(f"Süpürmə xətası: {e}")
+        return 1
+    finally:
+        db.disconnect()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Sorğu ölçmələri: gecikmə, sətir sayı, həcm, bağlantı gözləmə və xətalar.
+
+DatabaseConnection hər əmrdən sonra QueryEvent yaradıb qeydiyyatdakı
+hook-lara ötürür. Standart hook MetricsCollector-dur: SQL barmaq izi
+(fingerprint) üzrə statistikanı, son ölçmələrin histoqramını və yavaş
+sorğular jurnalını saxlayır, JSON və ya Prometheus mətn faylına yazır.
+
+Konfiqurasiya (.env):
+  DB_INSTRUMENTATION=0   ölçməni söndür
+  DB_SLOW_QUERY_MS       yavaş sorğu həddi (standart 500)
+  DB_METRICS_FILE        ixrac faylı (.prom - Prometheus, digər - JSON)
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+from functools import lru_cache
+
+QueryEvent = namedtuple('QueryEvent', 'fingerprint sql params duration rows bytes error')
+
+# Prometheus histoqramının sərhədləri (saniyə)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|%\(\w+\)s')
+_VALUE_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+# Bu sütunlara toxunan əmrlərin parametrləri jurnala/metrika faylına yazılmır
+_SENSITIVE_COLUMN = re.compile(r'\bpassword\b', re.IGNORECASE)
+REDACTED = '<gizli>'
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(query):
+    """Parametrlərdən asılı olmayan sorğu forması: literallar və %s -> ?"""
+    sql = _STRING_LITERAL.sub('?', query)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _VALUE_LIST.sub('(...)', sql)  # IN (?, ?, ?) siyahısının uzunluğu fərqləndirməsin
+    return ' '.join(sql.split())
+
+
+def estimate_bytes(rows):
+    """Nəticənin təxmini həcmi (şəbəkə paketləri əlçatan olmadığı üçün)"""
+    total = 0
+    for row in rows or ():
+        for value in (row.values() if isinstance(row, dict) else row):
+            if isinstance(value, (str, bytes, bytearray)):
+                total += len(value)
+            elif value is not None:
+                total += 8
+    return total
+
+
+class Histogram:
+    """Kumulativ bucket sayğacları və son N ölçmə (faizlər üçün)"""
+
+    def __init__(self, window=1000):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        index = 0
+        while index < len(BUCKETS) and value > BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.recent.append(value)
+
+    def percentile(self, p):
+        if not self.recent:
+            return 0.0
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_seconds': round(self.total, 6),
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p95_ms': round(self.percentile(95) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+            'max_ms': round(max(self.recent, default=0.0) * 1000, 3),
+        }
+
+
+class _StatementStats:
+    def __init__(self):
+        self.latency = Histogram(window=200)
+        self.errors = 0
+        self.rows = 0
+        self.bytes = 0
+
+
+class MetricsCollector:
+    """Standart hook - bütün ölçmələri yaddaşda toplayır"""
+
+    def __init__(self, slow_query_ms=None, max_fingerprints=500):
+        self.slow_query_ms = slow_query_ms if slow_query_ms is not None else float(os.getenv('DB_SLOW_QUERY_MS', '500'))
+        self.max_fingerprints = max_fingerprints
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = datetime.now()
+            self.latency = Histogram()
+            self.acquire = Histogram()
+            self.acquire_errors = 0
+            self.errors = 0
+            self.slow_queries = deque(maxlen=50)
+            self.statements = {}
+
+    def __call__(self, event):
+        with self._lock:
+            self.latency.observe(event.duration)
+            stats = self.statements.get(event.fingerprint)
+            if stats is None:
+                if len(self.statements) >= self.max_fingerprints:
+                    # Dinamik SQL barmaq izlərini sonsuz artırmasın
+                    stats = self.statements.setdefault('<digər>', _StatementStats())
+                else:
+                    stats = self.statements[event.fingerprint] = _StatementStats()
+            stats.latency.observe(event.duration)
+            stats.rows += event.rows
+            stats.bytes += event.bytes
+            if event.error:
+                stats.errors += 1
+                self.errors += 1
+
+        if event.duration * 1000 >= self.slow_query_ms:
+            entry = {
+                'at': datetime.now().isoformat(sep=' ', timespec='seconds'),
+                'ms': round(event.duration * 1000, 1),
+                'fingerprint': event.fingerprint,
+                'params': repr(event.params)[:500],
+                'rows': event.rows,
+            }
+            with self._lock:
+                self.slow_queries.append(entry)
+            print(f"Yavaş sorğu ({entry['ms']} ms): {event.fingerprint} | parametrlər: {entry['params']}")
+
+    def observe_acquire(self, duration, ok):
+        with self._lock:
+            self.acquire.observe(duration)
+            if not ok:
+                self.acquire_errors += 1
+
+    def snapshot(self):
+        """Bütün göstəricilər JSON-a uyğun dict şəklində"""
+        with self._lock:
+            statements = sorted(self.statements.items(),
+                                key=lambda item: item[1].latency.total, reverse=True)
+            return {
+                'started_at': self.started_at.isoformat(sep=' ', timespec='seconds'),
+                'exported_at': datetime.now().isoformat(sep=' ', timespec='seconds'),
+                'queries': self.latency.summary(),
+                'errors': self.errors,
+                'acquire': dict(self.acquire.summary(), errors=self.acquire_errors),
+                'slow_query_ms': self.slow_query_ms,
+                'slow_queries': list(self.slow_queries),
+                'statements': [
+                    dict(stats.latency.summary(), fingerprint=fp, errors=stats.errors,
+                         rows=stats.rows, bytes=stats.bytes)
+                    for fp, stats in statements
+                ],
+            }
+
+    def prometheus_text(self):
+        """Prometheus text exposition formatı"""
+        lines = []
+
+        def histogram(name, help_text, hist):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, count in zip(BUCKETS, hist.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {hist.count}')
+            lines.append(f"{name}_sum {hist.total:.6f}")
+            lines.append(f"{name}_count {hist.count}")
+
+        with self._lock:
+            histogram('bioscript_db_query_duration_seconds', 'SQL statement latency', self.latency)
+            histogram('bioscript_db_acquire_duration_seconds', 'Connection pool acquire time', self.acquire)
+            lines.append("# TYPE bioscript_db_query_errors_total counter")
+            lines.append(f"bioscript_db_query_errors_total {self.errors}")
+            lines.append("# TYPE bioscript_db_acquire_errors_total counter")
+            lines.append(f"bioscript_db_acquire_errors_total {self.acquire_errors}")
+
+            for metric, kind, value in (('statement_seconds_total', 'counter', lambda s: f"{s.latency.total:.6f}"),
+                                        ('statement_calls_total', 'counter', lambda s: s.latency.count),
+                                        ('statement_errors_total', 'counter', lambda s: s.errors),
+                                        ('statement_rows_total', 'counter', lambda s: s.rows),
+                                        ('statement_bytes_total', 'counter', lambda s: s.bytes)):
+                lines.append(f"# TYPE bioscript_db_{metric} {kind}")
+                for fp, stats in self.statements.items():
+                    label = fp[:200].replace('\\', '\\\\').replace('"', '\\"')
+                    lines.append(f'bioscript_db_{metric}{{statement="{label}"}} {value(stats)}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Faylın uzantısına görə Prometheus (.prom) və ya JSON yaz"""
+        if path.endswith('.prom'):
+            content = self.prometheus_text()
+        else:
+            content = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        # Oxuyan tərəf yarımçıq faylı görməsin
+        os.replace(tmp_path, path)
+
+
+_hooks = []
+_hooks_lock = threading.Lock()
+metrics = MetricsCollector()
+enabled = os.getenv('DB_INSTRUMENTATION', '1') != '0'
+if enabled:
+    _hooks.append(metrics)
+
+
+def add_hook(hook):
+    """hook(QueryEvent) - hər əmrdən sonra çağırılır"""
+    with _hooks_lock:
+        _hooks.append(hook)
+
+
+def remove_hook(hook):
+    with _hooks_lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+def redact_params(sql, params):
+    """Şifrə sütunlu əmrlərin parametrlərini gizlət (açıq mətnli şifrə, heş)"""
+    if params is not None and _SENSITIVE_COLUMN.search(sql):
+        return REDACTED
+    return params
+
+
+def record_query(sql, params, started, rows=None, row_count=0, size=None, error=None):
+    """Bir əmrin ölçməsini hook-lara ötür (started - time.perf_counter())"""
+    if not _hooks:
+        return
+    params = redact_params(sql, params)
+    duration = time.perf_counter() - started
+    if rows is not None:
+        row_count = len(rows)
+    if size is None:
+        size = estimate_bytes(rows)
+    event = QueryEvent(fingerprint(sql), sql, params, duration, row_count, size, error)
+    for hook in list(_hooks):
+        try:
+            hook(event)
+        except Exception as e:
+            print(f"Ölçmə hook xətası: {e}")
+
+
+class InstrumentedCursor:
+    """Tranzaksiya cursor-u üçün ölçən örtük - qalan metodlar olduğu kimi"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=None):
+        started = time.perf_counter()
+        try:
+            affected = self._cursor.execute(query, params)
+        except Exception as e:
+            record_query(query, params, started, error=str(e))
+            raise
+        record_query(query, params, started, row_count=affected or 0)
+        return affected
+
+    def executemany(self, query, args):
+        started = time.perf_counter()
+        try:
+            affected = self._cursor.executemany(query, args)
+        except Exception as e:
+            record_query(query, None, started, error=str(e))
+            raise
+        record_query(query, None, started, row_count=affected or 0)
+        return affected
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def record_acquire(started, ok):
+    """Hovuzdan bağlantı götürmə müddətini qeyd et"""
+    if enabled:
+        metrics.observe_acquire(time.perf_counter() - started, ok)
+
+
+def export_metrics(path=None):
+    """DB_METRICS_FILE (və ya verilən yol) faylına yaz; fayl təyin olunmayıbsa heç nə etmə"""
+    path = path or os.getenv('DB_METRICS_FILE')
+    if not path or not enabled:
+        return None
+    try:
+        metrics.export(path)
+    except OSError as e:
+        print(f"Ölçmələr yazılmadı: {e}")
+        return None
+    return path
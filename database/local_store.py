@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Aptekin yerli SQLite surəti və satış növbəsi.
+
+Mərkəzi MySQL əlçatmaz olduqda aktiv reseptlər və dərmanlar buradan
+oxunur. Satışlar əvvəlcə sale_queue cədvəlinə yazılır, sonra arxa fon
+sinxronizatoru onları MySQL-ə paketlərlə ötürür (database/sale_sync.py).
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prescriptions (
+    id INTEGER PRIMARY KEY,
+    doctor_id INTEGER,
+    patient_id TEXT NOT NULL,
+    hospital_id INTEGER,
+    status TEXT,
+    issued_at TEXT,
+    expires_at TEXT,
+    complaint TEXT,
+    diagnosis TEXT,
+    patient_name TEXT,
+    patient_fin_code TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_local_prescriptions_issued ON prescriptions (issued_at, id);
+CREATE INDEX IF NOT EXISTS idx_local_prescriptions_patient ON prescriptions (patient_id);
+CREATE INDEX IF NOT EXISTS idx_local_prescriptions_fin ON prescriptions (patient_fin_code);
+CREATE INDEX IF NOT EXISTS idx_local_prescriptions_name ON prescriptions (patient_name COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS prescription_items (
+    id INTEGER PRIMARY KEY,
+    prescription_id INTEGER NOT NULL,
+    name TEXT,
+    dosage TEXT,
+    instructions TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_local_items_prescription ON prescription_items (prescription_id);
+
+CREATE TABLE IF NOT EXISTS dimension_names (
+    table_name TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    name TEXT,
+    PRIMARY KEY (table_name, id)
+);
+
+CREATE TABLE IF NOT EXISTS sale_queue (
+    client_sale_key TEXT PRIMARY KEY,
+    prescription_id INTEGER NOT NULL,
+    pharmacy_id INTEGER NOT NULL,
+    staff_id INTEGER NOT NULL,
+    patient_id TEXT NOT NULL,
+    total_price REAL NOT NULL,
+    commission_amount REAL NOT NULL,
+    dispensed_at TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+
+-- Serverdə resepti artıq satılmış olduğu üçün yazılmamış satışlar
+CREATE TABLE IF NOT EXISTS sale_conflicts (
+    client_sale_key TEXT PRIMARY KEY,
+    prescription_id INTEGER NOT NULL,
+    pharmacy_id INTEGER NOT NULL,
+    staff_id INTEGER NOT NULL,
+    patient_id TEXT NOT NULL,
+    total_price REAL NOT NULL,
+    commission_amount REAL NOT NULL,
+    dispensed_at TEXT NOT NULL,
+    reason TEXT,
+    detected_at TEXT NOT NULL,
+    reported INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+PRESCRIPTION_COLUMNS = ('id', 'doctor_id', 'patient_id', 'hospital_id', 'status', 'issued_at',
+                        'expires_at', 'complaint', 'diagnosis', 'patient_name', 'patient_fin_code')
+ITEM_COLUMNS = ('id', 'prescription_id', 'name', 'dosage', 'instructions')
+SALE_COLUMNS = ('client_sale_key', 'prescription_id', 'pharmacy_id', 'staff_id', 'patient_id',
+                'total_price', 'commission_amount', 'dispensed_at')
+DATETIME_COLUMNS = ('issued_at', 'expires_at', 'dispensed_at')
+
+
+def default_path():
+    return os.getenv('LOCAL_STORE_PATH',
+                     os.path.join(os.path.expanduser("~"), ".bioscript", "local_store.db"))
+
+
+def _to_sqlite(value):
+    return value.isoformat(sep=' ') if isinstance(value, datetime) else value
+
+
+def _from_sqlite(row):
+    """sqlite3.Row -> MySQL DictCursor sətrinə oxşar dict"""
+    result = dict(row)
+    for column in DATETIME_COLUMNS:
+        if result.get(column):
+            result[column] = datetime.fromisoformat(result[column])
+    return result
+
+
+class LocalStore:
+    """Yerli SQLite faylı - bir bağlantı, bütün thread-lər üçün kilidlə"""
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL: oxucular yazını gözləmir; FULL: növbəyə yazılmış satış elektrik kəsilsə də qalır
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Satış növbəsi ---
+
+    def enqueue_sale(self, sale):
+        """Satışı növbəyə yaz və reseptləri yerli siyahıdan çıxar"""
+        values = [_to_sqlite(sale[column]) for column in SALE_COLUMNS]
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR IGNORE INTO sale_queue ({', '.join(SALE_COLUMNS)}) "
+                f"VALUES ({', '.join(['?'] * len(SALE_COLUMNS))})", values)
+            # Oflayn rejimdə eyni resept ikinci dəfə satılmasın
+            self._conn.execute("DELETE FROM prescriptions WHERE id = ?", (sale['prescription_id'],))
+
+    def forget_prescription(self, prescription_id):
+        """Birbaşa MySQL-ə satılmış resepti surətdən çıxar"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM prescriptions WHERE id = ?", (prescription_id,))
+
+    def pending_sales(self, limit=200):
+        """Göndərilməmiş satışlar - az cəhd ediləndən başlayaraq"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(SALE_COLUMNS)}, attempts FROM sale_queue "
+                "ORDER BY attempts, dispensed_at LIMIT ?", (limit,)).fetchall()
+        return [_from_sqlite(row) for row in rows]
+
+    def pending_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sale_queue").fetchone()[0]
+
+    def mark_synced(self, keys):
+        """MySQL-ə yazılmış satışları növbədən sil"""
+        keys = list(keys)
+        if not keys:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM sale_queue WHERE client_sale_key = ?",
+                                   [(key,) for key in keys])
+
+    def mark_failed(self, keys, error):
+        keys = list(keys)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE sale_queue SET attempts = attempts + 1, last_error = ? "
+                "WHERE client_sale_key = ?", [(str(error), key) for key in keys])
+
+    def mark_conflicted(self, keys, reason):
+        """Resepti serverdə artıq satılmış satışları növbədən konfliktlərə köçür"""
+        keys = list(keys)
+        columns = ', '.join(SALE_COLUMNS)
+        detected_at = datetime.now().isoformat(sep=' ')
+        with self._lock, self._conn:
+            for key in keys:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO sale_conflicts ({columns}, reason, detected_at) "
+                    f"SELECT {columns}, ?, ? FROM sale_queue WHERE client_sale_key = ?",
+                    (reason, detected_at, key))
+                self._conn.execute("DELETE FROM sale_queue WHERE client_sale_key = ?", (key,))
+
+    def take_conflicts(self):
+        """Əczaçıya hələ göstərilməmiş konfliktlər - oxunanlar göstərilmiş sayılır"""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(SALE_COLUMNS)}, reason FROM sale_conflicts "
+                "WHERE reported = 0 ORDER BY dispensed_at").fetchall()
+            self._conn.execute("UPDATE sale_conflicts SET reported = 1 WHERE reported = 0")
+        return [_from_sqlite(row) for row in rows]
+
+    def queued_prescription_ids(self):
+        """Növbədə satışı gözləyən reseptlər - MySQL-də hələ 'active' görünürlər"""
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT prescription_id FROM sale_queue")}
+
+    # --- Aktiv reseptlərin surəti ---
+
+    def replace_mirror(self, prescriptions, items, dimension_names):
+        """Surəti tam dəyiş - bir tranzaksiyada, yarımçıq surət görünməsin.
+
+        prescriptions və items sətir iterator-ları ola bilər (hissə-hissə
+        oxunan MySQL nəticəsi).
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM prescriptions")
+            self._conn.execute("DELETE FROM prescription_items")
+            self._conn.execute("DELETE FROM dimension_names")
+
+            queued = {row[0] for row in self._conn.execute("SELECT prescription_id FROM sale_queue")}
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO prescriptions ({', '.join(PRESCRIPTION_COLUMNS)}) "
+                f"VALUES ({', '.join(['?'] * len(PRESCRIPTION_COLUMNS))})",
+                ([_to_sqlite(row.get(column)) for column in PRESCRIPTION_COLUMNS]
+                 for row in prescriptions if row['id'] not in queued))
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO prescription_items ({', '.join(ITEM_COLUMNS)}) "
+                f"VALUES ({', '.join(['?'] * len(ITEM_COLUMNS))})",
+                ([row.get(column) for column in ITEM_COLUMNS] for row in items))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dimension_names (table_name, id, name) VALUES (?, ?, ?)",
+                ((table, dimension_id, name)
+                 for table, names in dimension_names.items()
+                 for dimension_id, name in names.items()))
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('mirrored_at', ?)",
+                               (datetime.now().isoformat(sep=' '),))
+
+    def mirrored_at(self):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'mirrored_at'").fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def prescriptions_page(self, after=None, limit=50):
+        """fetch_active_prescriptions_page-in yerli qarşılığı"""
+        query = "SELECT * FROM prescriptions WHERE status = 'active'"
+        params = []
+        if after is not None:
+            issued_at, prescription_id = after
+            issued_at = _to_sqlite(issued_at)
+            query += " AND (issued_at < ? OR (issued_at = ? AND id < ?))"
+            params.extend([issued_at, issued_at, prescription_id])
+        query += " ORDER BY issued_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [_from_sqlite(row) for row in rows]
+
+    def search_prescriptions(self, term, limit=50):
+        """search_active_prescriptions-ın yerli qarşılığı"""
+        term = term.strip()
+        name_prefix = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT * FROM prescriptions
+                WHERE status = 'active'
+                  AND (patient_fin_code = ? COLLATE NOCASE OR patient_id = ? OR patient_name LIKE ? ESCAPE '\\')
+                ORDER BY issued_at DESC, id DESC
+                LIMIT ?
+            """, (term, term, name_prefix, limit)).fetchall()
+        return [_from_sqlite(row) for row in rows]
+
+    def patient_prescriptions(self, patient_id, limit=50):
+        """fetch_patient_active_prescriptions-ın yerli qarşılığı"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT * FROM prescriptions
+                WHERE patient_id = ? AND status = 'active'
+                ORDER BY issued_at DESC, id DESC
+                LIMIT ?
+            """, (str(patient_id), limit)).fetchall()
+        return [_from_sqlite(row) for row in rows]
+
+    def prescription_items(self, prescription_ids):
+        """fetch_prescription_items-in yerli qarşılığı"""
+        prescription_ids = list(prescription_ids)
+        items = {prescription_id: [] for prescription_id in prescription_ids}
+        if not prescription_ids:
+            return items
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM prescription_items WHERE prescription_id IN "
+                f"({', '.join(['?'] * len(prescription_ids))}) ORDER BY prescription_id, id",
+                prescription_ids).fetchall()
+        for row in rows:
+            items[row['prescription_id']].append(dict(row))
+        return items
+
+    def dimension_names(self):
+        """{cədvəl: {id: ad}} - oflayn başlanğıcda adları göstərmək üçün"""
+        names = {}
+        with self._lock:
+            for table, dimension_id, name in self._conn.execute(
+                    "SELECT table_name, id, name FROM dimension_names"):
+                names.setdefault(table, {})[dimension_id] = name
+        return names
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def local_store():
+    """Proses daxilində paylaşılan yerli anbar"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = LocalStore()
+        return _store
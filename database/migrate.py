@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Verilənlər bazası miqrasiyaları.
+
+database/migrations qovluğundakı .sql faylları ad sırası ilə bir dəfə
+icra olunur, tətbiq edilənlər schema_migrations cədvəlində saxlanılır.
+
+İstifadə: python -m database.migrate [--list]
+"""
+
+import argparse
+import os
+import sys
+
+from database.connection import DatabaseConnection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+
+def split_statements(sql):
+    """SQL faylını ayrı-ayrı əmrlərə böl (DELIMITER direktivini dəstəkləyir)"""
+    statements = []
+    delimiter = ';'
+    buffer = []
+
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if stripped.upper().startswith('DELIMITER '):
+            delimiter = stripped.split(None, 1)[1]
+            continue
+        if not buffer and (not stripped or stripped.startswith('--')):
+            continue
+        buffer.append(line)
+        if stripped.endswith(delimiter):
+            statement = '\n'.join(buffer).rstrip()
+            statement = statement[:-len(delimiter)].strip()
+            if statement:
+                statements.append(statement)
+            buffer = []
+
+    tail = '\n'.join(buffer).strip()
+    if tail:
+        statements.append(tail)
+    return statements
+
+
+def available_migrations():
+    """Miqrasiya fayllarının siyahısı (versiya, yol)"""
+    names = sorted(name for name in os.listdir(MIGRATIONS_DIR) if name.endswith('.sql'))
+    return [(os.path.splitext(name)[0], os.path.join(MIGRATIONS_DIR, name)) for name in names]
+
+
+def applied_migrations(db):
+    """Artıq tətbiq edilmiş versiyalar"""
+    db.execute_query("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version varchar(100) NOT NULL PRIMARY KEY,
+            applied_at timestamp NULL DEFAULT current_timestamp()
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+    rows = db.execute_query("SELECT version FROM schema_migrations")
+    if rows is None:
+        raise RuntimeError("schema_migrations cədvəli oxuna bilmədi")
+    return {row['version'] for row in rows}
+
+
+def apply_migration(db, version, path):
+    """Bir miqrasiya faylını icra et"""
+    with open(path, encoding='utf-8') as f:
+        statements = split_statements(f.read())
+
+    # execute_query xətanı udur, burada isə ilk xətada dayanmaq lazımdır
+    with db.connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+
+
+def migrate(db, list_only=False):
+    """Gözləyən miqrasiyaları tətbiq et"""
+    done = applied_migrations(db)
+    pending = [(version, path) for version, path in available_migrations() if version not in done]
+
+    if list_only:
+        for version, _ in available_migrations():
+            mark = "✓" if version in done else " "
+            print(f"[{mark}] {version}")
+        return True
+
+    if not pending:
+        print("Bütün miqrasiyalar artıq tətbiq edilib")
+        return True
+
+    for version, path in pending:
+        try:
+            apply_migration(db, version, path)
+            print(f"✓ {version}")
+        except Exception as e:
+            print(f"Miqrasiya xətası ({version}): {e}")
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BioScript verilənlər bazası miqrasiyaları")
+    parser.add_argument('--list', action='store_true', help="Miqrasiyaların vəziyyətini göstər")
+    args = parser.parse_args()
+
+    db = DatabaseConnection()
+    if not db.connect():
+        print("Verilənlər bazası qoşulma xətası!")
+        return 1
+    try:
+        return 0 if migrate(db, list_only=args.list) else 1
+    finally:
+        db.disconnect()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,5 @@
+-- Dashboard statistikası pharmacy_id + dispensed_at aralığı ilə axtarır.
+-- Kompozit indeks sayəsində sorğu bütün cədvəli deyil, yalnız bu ayın
+-- sətirlərini oxuyur.
+ALTER TABLE `dispensing_logs`
+  ADD KEY `idx_dispensing_pharmacy_date` (`pharmacy_id`, `dispensed_at`);
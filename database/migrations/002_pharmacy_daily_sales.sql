@@ -0,0 +1,26 @@
+-- Aptek üzrə günlük satış yekunları. Hər satışda save_sale tərəfindən
+-- yenilənir, dashboard kartları dispensing_logs əvəzinə buradan oxunur.
+-- Mövcud tarixçə aşağıda dispensing_logs-dan doldurulur; sonradan yekunları
+-- yenidən tutuşdurmaq üçün: python -m database.daily_sales --rebuild
+CREATE TABLE IF NOT EXISTS `pharmacy_daily_sales` (
+  `pharmacy_id` int(11) NOT NULL,
+  `day` date NOT NULL,
+  `sale_count` int(11) NOT NULL DEFAULT 0,
+  `total_price` decimal(12,2) NOT NULL DEFAULT 0.00,
+  `commission_amount` decimal(12,2) NOT NULL DEFAULT 0.00,
+  PRIMARY KEY (`pharmacy_id`, `day`),
+  CONSTRAINT `pharmacy_daily_sales_ibfk_1` FOREIGN KEY (`pharmacy_id`) REFERENCES `pharmacies` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Mövcud satışların günlük yekunları. Cədvəl yaradılandan sonra yazılmış
+-- satış artıq sətir açmış ola bilər - dispensing_logs-dan hesablanan dəyər
+-- onu əvəz edir (ikiqat sayılmır)
+INSERT INTO `pharmacy_daily_sales`
+  (`pharmacy_id`, `day`, `sale_count`, `total_price`, `commission_amount`)
+SELECT `pharmacy_id`, DATE(`dispensed_at`), COUNT(*), SUM(`total_price`), SUM(`commission_amount`)
+FROM `dispensing_logs`
+GROUP BY `pharmacy_id`, DATE(`dispensed_at`)
+ON DUPLICATE KEY UPDATE
+  `sale_count` = VALUES(`sale_count`),
+  `total_price` = VALUES(`total_price`),
+  `commission_amount` = VALUES(`commission_amount`);
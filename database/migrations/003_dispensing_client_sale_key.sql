@@ -0,0 +1,6 @@
+-- client_sale_key müştəri tərəfində yaradılan satış açarıdır: eyni açarla
+-- təkrar göndərilən satış (cavabı itmiş təsdiq, yerli növbənin təkrar
+-- göndərilməsi) ikinci dəfə yazılmır - database/sale_sync.py.
+ALTER TABLE `dispensing_logs`
+  ADD COLUMN `client_sale_key` char(36) DEFAULT NULL,
+  ADD UNIQUE KEY `uq_dispensing_client_sale_key` (`client_sale_key`);
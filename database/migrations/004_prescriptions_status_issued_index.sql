@@ -0,0 +1,5 @@
+-- Aktiv reseptlər (issued_at, id) üzrə keyset səhifələmə ilə oxunur.
+-- InnoDB ikinci dərəcəli indeksə id-ni özü əlavə edir, ona görə
+-- (status, issued_at) indeksi ORDER BY issued_at DESC, id DESC üçün kifayətdir.
+ALTER TABLE `prescriptions`
+  ADD KEY `idx_prescriptions_status_issued` (`status`, `issued_at`);
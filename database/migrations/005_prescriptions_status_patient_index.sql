@@ -0,0 +1,5 @@
+-- Satış dialoqunda pasiyent axtarışı: pasiyent FİN, ID və ya ad prefiksi
+-- ilə tapılır (fin_code, PRIMARY, idx_patient_name), sonra onun aktiv
+-- reseptləri bu indekslə birbaşa seçilir.
+ALTER TABLE `prescriptions`
+  ADD KEY `idx_prescriptions_status_patient` (`status`, `patient_id`);
@@ -0,0 +1,5 @@
+-- Vaxtı keçmiş reseptlərin süpürülməsi (database/expiry_sweeper.py):
+-- UPDATE ... WHERE status = ? AND expires_at < ? ORDER BY expires_at LIMIT N
+-- bu indekslə yalnız yenilənəcək sətirləri oxuyur və kilidləyir.
+ALTER TABLE `prescriptions`
+  ADD KEY `idx_prescriptions_status_expires` (`status`, `expires_at`);
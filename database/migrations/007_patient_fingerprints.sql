@@ -0,0 +1,16 @@
+-- Pasiyentlərin barmaq izi şablonları (fingerprint/matcher.py).
+-- template - minutiae nöqtələri: float32 (x, y, θ) üçlükləri, little-endian.
+-- Aptek proqramı şablonları bir dəfə yükləyib yaddaşda müqayisə edir, sonra
+-- yalnız id > son yüklənən id olan yeni qeydiyyatları oxuyur; şablon dəyişəndə
+-- sətir UPDATE edilmir, silinib yenidən yazılır.
+CREATE TABLE IF NOT EXISTS `patient_fingerprints` (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `patient_id` varchar(20) NOT NULL,
+  `finger` tinyint(4) NOT NULL DEFAULT 0,
+  `template` blob NOT NULL,
+  `minutiae_count` smallint(6) NOT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uniq_patient_finger` (`patient_id`, `finger`),
+  CONSTRAINT `patient_fingerprints_ibfk_1` FOREIGN KEY (`patient_id`) REFERENCES `patients` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Əczaçı şifrələrinin bcrypt ilə saxlanılması və yoxlanılması.
+
+Şifrə artıq SQL-də müqayisə olunmur: istifadəçi username (unikal indeks)
+ilə oxunur, şifrə isə proqramda yoxlanılır. bcrypt qəsdən yavaşdır
+(PASSWORD_BCRYPT_ROUNDS=11 - bir nüvədə təxminən 200 ms), ona görə authenticate()
+GUI thread-ində deyil, arxa fon işçisində çağırılır.
+
+Köhnə, açıq mətnli şifrələr uğurlu girişdə bcrypt heşi ilə əvəz olunur;
+UPDATE köhnə dəyəri şərt kimi yoxlayır, yəni eyni vaxtda dəyişdirilmiş
+şifrənin üstünə yazılmır. Daha kiçik cost ilə heşlənmiş şifrələr də eyni
+yolla yenidən heşlənir.
+
+Cost seçmək üçün (hədəf giriş gecikməsinə görə):
+    python -m database.passwords --benchmark --target-ms 300
+"""
+
+import argparse
+import hmac
+import os
+import sys
+import time
+
+import bcrypt
+
+from database.connection import DatabaseConnection
+
+BCRYPT_ROUNDS = int(os.getenv('PASSWORD_BCRYPT_ROUNDS', '11'))
+BCRYPT_PREFIXES = ('$2a$', '$2b$', '$2y$')
+# bcrypt yalnız ilk 72 baytı istifadə edir; bcrypt>=5 uzun şifrədə xəta verir
+MAX_PASSWORD_BYTES = 72
+
+# Naməlum istifadəçi üçün də bir bcrypt yoxlaması - cavab vaxtından
+# istifadəçi adının mövcudluğu bilinməsin
+_DUMMY_HASH = None
+
+
+def _secret(password):
+    return password.encode('utf-8')[:MAX_PASSWORD_BYTES]
+
+
+def hash_password(password, rounds=None):
+    """bcrypt heşi (pharmacy_staff.password üçün mətn)"""
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_secret(password), salt).decode('ascii')
+
+
+def is_hashed(stored):
+    return bool(stored) and stored.startswith(BCRYPT_PREFIXES)
+
+
+def hash_rounds(stored):
+    """$2b$12$... -> 12"""
+    try:
+        return int(stored.split('$')[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def verify_password(password, stored):
+    """(uyğundur, yenidən heşlənməlidir)"""
+    if not stored:
+        return False, False
+    if not is_hashed(stored):
+        # Köhnə açıq mətnli şifrə
+        matched = hmac.compare_digest(password.encode('utf-8'), stored.encode('utf-8'))
+        return matched, matched
+    try:
+        matched = bcrypt.checkpw(_secret(password), stored.encode('ascii'))
+    except ValueError:
+        return False, False
+    return matched, matched and hash_rounds(stored) < BCRYPT_ROUNDS
+
+
+def _dummy_check(password):
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None:
+        _DUMMY_HASH = hash_password('bioscript-dummy')
+    verify_password(password, _DUMMY_HASH)
+
+
+def upgrade_password(db, staff_id, old_stored, password):
+    """Şifrəni bcrypt heşi ilə əvəz et - yalnız bazadakı dəyər hələ old_stored-dirsə"""
+    new_hash = hash_password(password)
+    with db.transaction() as cursor:
+        updated = cursor.execute(
+            "UPDATE pharmacy_staff SET password = %s WHERE id = %s AND password = %s",
+            (new_hash, staff_id, old_stored))
+    return updated == 1
+
+
+def authenticate(db, username, password):
+    """Aktiv əczaçının məlumatları (şifrəsiz) və ya None - arxa fon thread-ində çağırın"""
+    rows = db.execute_query("""
+        SELECT ps.*, p.name as pharmacy_name, p.id as pharmacy_id,
+               p.current_month_commission, p.commission_rate
+        FROM pharmacy_staff ps
+        JOIN pharmacies p ON ps.pharmacy_id = p.id
+        WHERE ps.username = %s AND ps.is_active = 1
+    """, (username,))
+    if rows is None:
+        raise RuntimeError("İstifadəçi məlumatları oxunmadı")
+    if not rows:
+        _dummy_check(password)
+        return None
+
+    user_data = dict(rows[0])
+    stored = user_data.pop('password')
+    matched, needs_rehash = verify_password(password, stored)
+    if not matched:
+        return None
+    if needs_rehash:
+        try:
+            upgrade_password(db, user_data['id'], stored, password)
+        except Exception as e:
+            # Giriş uğurludur - heşləmə növbəti girişdə təkrarlanacaq
+            print(f"Şifrə heşlənmədi ({username}): {e}")
+    return user_data
+
+
+def benchmark(rounds_range=range(8, 15), samples=5, target_ms=None):
+    """Hər cost üçün bir yoxlamanın orta müddəti (ms); target_ms-ə sığan ən böyük cost"""
+    results = {}
+    for rounds in rounds_range:
+        stored = hash_password('benchmark-password', rounds)
+        started = time.perf_counter()
+        for _ in range(samples):
+            verify_password('benchmark-password', stored)
+        results[rounds] = (time.perf_counter() - started) * 1000 / samples
+    fitting = [rounds for rounds, ms in results.items() if target_ms is None or ms <= target_ms]
+    return results, max(fitting) if fitting else min(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bcrypt şifrələri")
+    parser.add_argument('--benchmark', action='store_true', help="Cost-a görə yoxlama müddəti")
+    parser.add_argument('--target-ms', type=float, default=300.0, help="Hədəf yoxlama müddəti (ms)")
+    parser.add_argument('--min-rounds', type=int, default=8)
+    parser.add_argument('--max-rounds', type=int, default=14)
+    parser.add_argument('--samples', type=int, default=5)
+    parser.add_argument('--count-legacy', action='store_true',
+                        help="Hələ açıq mətnli şifrəsi olan əczaçıların sayı")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        results, recommended = benchmark(range(args.min_rounds, args.max_rounds + 1),
+                                         args.samples, args.target_ms)
+        for rounds, ms in results.items():
+            marker = "  <-" if rounds == recommended else ""
+            print(f"cost {rounds:2}: {ms:8.1f} ms{marker}")
+        print(f"\nHədəf {args.target_ms:.0f} ms: PASSWORD_BCRYPT_ROUNDS={recommended} "
+              f"(hazırda {BCRYPT_ROUNDS})")
+        return 0
+
+    if args.count_legacy:
+        db = DatabaseConnection()
+        if not db.connect():
+            print("Verilənlər bazası qoşulma xətası!")
+            return 1
+        try:
+            rows = db.execute_query("""
+                SELECT COUNT(*) as count FROM pharmacy_staff
+                WHERE password IS NOT NULL AND password NOT LIKE '$2_$%'
+            """)
+        finally:
+            db.disconnect()
+        if rows is None:
+            return 1
+        print(f"Açıq mətnli şifrə: {rows[0]['count']} (uğurlu girişdə heşlənir)")
+        return 0
+
+    parser.print_help()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
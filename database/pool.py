@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from collections import deque
+
+import pymysql
+
+
+class PoolTimeoutError(Exception):
+    """Hovuzda boş bağlantı gözləmə müddəti bitdi"""
+
+
+class ConnectionPool:
+    """Məhdud ölçülü, thread-safe MySQL bağlantı hovuzu"""
+
+    def __init__(self, connect_kwargs, max_size=5, idle_timeout=300,
+                 max_lifetime=3600, acquire_timeout=10, ping_after=30):
+        self.connect_kwargs = dict(connect_kwargs)
+        self.max_size = max(1, int(max_size))
+        self.idle_timeout = idle_timeout      # boş dayanan bağlantı neçə saniyədən sonra bağlanır
+        self.max_lifetime = max_lifetime      # bağlantı ümumilikdə neçə saniyə yaşayır
+        self.acquire_timeout = acquire_timeout
+        self.ping_after = ping_after          # bu qədər boş qalıbsa, verməzdən əvvəl ping et
+
+        self._cond = threading.Condition()
+        self._idle = deque()                  # (connection, son istifadə vaxtı)
+        self._created = {}                    # connection -> yaradılma vaxtı
+        self._size = 0                        # açıq bağlantıların ümumi sayı
+        self._closed = False
+
+    def acquire(self):
+        """Hovuzdan bağlantı götür (lazım olsa yenisini aç)"""
+        deadline = time.monotonic() + self.acquire_timeout
+        stale = []
+        conn = None
+        idle_since = None
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Bağlantı hovuzu bağlanıb")
+                stale.extend(self._evict_expired_locked(time.monotonic()))
+                if self._idle:
+                    # Ən son qaytarılanı götür - köhnələr boş qalıb vaxtında bağlansın
+                    conn, idle_since = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"{self.acquire_timeout} saniyə ərzində boş bağlantı tapılmadı")
+                self._cond.wait(remaining)
+
+        for old in stale:
+            self._close_quietly(old)
+
+        if conn is not None:
+            if self._is_healthy(conn, idle_since):
+                return conn
+            # Ölü bağlantını at, yerinə yenisini aç (yer artıq bizimdir)
+            self._forget(conn)
+            self._close_quietly(conn)
+
+        try:
+            return self._open()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn):
+        """Bağlantını hovuza qaytar"""
+        if conn is None:
+            return
+
+        reusable = not conn._closed
+        if reusable:
+            try:
+                # Yarımçıq tranzaksiya növbəti istifadəçiyə keçməsin
+                if not conn.get_autocommit():
+                    conn.rollback()
+                    conn.autocommit(True)
+            except Exception:
+                reusable = False
+
+        now = time.monotonic()
+        with self._cond:
+            if conn not in self._created:
+                # Bu hovuza aid olmayan bağlantı
+                reusable = False
+            expired = now - self._created.get(conn, now) >= self.max_lifetime
+            if reusable and not expired and not self._closed:
+                self._idle.append((conn, now))
+                self._cond.notify()
+                return
+            if self._created.pop(conn, None) is not None:
+                self._size -= 1
+                self._cond.notify()
+
+        self._close_quietly(conn)
+
+    def close_all(self):
+        """Bütün boş bağlantıları bağla və hovuzu dayandır"""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            for conn in idle:
+                self._created.pop(conn, None)
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for conn in idle:
+            self._close_quietly(conn)
+
+    def _open(self):
+        """Yeni fiziki bağlantı aç"""
+        conn = pymysql.connect(**self.connect_kwargs)
+        with self._cond:
+            self._created[conn] = time.monotonic()
+        return conn
+
+    def _is_healthy(self, conn, idle_since):
+        """Yenidən istifadədən əvvəl bağlantını yoxla"""
+        if conn._closed:
+            return False
+        if time.monotonic() - idle_since < self.ping_after:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _evict_expired_locked(self, now):
+        """Çox boş qalmış və ya ömrü bitmiş bağlantıları hovuzdan çıxar"""
+        kept = deque()
+        evicted = []
+        for conn, last_used in self._idle:
+            too_idle = now - last_used >= self.idle_timeout
+            too_old = now - self._created.get(conn, now) >= self.max_lifetime
+            if too_idle or too_old:
+                evicted.append(conn)
+                self._created.pop(conn, None)
+            else:
+                kept.append((conn, last_used))
+        if evicted:
+            self._idle = kept
+            self._size -= len(evicted)
+        return evicted
+
+    def _forget(self, conn):
+        with self._cond:
+            self._created.pop(conn, None)
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass  # Artıq bağlıdırsa xəta yaranmaz
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Dashboard və satış ekranlarının sorğuları.
+
+Funksiyalar birinci arqument kimi qoşulmuş DatabaseConnection alır və
+Qt-dən asılı deyil, ona görə arxa fon thread-lərində işlədilə bilər.
+"""
+
+from datetime import date, datetime, time
+
+from database.dimensions import dimensions
+
+
+def _fetch(db, query, params=None):
+    """Sorğunu icra et, xəta olduqda istisna at"""
+    rows = db.execute_query(query, params)
+    if rows is None:
+        raise RuntimeError("Sorğu icra edilə bilmədi")
+    return rows
+
+
+def month_range(day):
+    """Ayın [başlanğıc, növbəti ayın başlanğıcı) aralığı"""
+    month_start = datetime.combine(day.replace(day=1), time.min)
+    if month_start.month == 12:
+        next_month = month_start.replace(year=month_start.year + 1, month=1)
+    else:
+        next_month = month_start.replace(month=month_start.month + 1)
+    return month_start, next_month
+
+
+def fetch_dashboard_stats(db, pharmacy_id, today=None):
+    """Bu günkü və bu aylıq satış statistikası - bir sorğu ilə.
+
+    Satışların özü deyil, pharmacy_daily_sales cədvəlindəki günlük
+    yekunlar oxunur: ay ərzində ən çox 31 sətir, primary key üzrə.
+    """
+    today = today or date.today()
+    month_start, next_month = month_range(today)
+
+    query = """
+        SELECT COALESCE(SUM(CASE WHEN day = %s THEN total_price END), 0) as today_total,
+               COALESCE(SUM(total_price), 0) as month_total,
+               COALESCE(SUM(sale_count), 0) as month_count,
+               COALESCE(SUM(commission_amount), 0) as month_commission
+        FROM pharmacy_daily_sales
+        WHERE pharmacy_id = %s AND day >= %s AND day < %s
+    """
+    result = _fetch(db, query, (today, pharmacy_id, month_start.date(), next_month.date()))
+    row = result[0] if result else {}
+
+    return {
+        'today_total': float(row.get('today_total') or 0),
+        'month_total': float(row.get('month_total') or 0),
+        'month_count': int(row.get('month_count') or 0),
+        'month_commission': float(row.get('month_commission') or 0),
+    }
+
+
+def fetch_recent_sales(db, pharmacy_id, limit=10):
+    """Aptekin son satışları"""
+    query = """
+        SELECT dl.*, p.name as patient_name
+        FROM dispensing_logs dl
+        JOIN patients p ON dl.patient_id = p.id
+        WHERE dl.pharmacy_id = %s
+        ORDER BY dl.dispensed_at DESC
+        LIMIT %s
+    """
+    return _fetch(db, query, (pharmacy_id, limit))
+
+
+def fetch_new_sales(db, pharmacy_id, after_id, limit=10):
+    """Son görülən dispensing_logs.id-dən sonrakı satışlar (yenidən köhnəyə).
+
+    (pharmacy_id) indeksi InnoDB-də primary key ilə tamamlanır, ona görə
+    "id > after_id" indeksdə aralıq oxunuşudur - adətən heç bir sətir qaytarmır.
+    """
+    query = """
+        SELECT dl.*, p.name as patient_name
+        FROM dispensing_logs dl
+        JOIN patients p ON dl.patient_id = p.id
+        WHERE dl.pharmacy_id = %s AND dl.id > %s
+        ORDER BY dl.id DESC
+        LIMIT %s
+    """
+    return _fetch(db, query, (pharmacy_id, after_id, limit))
+
+
+def fetch_sale_details(db, sale_id):
+    """Bir satışın təfərrüatları - dispensing_logs primary key üzrə"""
+    query = """
+        SELECT dl.*, p.name as patient_name, pr.diagnosis, pr.complaint,
+               (SELECT GROUP_CONCAT(CONCAT_WS(' - ', pi.name, pi.dosage, pi.instructions)
+                                    ORDER BY pi.id SEPARATOR ', ')
+                FROM prescription_items pi
+                WHERE pi.prescription_id = dl.prescription_id) as medications
+        FROM dispensing_logs dl
+        JOIN patients p ON dl.patient_id = p.id
+        JOIN prescriptions pr ON dl.prescription_id = pr.id
+        WHERE dl.id = %s
+    """
+    rows = _fetch(db, query, (sale_id,))
+    return rows[0] if rows else None
+
+
+def fetch_active_prescriptions_page(db, after=None, limit=50):
+    """Aktiv reseptlərin bir səhifəsi (keyset səhifələmə).
+
+    after - əvvəlki səhifənin son sətrinin (issued_at, id) cütü. OFFSET
+    istifadə olunmur, ona görə hər səhifə indeksdən birbaşa oxunur.
+    """
+    keyset = ""
+    params = []
+    if after is not None:
+        issued_at, prescription_id = after
+        keyset = "AND (p.issued_at < %s OR (p.issued_at = %s AND p.id < %s))"
+        params.extend([issued_at, issued_at, prescription_id])
+    params.append(limit)
+
+    query = f"""
+        SELECT p.*, pat.name as patient_name
+        FROM prescriptions p
+        JOIN patients pat ON p.patient_id = pat.id
+        WHERE p.status = 'active' {keyset}
+        ORDER BY p.issued_at DESC, p.id DESC
+        LIMIT %s
+    """
+    return dimensions.ensure(db, _fetch(db, query, params))
+
+
+def search_active_prescriptions(db, term, limit=50):
+    """Pasiyentin FİN kodu, ID-si və ya adının əvvəli ilə aktiv reseptləri tap.
+
+    Əvvəlcə pasiyentlər unikal fin_code, primary key və idx_patient_name
+    indeksləri ilə tapılır, sonra onların aktiv reseptləri
+    (status, patient_id) indeksi ilə seçilir.
+    """
+    term = term.strip()
+    # LIKE xüsusi simvolları adi simvol kimi axtarılsın
+    name_prefix = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+    query = """
+        SELECT p.*, pat.name as patient_name
+        FROM (
+            SELECT id, name FROM patients WHERE fin_code = %s
+            UNION
+            SELECT id, name FROM patients WHERE id = %s
+            UNION
+            (SELECT id, name FROM patients WHERE name LIKE %s ORDER BY name LIMIT %s)
+        ) pat
+        JOIN prescriptions p ON p.patient_id = pat.id AND p.status = 'active'
+        ORDER BY p.issued_at DESC, p.id DESC
+        LIMIT %s
+    """
+    return dimensions.ensure(db, _fetch(db, query, (term, term, name_prefix, limit, limit)))
+
+
+def fetch_patient_active_prescriptions(db, patient_id, limit=50):
+    """Bir pasiyentin (məs. barmaq izi ilə tanınmış) aktiv reseptləri.
+
+    patient_id axtarış mətni kimi yox, dəqiq filtr kimi verilir -
+    (status, patient_id) indeksi ilə oxunur.
+    """
+    query = """
+        SELECT p.*, pat.name as patient_name
+        FROM prescriptions p
+        JOIN patients pat ON p.patient_id = pat.id
+        WHERE p.patient_id = %s AND p.status = 'active'
+        ORDER BY p.issued_at DESC, p.id DESC
+        LIMIT %s
+    """
+    return dimensions.ensure(db, _fetch(db, query, (patient_id, limit)))
+
+
+def fetch_prescription_items(db, prescription_ids):
+    """Bir neçə reseptin dərmanları bir sorğu ilə: {resept_id: [dərmanlar]}"""
+    prescription_ids = list(prescription_ids)
+    if not prescription_ids:
+        return {}
+
+    placeholders = ", ".join(["%s"] * len(prescription_ids))
+    query = f"""
+        SELECT * FROM prescription_items
+        WHERE prescription_id IN ({placeholders})
+        ORDER BY prescription_id, id
+    """
+    rows = _fetch(db, query, prescription_ids)
+
+    items = {prescription_id: [] for prescription_id in prescription_ids}
+    for row in rows:
+        items[row['prescription_id']].append(row)
+    return items
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Satışın MySQL-ə yazılması, yerli satış növbəsi və aktiv reseptlərin yerli surəti.
+
+Server əlçatandırsa satış dərhal, record_sale() ilə bir tranzaksiyada
+yazılır və əczaçı nəticəni (o cümlədən "resept artıq satılıb") satışı
+təsdiqləməzdən əvvəl görür. Yalnız bağlantı olmadıqda satış yerli növbəyə
+düşür. Növbədəki satışlar paketlə, bir tranzaksiyada yazılır: client_sale_key
+artıq dispensing_logs-da varsa satış təkrar yazılmır, qalanları bir
+çoxsətirli INSERT ilə əlavə olunur, günlük yekun, resept statusu və aptek
+komisyonu isə satış-satış deyil, çoxluq əmrləri ilə yenilənir.
+
+Resept yalnız serverdə hələ 'active'-dirsə satılır. Satış növbədə
+gözləyərkən başqa terminal eyni resepti satmış ola bilər - belə satış
+yazılmır, konflikt kimi yerli anbara köçürülür və əczaçıya göstərilir.
+"""
+
+from itertools import chain
+
+import pymysql
+
+from database.dimensions import dimensions
+
+INSERT_COLUMNS = ('client_sale_key', 'prescription_id', 'pharmacy_id', 'staff_id', 'patient_id',
+                  'total_price', 'commission_amount', 'dispensed_at')
+
+MIRROR_PRESCRIPTIONS_QUERY = """
+    SELECT p.*, pat.name as patient_name, pat.fin_code as patient_fin_code
+    FROM prescriptions p
+    JOIN patients pat ON p.patient_id = pat.id
+    WHERE p.status = 'active'
+"""
+
+MIRROR_ITEMS_QUERY = """
+    SELECT pi.*
+    FROM prescription_items pi
+    JOIN prescriptions p ON p.id = pi.prescription_id
+    WHERE p.status = 'active'
+"""
+
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+
+def replay_sales(db, sales):
+    """Satış paketini bir tranzaksiyada yaz.
+
+    Qaytarır: (yeni yazılmış açarlar, artıq mövcud olan açarlar,
+    resepti artıq aktiv olmayan - yazılmamış açarlar).
+    Xəta olduqda heç nə yazılmır və istisna atılır.
+    """
+    keys = [sale['client_sale_key'] for sale in sales]
+    if not keys:
+        return [], [], []
+
+    with db.transaction() as cursor:
+        # Mövcud açarları kilidlə - paralel göndərilən eyni satış ikinci dəfə yazılmasın
+        cursor.execute(f"""
+            SELECT client_sale_key FROM dispensing_logs
+            WHERE client_sale_key IN ({_placeholders(keys)})
+            FOR UPDATE
+        """, keys)
+        existing = {row['client_sale_key'] for row in cursor.fetchall()}
+        pending = [sale for sale in sales if sale['client_sale_key'] not in existing]
+
+        new_sales = []
+        conflicts = []
+        if pending:
+            # Hələ aktiv olan reseptləri kilidlə - başqa terminal eyni anda sata bilməsin
+            requested = sorted({sale['prescription_id'] for sale in pending})
+            cursor.execute(f"""
+                SELECT id FROM prescriptions
+                WHERE id IN ({_placeholders(requested)}) AND status = 'active'
+                FOR UPDATE
+            """, requested)
+            available = {row['id'] for row in cursor.fetchall()}
+            for sale in pending:
+                if sale['prescription_id'] in available:
+                    available.discard(sale['prescription_id'])  # paketdə eyni resept iki dəfə
+                    new_sales.append(sale)
+                else:
+                    conflicts.append(sale)
+
+        if new_sales:
+            new_keys = [sale['client_sale_key'] for sale in new_sales]
+            key_list = _placeholders(new_keys)
+            prescription_ids = sorted(sale['prescription_id'] for sale in new_sales)
+
+            # Status yalnız 'active'-dən dəyişir; sətir sayı tutmursa heç nə yazılmır
+            updated = cursor.execute(f"""
+                UPDATE prescriptions SET status = 'partially_dispensed'
+                WHERE id IN ({_placeholders(prescription_ids)}) AND status = 'active'
+            """, prescription_ids)
+            if updated != len(prescription_ids):
+                raise RuntimeError(f"Reseptlərin statusu dəyişdi ({updated}/{len(prescription_ids)})")
+
+            # Tək çoxsətirli INSERT - eyni tranzaksiyanın içində
+            db.execute_many(f"""
+                INSERT INTO dispensing_logs ({', '.join(INSERT_COLUMNS)})
+                VALUES ({_placeholders(INSERT_COLUMNS)})
+            """, (tuple(sale[column] for column in INSERT_COLUMNS) for sale in new_sales),
+                chunk_size=len(new_sales))
+
+            cursor.execute(f"""
+                INSERT INTO pharmacy_daily_sales
+                (pharmacy_id, day, sale_count, total_price, commission_amount)
+                SELECT pharmacy_id, DATE(dispensed_at), COUNT(*),
+                       SUM(total_price), SUM(commission_amount)
+                FROM dispensing_logs
+                WHERE client_sale_key IN ({key_list})
+                GROUP BY pharmacy_id, DATE(dispensed_at)
+                ON DUPLICATE KEY UPDATE
+                    sale_count = pharmacy_daily_sales.sale_count + VALUES(sale_count),
+                    total_price = pharmacy_daily_sales.total_price + VALUES(total_price),
+                    commission_amount = pharmacy_daily_sales.commission_amount + VALUES(commission_amount)
+            """, new_keys)
+
+            cursor.execute(f"""
+                UPDATE pharmacies ph
+                JOIN (
+                    SELECT pharmacy_id, SUM(commission_amount) as commission
+                    FROM dispensing_logs
+                    WHERE client_sale_key IN ({key_list})
+                    GROUP BY pharmacy_id
+                ) s ON s.pharmacy_id = ph.id
+                SET ph.current_month_commission = ph.current_month_commission + s.commission
+            """, new_keys)
+
+    return ([sale['client_sale_key'] for sale in new_sales],
+            [key for key in keys if key in existing],
+            [sale['client_sale_key'] for sale in conflicts])
+
+
+# record_sale nəticələri
+SALE_WRITTEN = 'written'      # yazıldı (və ya eyni açarla əvvəlcədən yazılmışdı)
+SALE_CONFLICT = 'conflict'    # resept artıq aktiv deyil - satış yazılmadı
+SALE_QUEUED = 'queued'        # server əlçatmazdır - yerli növbəyə yazıldı
+
+
+def record_sale(db, store, sale):
+    """Bir satışı dərhal yaz - bağlantı xətasında yerli növbəyə keçir.
+
+    Digər xətalar (məsələn, məlumat xətası) yuxarı ötürülür: satış nə
+    yazılıb, nə də növbəyə düşüb, əczaçı eyni açarla təkrar cəhd edə bilər.
+    """
+    try:
+        new_keys, duplicate_keys, conflict_keys = replay_sales(db, [sale])
+    except pymysql.err.OperationalError as e:
+        print(f"MySQL əlçatmazdır, satış növbəyə yazılır: {e}")
+        store.enqueue_sale(sale)
+        return SALE_QUEUED
+    if conflict_keys:
+        return SALE_CONFLICT
+    # Oflayn rejimdə bu resept yerli surətdən də satılmasın
+    store.forget_prescription(sale['prescription_id'])
+    return SALE_WRITTEN
+
+
+def _record(store, new_keys, duplicate_keys, conflict_keys):
+    store.mark_synced(new_keys + duplicate_keys)
+    if conflict_keys:
+        store.mark_conflicted(conflict_keys, "Resept artıq aktiv deyil (başqa terminalda satılıb)")
+        print(f"Resepti artıq satılmış satışlar yazılmadı: {', '.join(conflict_keys)}")
+
+
+def sync_pending(db, store, batch_size=200):
+    """Növbədən bir paket göndər.
+
+    Qaytarır: (MySQL-ə yeni yazılan satış sayı, növbədən götürülən satış sayı).
+    Resepti artıq aktiv olmayan satışlar store.mark_conflicted ilə növbədən
+    çıxarılır. Bağlantı xətaları (OperationalError) yuxarı ötürülür - paket
+    növbədə qalır. Paketdəki bir satış rədd edilərsə, satışlar ayrı-ayrı
+    göndərilir ki, qalanları gecikməsin.
+    """
+    sales = store.pending_sales(batch_size)
+    if not sales:
+        return 0, 0
+
+    try:
+        new_keys, duplicate_keys, conflict_keys = replay_sales(db, sales)
+        _record(store, new_keys, duplicate_keys, conflict_keys)
+        return len(new_keys), len(sales)
+    except pymysql.err.OperationalError:
+        raise
+    except Exception as e:
+        if len(sales) == 1:
+            store.mark_failed([sales[0]['client_sale_key']], e)
+            print(f"Satış göndərilmədi ({sales[0]['client_sale_key']}): {e}")
+            return 0, 1
+
+    written = 0
+    for sale in sales:
+        try:
+            new_keys, duplicate_keys, conflict_keys = replay_sales(db, [sale])
+        except pymysql.err.OperationalError:
+            raise
+        except Exception as e:
+            store.mark_failed([sale['client_sale_key']], e)
+            print(f"Satış göndərilmədi ({sale['client_sale_key']}): {e}")
+            continue
+        _record(store, new_keys, duplicate_keys, conflict_keys)
+        written += len(new_keys)
+    return written, len(sales)
+
+
+def refresh_mirror(db, store, chunk_size=1000):
+    """Aktiv reseptlərin və dərmanlarının yerli surətini yenilə"""
+    prescriptions = list(chain.from_iterable(db.stream_query(MIRROR_PRESCRIPTIONS_QUERY,
+                                                             chunk_size=chunk_size)))
+    items = list(chain.from_iterable(db.stream_query(MIRROR_ITEMS_QUERY, chunk_size=chunk_size)))
+    # Oflayn rejimdə həkim/xəstəxana adları da lazımdır
+    dimensions.ensure(db, prescriptions)
+    store.replace_mirror(prescriptions, items, dimensions.names())
+    return len(prescriptions)
@@ -1,7 +1,21 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import argparse
+import random
+import string
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
 from database.connection import DatabaseConnection
+from database.daily_sales import rebuild_daily_sales
+from database.passwords import hash_password
+from fingerprint.template import encode_template, synthetic_minutiae
+
+BENCH_PREFIX = "BENCH"
 
 def create_test_data():
     """Test məlumatları yaradır"""
@@ -29,11 +43,12 @@ def create_test_data():
         staff_query = """
         INSERT IGNORE INTO pharmacy_staff 
         (pharmacy_id, name, role, username, password, is_active) 
-        VALUES 
-        (1, 'Əli Həsənov', 'Baş Əczaçı', 'ali', 'ali123', 1),
-        (1, 'Ayşə Məmmədova', 'Əczaçı', 'ayse', 'ayse123', 1)
+        VALUES (%s, %s, %s, %s, %s, %s)
         """
-        db.execute_query(staff_query)
+        db.execute_many(staff_query, [
+            (1, 'Əli Həsənov', 'Baş Əczaçı', 'ali', hash_password('ali123'), 1),
+            (1, 'Ayşə Məmmədova', 'Əczaçı', 'ayse', hash_password('ayse123'), 1),
+        ])
         print("✓ Test əczaçılar əlavə edildi")
         
         # Test resept əlavə et
@@ -51,12 +66,13 @@ def create_test_data():
         items_query = """
         INSERT IGNORE INTO prescription_items 
         (prescription_id, name, dosage, instructions) 
-        VALUES 
-        (1, 'Panadol', '500mg', '8 saatda bir - 5 gün'),
-        (1, 'Nurofen', '200mg', '12 saatda bir - 3 gün'),
-        (1, 'Vitamin C', '1000mg', 'Gündə bir dənə - 10 gün')
+        VALUES (%s, %s, %s, %s)
         """
-        db.execute_query(items_query)
+        db.execute_many(items_query, [
+            (1, 'Panadol', '500mg', '8 saatda bir - 5 gün'),
+            (1, 'Nurofen', '200mg', '12 saatda bir - 3 gün'),
+            (1, 'Vitamin C', '1000mg', 'Gündə bir dənə - 10 gün'),
+        ])
         print("✓ Test dərmanlar əlavə edildi")
         
         print("\n🎉 Bütün test məlumatları uğurla yaradıldı!")
@@ -71,5 +87,220 @@ def create_test_data():
     finally:
         db.disconnect()
 
+
+def _bulk_insert(db, query, rows, batch_size, label):
+    """Sətirləri hissə-hissə yaz (hər hissə ayrıca commit olunur)"""
+    started = time.monotonic()
+
+    def progress(written):
+        elapsed = time.monotonic() - started
+        print(f"\r  {label}: {written} sətir ({written / max(elapsed, 0.001):.0f} sətir/s)", end="", flush=True)
+
+    written = db.execute_many(query, rows, chunk_size=batch_size, transaction=False, progress=progress)
+    print()
+    return written
+
+
+def _fin_code(n):
+    """7 simvolluq unikal FİN kodu: Z + 6 simvol base36"""
+    digits = string.digits + string.ascii_uppercase
+    code = ""
+    for _ in range(6):
+        n, rest = divmod(n, 36)
+        code = digits[rest] + code
+    return "Z" + code
+
+
+def _reference_ids(db, table, create_query, params):
+    """Mövcud həkim/xəstəxana ID-ləri; yoxdursa bir ədəd yarat"""
+    rows = db.execute_query(f"SELECT id FROM {table}")
+    if rows:
+        return [row['id'] for row in rows]
+    return [db.execute_insert(create_query, params)]
+
+
+def generate_large_dataset(db, pharmacies=5, patients=50000, prescriptions=100000,
+                           active_ratio=0.3, items_per_prescription=3, sales=1000000,
+                           days=365, batch_size=5000, seed=42):
+    """Benchmark üçün böyük həcmli sintetik məlumat yarat.
+
+    Pasiyent ID-ləri BENCH prefiksi ilə başlayır; təkrar işə salındıqda
+    mövcud pasiyent və apteklər saxlanılır, resept və satışlar əlavə olunur.
+    Sonda pharmacy_daily_sales yekunları yenidən hesablanır.
+    """
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    first_names = ["Əli", "Vəli", "Aysel", "Nərmin", "Rəşad", "Leyla", "Orxan", "Günel", "Tural", "Səbinə"]
+    last_names = ["Həsənov", "Məmmədov", "Əliyev", "Quliyev", "Hüseynov", "İsmayılov", "Kərimov", "Rzayev"]
+    medicines = [("Panadol", "500mg"), ("Nurofen", "200mg"), ("Vitamin C", "1000mg"), ("Amoksisillin", "500mg"),
+                 ("Aspirin", "100mg"), ("Omeprazol", "20mg"), ("Loratadin", "10mg"), ("Metformin", "850mg")]
+
+    print("Apteklər və əczaçılar...")
+    # Aptek, əczaçı və həkim hesabları eyni parolla - hash bir dəfə hesablanır
+    bench_password = hash_password('bench123')
+    for n in range(1, pharmacies + 1):
+        db.execute_insert("""
+            INSERT IGNORE INTO pharmacies
+            (name, address, phone, license_number, username, password, commission_rate, is_active)
+            VALUES (%s, 'Bakı şəhəri', '+994500000000', %s, %s, %s, 3.00, 1)
+        """, (f"Benchmark Aptek {n}", f"BENCH-PH{n:03d}", f"bench_aptek{n}", bench_password))
+    pharmacy_rows = db.execute_query(
+        "SELECT id FROM pharmacies WHERE username LIKE 'bench\\_aptek%' ORDER BY id")
+    pharmacy_ids = [row['id'] for row in pharmacy_rows]
+    for index, pharmacy_id in enumerate(pharmacy_ids, 1):
+        db.execute_insert("""
+            INSERT IGNORE INTO pharmacy_staff (pharmacy_id, name, role, username, password, is_active)
+            SELECT %s, 'Benchmark Əczaçı', 'Əczaçı', %s, %s, 1
+            FROM DUAL WHERE NOT EXISTS (SELECT 1 FROM pharmacy_staff WHERE username = %s)
+        """, (pharmacy_id, f"bench_staff{index}", bench_password, f"bench_staff{index}"))
+    staff_rows = db.execute_query(
+        "SELECT id, pharmacy_id FROM pharmacy_staff WHERE username LIKE 'bench\\_staff%'")
+    staff_by_pharmacy = {row['pharmacy_id']: row['id'] for row in staff_rows}
+
+    hospital_ids = _reference_ids(db, "hospitals", """
+        INSERT INTO hospitals (name, address, license_number) VALUES (%s, %s, %s)
+    """, ("Benchmark Xəstəxana", "Bakı şəhəri", "BENCH-H001"))
+    doctor_ids = _reference_ids(db, "doctors", """
+        INSERT INTO doctors (name, surname, username, password, hospital_id) VALUES (%s, %s, %s, %s, %s)
+    """, ("Benchmark", "Həkim", "bench_doctor", bench_password, hospital_ids[0]))
+
+    print(f"{patients} pasiyent...")
+    patient_ids = [f"{BENCH_PREFIX}{n:07d}" for n in range(1, patients + 1)]
+    _bulk_insert(db, """
+        INSERT IGNORE INTO patients (id, name, fin_code, birth_date)
+        VALUES (%s, %s, %s, %s)
+    """, ((patient_id, f"{rng.choice(first_names)} {rng.choice(last_names)}", _fin_code(n),
+           (now - timedelta(days=rng.randint(365 * 5, 365 * 80))).date())
+          for n, patient_id in enumerate(patient_ids, 1)),
+        batch_size, "patients")
+
+    first_id = (db.execute_query("SELECT COALESCE(MAX(id), 0) as max_id FROM prescriptions")[0]['max_id']) + 1
+    prescription_ids = range(first_id, first_id + prescriptions)
+    # Hər reseptin pasiyenti və statusu əvvəlcədən seçilir - satışlar onlara istinad edir
+    prescription_patient = [rng.choice(patient_ids) for _ in prescription_ids]
+    active = [rng.random() < active_ratio for _ in prescription_ids]
+
+    print(f"{prescriptions} resept ({active_ratio:.0%} aktiv)...")
+
+    def prescription_rows():
+        for offset, prescription_id in enumerate(prescription_ids):
+            issued_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+            yield (prescription_id, rng.choice(doctor_ids), prescription_patient[offset],
+                   rng.choice(hospital_ids), 'active' if active[offset] else 'partially_dispensed',
+                   issued_at, issued_at + timedelta(days=30), "Benchmark şikayət", "Benchmark diaqnoz")
+
+    _bulk_insert(db, """
+        INSERT INTO prescriptions
+        (id, doctor_id, patient_id, hospital_id, status, issued_at, expires_at, complaint, diagnosis)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, prescription_rows(), batch_size, "prescriptions")
+
+    def item_rows():
+        for prescription_id in prescription_ids:
+            for name, dosage in rng.sample(medicines, min(items_per_prescription, len(medicines))):
+                yield (prescription_id, name, dosage, "Gündə iki dəfə")
+
+    _bulk_insert(db, """
+        INSERT INTO prescription_items (prescription_id, name, dosage, instructions)
+        VALUES (%s, %s, %s, %s)
+    """, item_rows(), batch_size, "prescription_items")
+
+    print(f"{sales} satış...")
+    dispensed = [offset for offset, is_active in enumerate(active) if not is_active] or list(range(prescriptions))
+
+    def sale_rows():
+        for _ in range(sales):
+            offset = rng.choice(dispensed)
+            pharmacy_id = rng.choice(pharmacy_ids)
+            total_price = round(rng.uniform(2, 150), 2)
+            yield (prescription_ids[offset], pharmacy_id, staff_by_pharmacy[pharmacy_id],
+                   prescription_patient[offset], total_price, round(total_price * 0.03, 2),
+                   now - timedelta(seconds=rng.randint(0, days * 86400)))
+
+    _bulk_insert(db, """
+        INSERT INTO dispensing_logs
+        (prescription_id, pharmacy_id, staff_id, patient_id, total_price, commission_amount, dispensed_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, sale_rows(), batch_size, "dispensing_logs")
+
+    print("Günlük yekunlar yenidən hesablanır...")
+    for pharmacy_id in pharmacy_ids:
+        rebuild_daily_sales(db, pharmacy_id=pharmacy_id)
+
+    print(f"\n🎉 Benchmark məlumatları hazırdır. Apteklər: {pharmacy_ids}")
+    print("Login: bench_staff1 / bench123")
+    return pharmacy_ids
+
+
+def generate_fingerprints(db, limit=None, batch_size=5000, seed=42):
+    """Barmaq izi olmayan pasiyentlərə sintetik şablon yaz (finger = 0).
+
+    Simulyasiya edilmiş oxuyucu (FINGERPRINT_DEVICE=simulated) bu
+    şablonların təhrif olunmuş surətlərini "oxuyur".
+    """
+    rng = np.random.default_rng(seed)
+    query = """
+        SELECT p.id FROM patients p
+        LEFT JOIN patient_fingerprints f ON f.patient_id = p.id
+        WHERE f.id IS NULL
+        ORDER BY p.id
+    """
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    patient_ids = [row['id'] for rows in db.stream_query(query) for row in rows]
+    print(f"{len(patient_ids)} pasiyent üçün barmaq izi...")
+
+    def fingerprint_rows():
+        for patient_id in patient_ids:
+            minutiae = synthetic_minutiae(rng)
+            yield (patient_id, 0, encode_template(minutiae), len(minutiae))
+
+    return _bulk_insert(db, """
+        INSERT IGNORE INTO patient_fingerprints (patient_id, finger, template, minutiae_count)
+        VALUES (%s, %s, %s, %s)
+    """, fingerprint_rows(), batch_size, "patient_fingerprints")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test və benchmark məlumatları yarat")
+    parser.add_argument('--large', action='store_true', help="Böyük həcmli sintetik məlumat yarat")
+    parser.add_argument('--pharmacies', type=int, default=5)
+    parser.add_argument('--patients', type=int, default=50000)
+    parser.add_argument('--prescriptions', type=int, default=100000)
+    parser.add_argument('--active-ratio', type=float, default=0.3, help="Aktiv reseptlərin payı")
+    parser.add_argument('--items', type=int, default=3, help="Hər reseptdə dərman sayı")
+    parser.add_argument('--sales', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=365, help="Satışların yayıldığı gün sayı")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--fingerprints', action='store_true',
+                        help="Barmaq izi olmayan pasiyentlərə sintetik şablon yaz")
+    parser.add_argument('--fingerprint-limit', type=int, help="Ən çox bu qədər pasiyent")
+    args = parser.parse_args()
+
+    if not args.large and not args.fingerprints:
+        return 0 if create_test_data() else 1
+
+    db = DatabaseConnection()
+    if not db.connect():
+        print("Verilənlər bazası qoşulma xətası!")
+        return 1
+    try:
+        if args.large:
+            generate_large_dataset(db, pharmacies=args.pharmacies, patients=args.patients,
+                                   prescriptions=args.prescriptions, active_ratio=args.active_ratio,
+                                   items_per_prescription=args.items, sales=args.sales, days=args.days,
+                                   batch_size=args.batch_size, seed=args.seed)
+        if args.fingerprints:
+            generate_fingerprints(db, limit=args.fingerprint_limit, batch_size=args.batch_size,
+                                  seed=args.seed)
+        return 0
+    except Exception as e:
+        print(f"Benchmark məlumatları yaradarkən xəta: {e}")
+        return 1
+    finally:
+        db.disconnect()
+
+
 if __name__ == "__main__":
-    create_test_data()
\ No newline at end of file
+    sys.exit(main())
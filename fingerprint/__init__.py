@@ -0,0 +1 @@
+# Fingerprint package
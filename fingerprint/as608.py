@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""AS608 optik barmaq izi sensoru (seriya port, ZFM/R30x protokolu).
+
+Paket: EF 01 | ünvan (4 bayt) | növ | uzunluq (2 bayt, məlumat + 2) |
+məlumat | nəzarət cəmi (növ + uzunluq + məlumat baytlarının cəmi, 2 bayt).
+Oxuma ardıcıllığı: GenImg (barmaq qoyulana qədər təkrarlanır) -> Img2Tz
+(şəkildən xarakteristika faylı) -> UpChar (faylın DATA/END paketləri ilə
+ötürülməsi).
+
+Seriya portu ayrıca thread oxuyur və hazır paketləri məhdud növbəyə
+qoyur; capture() növbədən qısa gözləmələrlə oxuyur, ona görə vaxt həddi
+və cancel() (dialoqda ESC) dərhal işləyir, GUI thread-i isə heç vaxt
+port gözləmir.
+
+Xarakteristika faylının formatı istehsalçı tərəfindən açıqlanmayıb.
+decode_characteristics fərz edilən sadə formatı oxuyur: 0-cı bayt nöqtə
+sayı, sonra hər nöqtə üçün x, y (big-endian uint16, piksel) və θ (uint8,
+256 = 2π). Başqa firmware üçün AS608Device-ə öz decoder-ini verin.
+"""
+
+import binascii
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from fingerprint.device import DeviceError, FingerprintDevice
+from fingerprint.template import as_minutiae
+
+HEADER = b'\xef\x01'
+DEFAULT_ADDRESS = 0xFFFFFFFF
+
+# Paket növləri
+COMMAND = 0x01
+DATA = 0x02
+ACK = 0x07
+END = 0x08
+
+# Əmrlər
+GEN_IMAGE = 0x01
+IMAGE_TO_TZ = 0x02
+UPLOAD_CHAR = 0x08
+
+# Cavab kodları
+OK = 0x00
+NO_FINGER = 0x02
+
+CHAR_BUFFER = 1
+CHAR_SIZE = 512          # xarakteristika faylı (bayt)
+DATA_PACKET_SIZE = 128   # sensorun standart DATA paketi
+MAX_PAYLOAD = 256
+
+BAUD_RATE = int(os.getenv('FINGERPRINT_AS608_BAUD', '57600'))
+QUEUE_SIZE = int(os.getenv('FINGERPRINT_AS608_QUEUE_SIZE', '64'))
+COMMAND_TIMEOUT = 2.0    # bir əmrin cavabı üçün
+READ_TIMEOUT = 0.05      # oxuyan thread stop-u bu qədər gec görür
+
+Packet = namedtuple('Packet', 'kind payload')
+
+
+def build_packet(kind, payload, address=DEFAULT_ADDRESS):
+    body = struct.pack('>BH', kind, len(payload) + 2) + bytes(payload)
+    return HEADER + struct.pack('>I', address) + body + struct.pack('>H', sum(body) & 0xFFFF)
+
+
+def command_packet(instruction, *params, address=DEFAULT_ADDRESS):
+    return build_packet(COMMAND, bytes((instruction,) + params), address)
+
+
+class PacketParser:
+    """Bayt axınından paketləri ayır; yarımçıq paket növbəti feed()-ə qalır"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.errors = 0
+
+    def feed(self, data):
+        buffer = self._buffer
+        buffer += data
+        packets = []
+        while True:
+            start = buffer.find(HEADER)
+            if start < 0:
+                # Başlığın ilk baytı sonda ola bilər
+                del buffer[:len(buffer) - 1 if buffer.endswith(HEADER[:1]) else len(buffer)]
+                break
+            del buffer[:start]
+            if len(buffer) < 9:
+                break
+            kind, length = struct.unpack('>BH', buffer[6:9])
+            if not 2 <= length <= MAX_PAYLOAD + 2:
+                # Səhv başlıq (məlumatın içində EF 01) - bir bayt sürüş
+                self.errors += 1
+                del buffer[:1]
+                continue
+            total = 9 + length
+            if len(buffer) < total:
+                break
+            body = bytes(buffer[6:total - 2])
+            checksum, = struct.unpack('>H', buffer[total - 2:total])
+            if sum(body) & 0xFFFF != checksum:
+                self.errors += 1
+                del buffer[:1]
+                continue
+            packets.append(Packet(kind, body[3:]))
+            del buffer[:total]
+        return packets
+
+
+def decode_characteristics(data):
+    """Fərz edilən xarakteristika formatı -> (N, 3) minutiae"""
+    if not data:
+        raise DeviceError("Sensor boş xarakteristika faylı göndərdi")
+    count = data[0]
+    if 1 + count * 5 > len(data):
+        raise DeviceError(f"Xarakteristika faylı qısadır ({len(data)} bayt, {count} nöqtə)")
+    records = np.frombuffer(data, dtype=np.dtype([('x', '>u2'), ('y', '>u2'), ('angle', 'u1')]),
+                            count=count, offset=1)
+    theta = records['angle'].astype(np.float32) * (2 * np.pi / 256) - np.pi
+    return as_minutiae(np.column_stack([records['x'], records['y'], theta]))
+
+
+def encode_characteristics(minutiae):
+    """decode_characteristics-in tərsi - replay yazıları və sınaq üçün"""
+    minutiae = as_minutiae(minutiae)[:(CHAR_SIZE - 1) // 5]
+    records = np.zeros(len(minutiae), dtype=np.dtype([('x', '>u2'), ('y', '>u2'), ('angle', 'u1')]))
+    records['x'] = np.clip(np.round(minutiae[:, 0]), 0, 0xFFFF)
+    records['y'] = np.clip(np.round(minutiae[:, 1]), 0, 0xFFFF)
+    records['angle'] = np.round((minutiae[:, 2] + np.pi) * (256 / (2 * np.pi))).astype(np.int64) % 256
+    data = bytes([len(records)]) + records.tobytes()
+    return data.ljust(CHAR_SIZE, b'\x00')
+
+
+class AS608Device(FingerprintDevice):
+    """Seriya portdakı AS608 sensoru - port ayrıca thread-də oxunur"""
+
+    name = "AS608"
+
+    def __init__(self, port, baud_rate=BAUD_RATE, address=DEFAULT_ADDRESS,
+                 decoder=decode_characteristics, queue_size=QUEUE_SIZE, poll_interval=0.1,
+                 record_path=None):
+        self.port = port
+        self.baud_rate = baud_rate
+        self.address = address
+        self.decoder = decoder
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        # Sensorla mübadiləni JSONL kimi yaz - as608_replay ilə təkrar oynatmaq üçün
+        self.record_path = record_path
+        self._serial = None
+        self._reader = None
+        self._packets = None
+        self._error = None
+        self._stop = threading.Event()
+        self._cancelled = threading.Event()
+        self._exchange = None
+
+    def open(self):
+        try:
+            import serial
+        except ImportError as e:
+            raise DeviceError("pyserial quraşdırılmayıb (pip install pyserial)") from e
+        try:
+            self._serial = serial.Serial(self.port, self.baud_rate, timeout=READ_TIMEOUT)
+        except (serial.SerialException, OSError) as e:
+            raise DeviceError(f"{self.port} açılmadı: {e}") from e
+        self._error = None
+        self._stop.clear()
+        self._packets = queue.Queue(maxsize=self.queue_size)
+        self._reader = threading.Thread(target=self._read_loop, name='as608-reader', daemon=True)
+        self._reader.start()
+
+    def close(self):
+        self._stop.set()
+        if self._reader is not None:
+            self._reader.join(timeout=1.0)
+            self._reader = None
+        if self._serial is not None:
+            self._serial.close()
+            self._serial = None
+
+    def cancel(self):
+        self._cancelled.set()
+
+    # --- Oxuyan thread ---
+
+    def _read_loop(self):
+        parser = PacketParser()
+        while not self._stop.is_set():
+            try:
+                data = self._serial.read(max(1, self._serial.in_waiting))
+            except Exception as e:
+                self._error = e
+                self._put(None)  # capture() xətanı görsün
+                return
+            for packet in parser.feed(data):
+                self._put(packet)
+
+    def _put(self, packet):
+        # Növbə doludursa gözlə (istehlakçı gecikir) - amma close()-u blok etmə
+        while not self._stop.is_set():
+            try:
+                self._packets.put(packet, timeout=self.poll_interval)
+                return
+            except queue.Full:
+                continue
+
+    # --- Əmrlər ---
+
+    def _drain(self):
+        """Əvvəlki (ləğv olunmuş) əmrdən qalmış paketləri at"""
+        while True:
+            try:
+                self._packets.get_nowait()
+            except queue.Empty:
+                return
+
+    def _next_packet(self, deadline):
+        while True:
+            if self._cancelled.is_set():
+                raise DeviceError("Oxuma ləğv edildi")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeviceError("Barmaq izi gözləmə vaxtı bitdi")
+            try:
+                packet = self._packets.get(timeout=min(remaining, self.poll_interval))
+            except queue.Empty:
+                continue
+            if packet is None:
+                raise DeviceError(f"Sensorla əlaqə kəsildi: {self._error}")
+            if self._exchange is not None:
+                self._exchange['replies'].append(binascii.hexlify(
+                    build_packet(packet.kind, packet.payload, self.address)).decode('ascii'))
+            return packet
+
+    def _command(self, instruction, *params, deadline):
+        if self._serial is None:
+            raise DeviceError("Sensor açılmayıb")
+        self._drain()
+        packet = command_packet(instruction, *params, address=self.address)
+        self._record_exchange(packet)
+        try:
+            self._serial.write(packet)
+        except Exception as e:
+            raise DeviceError(f"Sensora yazıla bilmədi: {e}") from e
+        reply = self._next_packet(min(deadline, time.monotonic() + COMMAND_TIMEOUT))
+        if reply.kind != ACK or not reply.payload:
+            raise DeviceError(f"Gözlənilməz cavab paketi (növ {reply.kind:#04x})")
+        return reply.payload[0]
+
+    def _record_exchange(self, packet):
+        if not self.record_path:
+            return
+        self._flush_exchange()
+        self._exchange = {'command': binascii.hexlify(packet).decode('ascii'), 'replies': []}
+
+    def _flush_exchange(self):
+        if self._exchange is None:
+            return
+        try:
+            with open(self.record_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(self._exchange) + '\n')
+        except OSError as e:
+            print(f"AS608 yazısı saxlanmadı: {e}")
+        self._exchange = None
+
+    def capture(self, timeout=10.0, progress=None):
+        self._cancelled.clear()
+        report = progress or (lambda text, fraction: None)
+        deadline = time.monotonic() + timeout
+        try:
+            report("Barmağınızı oxuyucu üzərinə qoyun...", 0.0)
+            while True:
+                code = self._command(GEN_IMAGE, deadline=deadline)
+                if code == OK:
+                    break
+                if code != NO_FINGER:
+                    raise DeviceError(f"Sensor şəkil ala bilmədi (kod {code:#04x})")
+                if self._cancelled.wait(self.poll_interval):
+                    raise DeviceError("Oxuma ləğv edildi")
+
+            report("Barmaq izi emal olunur...", 0.3)
+            code = self._command(IMAGE_TO_TZ, CHAR_BUFFER, deadline=deadline)
+            if code != OK:
+                raise DeviceError("Barmaq izi aydın deyil - barmağı yenidən qoyun")
+
+            report("Şablon ötürülür...", 0.4)
+            code = self._command(UPLOAD_CHAR, CHAR_BUFFER, deadline=deadline)
+            if code != OK:
+                raise DeviceError(f"Şablon ötürülmədi (kod {code:#04x})")
+            data = bytearray()
+            while True:
+                packet = self._next_packet(deadline)
+                if packet.kind not in (DATA, END):
+                    raise DeviceError(f"Gözlənilməz paket (növ {packet.kind:#04x})")
+                data += packet.payload
+                report("Şablon ötürülür...", 0.4 + 0.6 * min(1.0, len(data) / CHAR_SIZE))
+                if packet.kind == END:
+                    break
+            return self.decoder(bytes(data))
+        finally:
+            if self.record_path:
+                self._flush_exchange()
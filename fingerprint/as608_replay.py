@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""AS608 sensorunun pseudo-terminal (pty) əvəzedicisi.
+
+Yazılmış mübadilələri (AS608Device(record_path=...) və ya FINGERPRINT_AS608_RECORD
+ilə yaradılan JSONL: {"command": hex, "replies": [hex, ...]}) pty üzərindən
+təkrar oynadır - sensor olmadan oxuyucu yolunu sınamaq üçün. Hər gələn əmrə
+yazıdakı eyni əmrli növbəti mübadilənin cavabları göndərilir; yazı bitibsə
+GenImg-ə "barmaq yoxdur" cavabı verilir (vaxt həddi və ləğv sınağı).
+
+    python -m fingerprint.as608_replay --synthesize 3 > finger.jsonl
+    python -m fingerprint.as608_replay finger.jsonl
+    FINGERPRINT_DEVICE=as608:/dev/pts/N python main.py
+"""
+
+import argparse
+import binascii
+import json
+import os
+import select
+import sys
+import time
+import tty
+
+import numpy as np
+
+from fingerprint.as608 import (ACK, CHAR_BUFFER, COMMAND, DATA, DATA_PACKET_SIZE, END, GEN_IMAGE,
+                               IMAGE_TO_TZ, NO_FINGER, OK, UPLOAD_CHAR, PacketParser, build_packet,
+                               command_packet, encode_characteristics)
+from fingerprint.device import load_template_file
+from fingerprint.template import synthetic_minutiae
+
+
+def _hex(packet):
+    return binascii.hexlify(packet).decode('ascii')
+
+
+def load_recording(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthesize_recording(minutiae, no_finger=3):
+    """Bir oxumanın yazısı: no_finger dəfə "barmaq yoxdur", sonra şablonun ötürülməsi"""
+    exchanges = [{'command': _hex(command_packet(GEN_IMAGE)),
+                  'replies': [_hex(build_packet(ACK, bytes([NO_FINGER])))]} for _ in range(no_finger)]
+    exchanges.append({'command': _hex(command_packet(GEN_IMAGE)), 'replies': [_hex(build_packet(ACK, bytes([OK])))]})
+    exchanges.append({'command': _hex(command_packet(IMAGE_TO_TZ, CHAR_BUFFER)),
+                      'replies': [_hex(build_packet(ACK, bytes([OK])))]})
+    data = encode_characteristics(minutiae)
+    replies = [_hex(build_packet(ACK, bytes([OK])))]
+    for start in range(0, len(data), DATA_PACKET_SIZE):
+        chunk = data[start:start + DATA_PACKET_SIZE]
+        replies.append(_hex(build_packet(END if start + DATA_PACKET_SIZE >= len(data) else DATA, chunk)))
+    exchanges.append({'command': _hex(command_packet(UPLOAD_CHAR, CHAR_BUFFER)), 'replies': replies})
+    return exchanges
+
+
+class Replayer:
+    """Gələn əmrlərə yazıdan cavab seç"""
+
+    def __init__(self, exchanges, loop=False):
+        self.exchanges = [(bytes.fromhex(item['command'])[9], [bytes.fromhex(reply) for reply in item['replies']])
+                          for item in exchanges]
+        self.loop = loop
+        self.position = 0
+
+    def replies(self, instruction):
+        for attempt in range(2):
+            for offset in range(self.position, len(self.exchanges)):
+                recorded, replies = self.exchanges[offset]
+                if recorded == instruction:
+                    self.position = offset + 1
+                    return replies
+            if not self.loop:
+                break
+            self.position = 0
+        if instruction == GEN_IMAGE:
+            return [build_packet(ACK, bytes([NO_FINGER]))]
+        return []
+
+
+def serve(replayer, packet_delay=0.0, ready=None):
+    """pty aç, slave yolunu çap et və əmrlərə cavab ver (Ctrl+C ilə dayandır)"""
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    path = os.ttyname(slave)
+    if ready is not None:
+        ready(path)
+    parser = PacketParser()
+    try:
+        while True:
+            readable, _, _ = select.select([master], [], [], 0.5)
+            if not readable:
+                continue
+            try:
+                data = os.read(master, 4096)
+            except OSError:
+                continue  # oxuyucu bağlandı - yenisini gözlə
+            for packet in parser.feed(data):
+                if packet.kind != COMMAND or not packet.payload:
+                    continue
+                for reply in replayer.replies(packet.payload[0]):
+                    if packet_delay:
+                        time.sleep(packet_delay)
+                    os.write(master, reply)
+    finally:
+        os.close(master)
+        os.close(slave)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AS608 sensorunun pty əvəzedicisi")
+    parser.add_argument('recording', nargs='?', help="JSONL mübadilə yazısı")
+    parser.add_argument('--synthesize', type=int, metavar='N',
+                        help="Yazı yarat (N dəfə 'barmaq yoxdur', sonra şablon) və stdout-a çap et")
+    parser.add_argument('--template', help="Sintez üçün .npy/.json şablon (standart: təsadüfi)")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--loop', action='store_true', help="Yazı bitəndə əvvəldən başla")
+    parser.add_argument('--packet-delay', type=float, default=0.0, help="Paketlər arası gecikmə (saniyə)")
+    args = parser.parse_args()
+
+    if args.synthesize is not None:
+        minutiae = (load_template_file(args.template) if args.template
+                    else synthetic_minutiae(np.random.default_rng(args.seed)))
+        for exchange in synthesize_recording(minutiae, args.synthesize):
+            print(json.dumps(exchange))
+        return 0
+    if not args.recording:
+        parser.error("yazı faylı və ya --synthesize lazımdır")
+
+    replayer = Replayer(load_recording(args.recording), loop=args.loop)
+    try:
+        serve(replayer, args.packet_delay,
+              ready=lambda path: print(f"AS608 əvəzedicisi: FINGERPRINT_DEVICE=as608:{path}", flush=True))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Barmaq izi identifikasiyasının qalereya ölçüsünə görə benchmark-ı.
+
+Müvəqqəti anbara sintetik şablonlar hissə-hissə (yenidən qurmadan)
+əlavə olunur; hər ölçüdə tanınmış (qeydiyyatdakı barmağın təhrif
+olunmuş surəti) və naməlum barmaqlar həm indekslə, həm də bütün
+qalereyanı müqayisə etməklə (bir prosesdə və --workers ilə işçi
+proseslərdə) yoxlanılır. Gecikmə (p50/p95), rank-1 dəqiqliyi və yanlış
+qəbullar çap edilir. MySQL lazım deyil:
+
+    python -m fingerprint.benchmark --sizes 1000 10000 50000 --probes 100
+    python -m fingerprint.benchmark --sizes 50000 --workers 4 --json fingerprint_bench.json
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from fingerprint.matcher import TemplateGallery
+from fingerprint.parallel import ParallelScorer
+from fingerprint.store import TemplateStore
+from fingerprint.template import distort, synthetic_minutiae
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))]
+
+
+def enroll_synthetic(gallery, start, stop, rng, batch_size=1000):
+    """start..stop pasiyentləri üçün sintetik şablonları anbara əlavə et, saniyə qaytar"""
+    elapsed = 0.0
+    for batch_start in range(start, stop, batch_size):
+        batch_stop = min(stop, batch_start + batch_size)
+        entries = [(index + 1, f"P{index:07d}", synthetic_minutiae(rng))
+                   for index in range(batch_start, batch_stop)]
+        started = time.perf_counter()
+        gallery.add(entries, max_id=batch_stop)
+        elapsed += time.perf_counter() - started
+    return elapsed
+
+
+def make_probes(gallery, count, rng):
+    """Yarısı tanınmış (gözlənilən patient_id), yarısı naməlum (None)"""
+    probes = []
+    for number in range(count):
+        if number % 2 == 0:
+            patient_id, minutiae = gallery.template(int(rng.integers(len(gallery))))
+            probes.append((patient_id, distort(minutiae, rng)))
+        else:
+            probes.append((None, synthetic_minutiae(rng)))
+    return probes
+
+
+def measure(gallery, probes, use_index):
+    timings = []
+    scored = []
+    correct = known = false_accepts = 0
+    for expected, probe in probes:
+        started = time.perf_counter()
+        result = gallery.identify(probe, use_index=use_index)
+        timings.append((time.perf_counter() - started) * 1000)
+        scored.append(result.scored)
+        if expected is None:
+            false_accepts += result.patient_id is not None
+        else:
+            known += 1
+            correct += result.patient_id == expected
+    return {
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'rank1': round(correct / known, 4) if known else None,
+        'false_accepts': int(false_accepts),
+        'scored': int(np.mean(scored)),
+    }
+
+
+def run(sizes, probes, seed, with_brute_force=True, workers=1):
+    rng = np.random.default_rng(seed)
+    path = tempfile.mkdtemp(prefix='fingerprint_bench_')
+    results = []
+    parallel = ParallelScorer(workers, min_templates=0)
+    try:
+        gallery = TemplateGallery(TemplateStore(path), parallel=ParallelScorer(workers=1))
+        # Eyni anbar, bütün qalereya işçi proseslər arasında bölünür
+        parallel_gallery = TemplateGallery(gallery.store, parallel=parallel)
+        enrolled = 0
+        for size in sorted(sizes):
+            enroll_seconds = enroll_synthetic(gallery, enrolled, size, rng)
+            added = size - enrolled
+            enrolled = size
+            probe_set = make_probes(gallery, probes, rng)
+            result = {
+                'size': size,
+                'enroll_per_template_ms': round(enroll_seconds * 1000 / added, 3) if added else 0.0,
+                'indexed': measure(gallery, probe_set, use_index=True),
+            }
+            if with_brute_force:
+                result['brute_force'] = measure(gallery, probe_set, use_index=False)
+            if workers > 1:
+                result['parallel'] = measure(parallel_gallery, probe_set, use_index=False)
+            results.append(result)
+            print_result(result)
+    finally:
+        parallel.shutdown()
+        shutil.rmtree(path, ignore_errors=True)
+    return results
+
+
+def print_result(result):
+    print(f"{result['size']:>8} şablon  (əlavə: {result['enroll_per_template_ms']:.3f} ms/şablon)")
+    for mode in ('indexed', 'brute_force', 'parallel'):
+        if mode not in result:
+            continue
+        stats = result[mode]
+        print(f"    {mode:12} p50 {stats['p50_ms']:8.2f} ms   p95 {stats['p95_ms']:8.2f} ms   "
+              f"rank-1 {stats['rank1']:.3f}   yanlış qəbul {stats['false_accepts']}   "
+              f"müqayisə {stats['scored']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Barmaq izi identifikasiyası benchmark-ı")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+                        help="Qalereya ölçüləri (artan sıra ilə əlavə olunur)")
+    parser.add_argument('--probes', type=int, default=100, help="Hər ölçüdə yoxlanan barmaq sayı")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-brute-force', action='store_true', help="Yalnız indeksli axtarışı ölç")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Bütün qalereyanı bu qədər prosesdə də ölç (1 - ölçmə)")
+    parser.add_argument('--json', help="Nəticəni bu fayla yaz")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.probes, args.seed, with_brute_force=not args.no_brute_force,
+                  workers=args.workers)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'probes': args.probes, 'seed': args.seed, 'workers': args.workers,
+                       'results': results}, f, indent=2)
+        print(f"\nNəticə yazıldı: {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Barmaq izi oxuyucuları.
+
+Hər oxuyucu capture() ilə minutiae şablonu ((N, 3) massiv) qaytarır;
+şəkil emalı oxuyucunun öz proqram təminatındadır. Oxuyucu FINGERPRINT_DEVICE
+ilə seçilir; standart dəyər yoxdur - oxuyucu seçilməyibsə DeviceError atılır:
+
+  simulated            qeydiyyatdakı şablonlardan birinin təhrif olunmuş surəti
+                       (yalnız sınaq üçün - təsadüfi həqiqi pasiyenti "tanıyır")
+  file:<yol>           .npy / .json şablon faylı; qovluq verilərsə oradakı
+                       ən yeni fayl gözlənilir (xarici oxuma proqramı üçün)
+  as608:<port>         seriya portdakı AS608 sensoru (fingerprint.as608;
+                       FINGERPRINT_AS608_BAUD, FINGERPRINT_AS608_RECORD)
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+from fingerprint.template import as_minutiae, distort, synthetic_minutiae
+
+TEMPLATE_EXTENSIONS = ('.npy', '.json')
+SETUP_HINT = ("Barmaq izi oxuyucusu seçilməyib: .env faylında FINGERPRINT_DEVICE təyin edin "
+              "(as608:/dev/ttyUSB0, file:<yol>; sınaq üçün simulated)")
+
+
+class DeviceError(Exception):
+    """Oxuyucu ilə əlaqə və ya oxuma xətası"""
+
+
+class FingerprintDevice:
+    """Oxuyucu interfeysi - capture() arxa fon thread-ində çağırılır"""
+
+    name = "oxuyucu"
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def capture(self, timeout=10.0, progress=None):
+        """Barmaq qoyulana qədər gözlə və şablonu qaytar; vaxt bitsə DeviceError.
+
+        progress(yazı, 0..1) - oxuma mərhələləri (capture()-in thread-ində çağırılır).
+        """
+        raise NotImplementedError
+
+    def cancel(self):
+        """Gözləyən capture()-i dayandır (dialoq bağlananda)"""
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def load_template_file(path):
+    """.npy və ya .json ([[x, y, θ], ...] və ya {"minutiae": [...]}) şablon faylı"""
+    if path.endswith('.npy'):
+        return as_minutiae(np.load(path))
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('minutiae', [])
+    return as_minutiae(data)
+
+
+class FileDevice(FingerprintDevice):
+    """Fayldan oxuyan oxuyucu - tək fayl və ya yeni faylları gözlənilən qovluq"""
+
+    name = "fayl"
+
+    def __init__(self, path, poll_interval=0.1):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def capture(self, timeout=10.0, progress=None):
+        self._cancelled = False
+        if not os.path.isdir(self.path):
+            try:
+                return load_template_file(self.path)
+            except (OSError, ValueError) as e:
+                raise DeviceError(f"Şablon faylı oxunmadı: {e}") from e
+
+        # Qovluq: capture() başlayandan sonra yazılmış ilk faylı gözlə
+        started = time.time()
+        deadline = time.monotonic() + timeout
+        while not self._cancelled and time.monotonic() < deadline:
+            newest = None
+            for entry in os.scandir(self.path):
+                if entry.name.endswith(TEMPLATE_EXTENSIONS) and entry.stat().st_mtime >= started:
+                    if newest is None or entry.stat().st_mtime > newest.stat().st_mtime:
+                        newest = entry
+            if newest is not None:
+                try:
+                    return load_template_file(newest.path)
+                except (OSError, ValueError):
+                    pass  # fayl hələ yazılır - növbəti dövrdə yenidən
+            time.sleep(self.poll_interval)
+        raise DeviceError("Barmaq izi gözləmə vaxtı bitdi")
+
+
+class SimulatedDevice(FingerprintDevice):
+    """Oxuyucusuz sınaq: qeydiyyatdakı təsadüfi barmağın yenidən oxunması"""
+
+    name = "simulyasiya"
+
+    def __init__(self, gallery=None, delay=1.0, unknown_rate=0.0, seed=None):
+        self.gallery = gallery
+        self.delay = delay
+        self.unknown_rate = unknown_rate
+        self.rng = np.random.default_rng(seed)
+        self.last_patient_id = None  # sınaqda nəticəni yoxlamaq üçün
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def capture(self, timeout=10.0, progress=None):
+        self._cancelled = False
+        # Barmağın qoyulmasını təqlid et
+        started = time.monotonic()
+        duration = min(self.delay, timeout)
+        while time.monotonic() < started + duration:
+            if self._cancelled:
+                raise DeviceError("Oxuma ləğv edildi")
+            if progress is not None:
+                progress("Barmaq izi oxunur...", (time.monotonic() - started) / duration)
+            time.sleep(0.05)
+
+        count = len(self.gallery) if self.gallery is not None else 0
+        if not count or self.rng.random() < self.unknown_rate:
+            self.last_patient_id = None
+            return synthetic_minutiae(self.rng)
+        patient_id, minutiae = self.gallery.template(int(self.rng.integers(count)))
+        self.last_patient_id = patient_id
+        return distort(minutiae, self.rng)
+
+
+def open_device(spec=None, gallery=None):
+    """FINGERPRINT_DEVICE spesifikasiyasına görə oxuyucu"""
+    spec = (spec or os.getenv('FINGERPRINT_DEVICE', '')).strip()
+    if not spec:
+        raise DeviceError(SETUP_HINT)
+    if spec == 'simulated':
+        return SimulatedDevice(gallery, delay=float(os.getenv('FINGERPRINT_SIMULATED_DELAY', '1.0')))
+    if spec.startswith('file:'):
+        return FileDevice(spec[len('file:'):])
+    if spec.startswith('as608:'):
+        from fingerprint.as608 import AS608Device
+        return AS608Device(spec[len('as608:'):], record_path=os.getenv('FINGERPRINT_AS608_RECORD') or None)
+    raise DeviceError(f"Naməlum barmaq izi oxuyucusu: {spec}")
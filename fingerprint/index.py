@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Minutiae təsvirləri üzrə lokal-həssas heşləmə (LSH) indeksi.
+
+Hər təsvir L cədvəlin hər birində k təsadüfi proyeksiyanın kvantlanmış
+qiymətləri ilə bir "səbətə" düşür (p-stabil LSH: ⌊(a·v + b) / w⌋). Yaxın
+təsvirlər çox vaxt eyni səbətə düşür. Yoxlanan barmağın təsvirlərinin
+səbətlərindəki şablonlar səs toplayır, tam müqayisə isə yalnız ən çox səs
+alan namizədlər üçün aparılır.
+
+Hər cədvəl (kod, şablon) cütlərinin koda görə sıralanmış massividir -
+axtarış np.searchsorted ilə vektorlaşdırılıb. Yeni qeydiyyatlar əvvəlcə
+sıralanmamış "quyruğa" əlavə olunur, quyruq böyüyəndə əsas massivlə
+birləşdirilir.
+"""
+
+import threading
+
+import numpy as np
+
+TABLES = 8
+PROJECTIONS = 3
+BUCKET_WIDTH = 0.7
+SEED = 20261018
+TAIL_LIMIT = 4096  # quyruqda bu qədər şablon yığılanda birləşdir
+
+_OFFSET = 1 << 15  # kvantlanmış qiymət 16 bitə sığsın
+
+
+def _ranges(starts, ends):
+    """[starts[i], ends[i]) aralıqlarının birləşmiş indeksləri"""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, np.int64)
+    shifts = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    return shifts + np.arange(total)
+
+
+class LSHIndex:
+    """Şablon nömrələrinin LSH səbətləri"""
+
+    def __init__(self, descriptor_size, tables=TABLES, projections=PROJECTIONS,
+                 width=BUCKET_WIDTH, seed=SEED):
+        self.tables = tables
+        self.projections = projections
+        self.width = width
+        rng = np.random.default_rng(seed)
+        self._a = rng.normal(size=(tables, projections, descriptor_size)).astype(np.float32)
+        self._b = rng.uniform(0, width, size=(tables, projections)).astype(np.float32)
+        self._lock = threading.Lock()
+        self._sorted = [(np.zeros(0, np.uint32), np.zeros(0, np.int32))] * tables
+        self._tail = (np.zeros((0, tables), np.uint32), np.zeros(0, np.int32))
+
+    def hash(self, features):
+        """(n, D) təsvirlər -> (n, L) uint32 səbət kodları"""
+        quantized = np.floor((np.einsum('lkd,nd->nlk', self._a, features) + self._b) / self.width)
+        quantized = (quantized.astype(np.int64) + _OFFSET) & 0xFFFF
+        code = np.zeros(quantized.shape[:2], np.uint64)
+        for projection in range(self.projections):
+            code = code * np.uint64(0x10001) ^ quantized[:, :, projection].astype(np.uint64)
+        # 64 bitlik kodu 32 bitə qatla - toqquşma yalnız bir neçə artıq namizəd deməkdir
+        code ^= code >> np.uint64(29)
+        code *= np.uint64(0x9E3779B97F4A7C15)
+        return (code >> np.uint64(32)).astype(np.uint32)
+
+    @staticmethod
+    def _postings(codes, counts, offset):
+        """(P, M, L) kodlar -> hər cədvəl üçün dolu yerlərin (kod, şablon) cütləri"""
+        filled = np.arange(codes.shape[1])[None, :] < counts[:, None]
+        templates = np.broadcast_to(np.arange(offset, offset + len(codes), dtype=np.int32)[:, None],
+                                    filled.shape)[filled]
+        return codes[filled], templates
+
+    def build(self, codes, counts):
+        """Bütün şablonlardan indeksi yenidən qur"""
+        flat_codes, templates = self._postings(codes, counts, 0)
+        tables = []
+        for table in range(self.tables):
+            order = np.argsort(flat_codes[:, table], kind='stable')
+            tables.append((flat_codes[order, table], templates[order]))
+        with self._lock:
+            self._sorted = tables
+            self._tail = (np.zeros((0, self.tables), np.uint32), np.zeros(0, np.int32))
+
+    def add(self, codes, counts, offset):
+        """Yeni şablonları quyruğa əlavə et (offset - ilk şablonun nömrəsi)"""
+        flat_codes, templates = self._postings(codes, counts, offset)
+        with self._lock:
+            tail_codes = np.concatenate([self._tail[0], flat_codes])
+            tail_templates = np.concatenate([self._tail[1], templates])
+            if len(np.unique(tail_templates)) < TAIL_LIMIT:
+                self._tail = (tail_codes, tail_templates)
+                return
+            tables = []
+            for table, (sorted_codes, sorted_templates) in enumerate(self._sorted):
+                merged_codes = np.concatenate([sorted_codes, tail_codes[:, table]])
+                merged_templates = np.concatenate([sorted_templates, tail_templates])
+                order = np.argsort(merged_codes, kind='stable')
+                tables.append((merged_codes[order], merged_templates[order]))
+            self._sorted = tables
+            self._tail = (np.zeros((0, self.tables), np.uint32), np.zeros(0, np.int32))
+
+    def candidates(self, probe_codes, total, limit):
+        """Ən çox səs alan ≤ limit şablon (səsə görə azalan), səssizlər daxil deyil"""
+        with self._lock:
+            tables = self._sorted
+            tail_codes, tail_templates = self._tail
+
+        hits = []
+        for table, (sorted_codes, sorted_templates) in enumerate(tables):
+            codes = probe_codes[:, table]
+            starts = np.searchsorted(sorted_codes, codes, 'left')
+            ends = np.searchsorted(sorted_codes, codes, 'right')
+            hits.append(sorted_templates[_ranges(starts, ends)])
+            if len(tail_templates):
+                hits.append(tail_templates[np.isin(tail_codes[:, table], codes)])
+        if not hits:
+            return np.zeros(0, np.int64)
+
+        votes = np.bincount(np.concatenate(hits), minlength=total)
+        voted = np.flatnonzero(votes)
+        if len(voted) > limit:
+            voted = voted[np.argpartition(-votes[voted], limit - 1)[:limit]]
+        return voted[np.argsort(-votes[voted], kind='stable')]
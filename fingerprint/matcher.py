@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Qeydiyyatdakı barmaq izləri arasında 1:N identifikasiya.
+
+Şablonlar diskdəki anbarda (fingerprint.store) saxlanılır: hər şablonun
+təsvirləri [−2g, ‖g‖²] sətirləri kimi hazır yazılıb. Yoxlanan barmağın hər
+nöqtəsi üçün hər şablonda ən yaxın təsvir (‖g‖² − 2q·g minimumu) matris
+vurması ilə tapılır. Böyük qalereyada əvvəlcə LSH indeksi (fingerprint.index)
+kiçik namizəd dəstini seçir və tam müqayisə yalnız onlar üçün aparılır.
+Ən yaxşı namizədlər sonra həndəsi uyğunluqla (fırlanma + sürüşmə)
+yoxlanılır; nəticə - ən yüksək balı olan pasiyent və bal həddi keçibsə
+onun ID-si.
+
+Anbar proqram yenidən başlayanda saxlanılır; refresh() yalnız yeni
+qeydiyyatları əlavə edir, indeks yenidən qurulmur.
+"""
+
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from fingerprint.parallel import ParallelScorer
+from fingerprint.store import EMPTY_NORM, PATIENT_ID_SIZE, TemplateStore
+from fingerprint.template import (DESCRIPTOR_SIZE, MAX_MINUTIAE, TemplateError, alignment_score,
+                                  as_minutiae, decode_template, descriptors, encode_template,
+                                  select_minutiae)
+
+# scored - tam müqayisə edilən şablon sayı (indeks işləyəndə qalereyadan çox kiçik)
+MatchResult = namedtuple('MatchResult', 'patient_id score candidates scored')
+
+# İki təsvir arasındakı məsafənin kvadratı bundan kiçikdirsə nöqtələr uyğun sayılır
+DESCRIPTOR_THRESHOLD = float(os.getenv('FINGERPRINT_DESCRIPTOR_THRESHOLD', '0.6'))
+# Həndəsi yoxlamadan sonra qəbul həddi (tanınmış barmaq ~0.7-1.0, başqası < 0.1)
+MATCH_THRESHOLD = float(os.getenv('FINGERPRINT_MATCH_THRESHOLD', '0.4'))
+# Həndəsi yoxlanan namizəd sayı
+SHORTLIST = int(os.getenv('FINGERPRINT_SHORTLIST', '20'))
+# Ara massiv (m × chunk) prosessor keşinə sığsın
+CHUNK_SIZE = int(os.getenv('FINGERPRINT_CHUNK_SIZE', '1024'))
+# 0 - dəqiq rejim: həmişə bütün qalereya müqayisə edilir, FINGERPRINT_PARALLEL_MIN-dən
+# böyük qalereyada işçi proseslərdə. Standart (indeks) rejimində indekssiz müqayisə yalnız
+# INDEX_MIN-dən kiçik qalereyada olur və işçi proseslər başladılmır
+USE_INDEX = os.getenv('FINGERPRINT_USE_INDEX', '1') != '0'
+# Bundan kiçik qalereyada indeks istifadə olunmur - hamısını müqayisə etmək daha sürətlidir
+INDEX_MIN = int(os.getenv('FINGERPRINT_INDEX_MIN', '2000'))
+# İndeksin seçdiyi, tam müqayisə edilən namizəd sayı
+CANDIDATES = int(os.getenv('FINGERPRINT_CANDIDATES', '256'))
+
+
+def pack(entries, index):
+    """[(row_id, patient_id, minutiae)] -> anbar sütunları; yararsız şablonlar buraxılır"""
+    features_list = []
+    kept = []
+    for row_id, patient_id, points in entries:
+        try:
+            features_list.append(descriptors(points))
+        except TemplateError as e:
+            print(f"Barmaq izi şablonu buraxıldı ({patient_id}): {e}")
+            continue
+        kept.append((row_id, patient_id, select_minutiae(as_minutiae(points))))
+
+    total = len(kept)
+    rows = {
+        'patient_ids': np.array([str(patient_id).encode('utf-8') for _, patient_id, _ in kept],
+                                dtype=f'S{PATIENT_ID_SIZE}'),
+        'row_ids': np.array([row_id for row_id, _, _ in kept], dtype=np.int64),
+        'counts': np.zeros(total, np.int16),
+        'minutiae': np.zeros((total, MAX_MINUTIAE, 3), np.float32),
+        'descriptors': np.zeros((total, MAX_MINUTIAE, DESCRIPTOR_SIZE + 1), np.float32),
+        'codes': np.zeros((total, MAX_MINUTIAE, index.tables), np.uint32),
+    }
+    rows['descriptors'][:, :, DESCRIPTOR_SIZE] = EMPTY_NORM
+    if not total:
+        return rows
+    # Bütün paketin heşləri bir dəfəyə
+    codes = index.hash(np.concatenate(features_list))
+    offset = 0
+    for position, ((_, _, points), features) in enumerate(zip(kept, features_list)):
+        count = len(features)
+        rows['counts'][position] = count
+        rows['minutiae'][position, :count] = points
+        rows['descriptors'][position, :count, :DESCRIPTOR_SIZE] = -2.0 * features
+        rows['descriptors'][position, :count, DESCRIPTOR_SIZE] = (features ** 2).sum(axis=1)
+        rows['codes'][position, :count] = codes[offset:offset + count]
+        offset += count
+    return rows
+
+
+def score_templates(probe, packed, counts, chunk_size=CHUNK_SIZE, threshold=DESCRIPTOR_THRESHOLD):
+    """Hər şablonun təsvir balı (0..1).
+
+    probe (m, D), packed (P, M, D+1) - anbardakı [−2g, ‖g‖²] sətirləri. Bal:
+    yoxlanan nöqtələrin uyğunluq dərəcələrinin cəmi / min(m, şablonun nöqtə sayı).
+    """
+    total, slots, _ = packed.shape
+    augmented = np.hstack([probe, np.ones((len(probe), 1), np.float32)])
+    probe_norms = (probe ** 2).sum(axis=1)[:, None]
+    scores = np.empty(total, np.float32)
+    nearest = np.empty((len(probe), chunk_size), np.float32)
+    buffer = np.empty_like(nearest)
+
+    for start in range(0, total, chunk_size):
+        end = min(total, start + chunk_size)
+        # Yer-əsaslı surət: k-cı yerdəki bütün şablonlar yanaşı, minimum elementlər üzrədir
+        block = np.ascontiguousarray(packed[start:end].transpose(1, 0, 2))
+        best = nearest[:, :end - start]
+        product = buffer[:, :end - start]
+        best.fill(np.inf)
+        for slot in range(slots):
+            # [q, 1] · [−2g, ‖g‖²] = ‖g‖² − 2q·g
+            np.matmul(augmented, block[slot].T, out=product)
+            np.minimum(best, product, out=best)
+        best += probe_norms
+        scores[start:end] = np.clip(1.0 - best / threshold, 0.0, None).sum(axis=0)
+    return scores / np.minimum(len(probe), counts)
+
+
+class TemplateGallery:
+    """Qeydiyyatdakı barmaq izləri - diskdəki anbar üzərində 1:N axtarış"""
+
+    def __init__(self, store=None, chunk_size=CHUNK_SIZE, index_min=INDEX_MIN, candidates=CANDIDATES,
+                 use_index=USE_INDEX, parallel=None):
+        self.chunk_size = chunk_size
+        self.index_min = index_min
+        self.candidates = candidates
+        self.use_index = use_index
+        self.parallel = parallel or ParallelScorer()
+        self._store = store
+        self._lock = threading.Lock()
+        # Anbara yazanlar (refresh/load/add) bir-bir: dashboard-un ilkin yükləməsi və
+        # oxuma dialoqunun yeniləməsi eyni vaxtda başlaya bilər
+        self._update_lock = threading.RLock()
+
+    @property
+    def store(self):
+        # Anbar ilk müraciətdə açılır (indeksin qurulması bir neçə saniyə çəkə bilər)
+        with self._lock:
+            if self._store is None:
+                self._store = TemplateStore()
+            return self._store
+
+    def __len__(self):
+        return len(self.store)
+
+    def is_loaded(self):
+        return self.store.db_version is not None
+
+    def template(self, index):
+        """(patient_id, minutiae) - simulyasiya edilmiş oxuyucu üçün"""
+        return self.store.template(index)
+
+    def add(self, entries, max_id=None, version=None):
+        """Yeni şablonları anbarın sonuna yaz - mövcudlar yenidən qurulmur"""
+        store = self.store
+        with self._update_lock:
+            return store.append(pack(entries, store.index), max_id=max_id, db_version=version)
+
+    def replace(self, entries, version=None, source=None):
+        store = self.store
+        with self._update_lock:
+            builder = store.rebuild(source)
+            added = builder.append(pack(entries, store.index),
+                                   max_id=max((row_id for row_id, _, _ in entries), default=0))
+            store.commit_rebuild(builder, db_version=version)
+        return added
+
+    def close(self):
+        """İşçi prosesləri dayandır (proqramdan çıxışda)"""
+        self.parallel.shutdown()
+
+    def _indexed(self, count):
+        return self.use_index and count >= self.index_min
+
+    def uses_parallel(self, count):
+        """count şablonluq qalereya işçi proseslərdə müqayisə olunurmu"""
+        return not self._indexed(count) and self.parallel.enabled(count)
+
+    def _score_all(self, view, probe, top_k):
+        """Bütün şablonların balı - böyük qalereyada işçi proseslər arasında bölünür"""
+        if self.parallel.enabled(view.count):
+            result = self.parallel.top_scores(view.path, view.count, probe, top_k, self.chunk_size)
+            if result is not None:
+                return result
+        return np.arange(view.count), score_templates(probe, view.descriptors, view.counts, self.chunk_size)
+
+    def identify(self, probe_minutiae, threshold=MATCH_THRESHOLD, shortlist=SHORTLIST, top=5,
+                 use_index=None):
+        """Ən uyğun pasiyent; bal həddən aşağıdırsa patient_id None olur.
+
+        Böyük qalereyada əvvəlcə LSH indeksi ən çox səs alan namizədləri
+        seçir (kiçik qalereyada və dəqiq rejimdə hamısı, lazım gələrsə bir
+        neçə prosesdə), onların təsvir balı vektorlaşdırılmış hesablanır, ən yaxşı shortlist şablon isə həndəsi uyğunluqla
+        yoxlanılır - yekun bal alignment_score-dur.
+        """
+        probe = descriptors(probe_minutiae)
+        view, index = self.store.snapshot()
+        if not view.count:
+            return MatchResult(None, 0.0, [], 0)
+
+        if use_index is None:
+            use_index = self._indexed(view.count)
+        if use_index:
+            indices = np.sort(index.candidates(index.hash(probe), view.count, self.candidates))
+            # Snapshot-dan sonra indeksə əlavə olunanlar bu görünüşdə yoxdur
+            indices = indices[indices < view.count]
+            if not len(indices):
+                return MatchResult(None, 0.0, [], 0)
+            scores = score_templates(probe, view.descriptors[indices], view.counts[indices], self.chunk_size)
+            scored = len(indices)
+        else:
+            indices, scores = self._score_all(view, probe, shortlist)
+            scored = view.count
+
+        shortlist = min(len(scores), shortlist)
+        best = {}
+        # Pasiyentin bir neçə barmağı ola bilər - pasiyent üzrə ən yüksək bal
+        for position in np.argpartition(-scores, shortlist - 1)[:shortlist]:
+            index = indices[position]
+            count = view.counts[index]
+            score = alignment_score(probe_minutiae, view.minutiae[index, :count], probe_features=probe,
+                                    candidate_features=view.descriptors[index, :count, :DESCRIPTOR_SIZE] * -0.5)
+            patient_id = view.patient_ids[index].decode('utf-8')
+            best[patient_id] = max(score, best.get(patient_id, 0.0))
+        candidates = sorted(best.items(), key=lambda item: item[1], reverse=True)[:top]
+        patient_id, score = candidates[0]
+        return MatchResult(patient_id if score >= threshold else None, score, candidates, scored)
+
+    # --- Verilənlər bazası ---
+
+    @staticmethod
+    def version(db):
+        rows = db.execute_query("SELECT COUNT(*) as count, MAX(id) as max_id FROM patient_fingerprints")
+        if not rows:
+            raise RuntimeError("patient_fingerprints versiyası oxunmadı")
+        return rows[0]['count'], rows[0]['max_id'] or 0
+
+    @staticmethod
+    def _fetch(db, after_id=0, chunk_size=2000):
+        """Şablonları hissə-hissə oxu: [(id, patient_id, minutiae)] siyahıları"""
+        for rows in db.stream_query("""
+            SELECT id, patient_id, template FROM patient_fingerprints
+            WHERE id > %s ORDER BY id
+        """, (after_id,), chunk_size=chunk_size):
+            yield [(row['id'], row['patient_id'], decode_template(row['template'])) for row in rows]
+
+    @staticmethod
+    def _source(db):
+        return f"{db.host}/{db.database}"
+
+    def load(self, db):
+        """Anbarı tam yenidən yüklə - hissə-hissə, bütün şablonlar yaddaşa yığılmır.
+
+        Yeni nəsil ayrıca fayllara yazılır; bitənə qədər identifikasiya köhnə
+        anbarla davam edir, yarımçıq yükləmə isə atılır.
+        """
+        store = self.store
+        with self._update_lock:
+            version = self.version(db)
+            builder = store.rebuild(self._source(db))
+            try:
+                for entries in self._fetch(db):
+                    builder.append(pack(entries, store.index), max_id=entries[-1][0])
+                store.commit_rebuild(builder, db_version=version)
+            except BaseException:
+                builder.discard()
+                raise
+
+    def refresh(self, db):
+        """Yeni qeydiyyatları anbara əlavə et; silinmə/dəyişmə olubsa tam yenidən yüklə.
+
+        Anbar diskdə saxlanıldığı üçün proqram yenidən başlayanda da yalnız
+        son yükləmədən sonra əlavə olunanlar oxunur.
+        """
+        store = self.store
+        with self._update_lock:
+            if not self.is_loaded() or store.source != self._source(db):
+                self.load(db)
+                return True
+            version = self.version(db)
+            if version == store.db_version:
+                return False
+            count = store.db_version[0]
+            added = 0
+            for entries in self._fetch(db, after_id=store.max_id):
+                added += len(entries)
+                self.add(entries, max_id=entries[-1][0])
+            if count + added == version[0]:
+                self.add([], version=version)
+            else:
+                self.load(db)
+            return True
+
+    def prepare(self, db):
+        """Anbarı yenilə və dəqiq rejimdə işçi prosesləri başlat - ilk oxumadan əvvəl"""
+        self.refresh(db)
+        if self.uses_parallel(len(self)):
+            self.parallel.start()
+
+
+def enroll(db, patient_id, minutiae, finger=0):
+    """Pasiyentin barmaq izini yaz (eyni barmaq təkrar yazılarsa əvəz olunur)"""
+    features = descriptors(minutiae)  # yararsız şablon bazaya düşməsin
+    # UPDATE deyil, yeni sətir: id artır və qalereyalar dəyişikliyi versiyadan görür
+    with db.transaction() as cursor:
+        cursor.execute("DELETE FROM patient_fingerprints WHERE patient_id = %s AND finger = %s",
+                       (patient_id, finger))
+        cursor.execute("""
+            INSERT INTO patient_fingerprints (patient_id, finger, template, minutiae_count)
+            VALUES (%s, %s, %s, %s)
+        """, (patient_id, finger, encode_template(minutiae), len(features)))
+
+
+# Proses daxilində paylaşılan qalereya
+gallery = TemplateGallery()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Qalereyanın bütün şablonlarının bir neçə prosesdə müqayisəsi.
+
+Anbar sütunları artıq diskdə np.memmap fayllarıdır: hər işçi proses eyni
+faylları öz ünvan sahəsinə xəritələyir və əməliyyat sisteminin səhifə keşi
+onları proseslər arasında paylaşır. Sorğu ilə yalnız yoxlanan barmağın
+təsvirləri və şablon aralığı göndərilir, qalereya pickle olunmur. Hər işçi
+öz hissəsinin ən yaxşı top_k nəticəsini qaytarır, əsas proses onları
+birləşdirir.
+
+İşçi sayı FINGERPRINT_WORKERS (standart: nüvə sayı); FINGERPRINT_PARALLEL_MIN
+şablondan kiçik qalereya bir prosesdə müqayisə olunur - proseslər arası
+gediş-gəliş orada daha baha başa gəlir.
+
+Proseslər yalnız dəqiq rejimdə (FINGERPRINT_USE_INDEX=0) işləyir: standart
+rejimdə böyük qalereyadan LSH indeksi bir neçə yüz namizəd seçir və onlar
+bir prosesdə müqayisə olunur.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+WORKERS = int(os.getenv('FINGERPRINT_WORKERS', '0')) or os.cpu_count() or 1
+PARALLEL_MIN = int(os.getenv('FINGERPRINT_PARALLEL_MIN', '20000'))
+
+# İşçi prosesdə: anbar nəslinin qovluğu -> (sətir sayı, descriptors, counts)
+_mapped = {}
+
+
+def _map_store(path, count):
+    cached = _mapped.get(path)
+    if cached is None or cached[0] != count:
+        from fingerprint.store import COLUMNS
+        if path not in _mapped:
+            _mapped.clear()  # əvəz olunmuş nəsillərin xəritələrini burax
+        columns = {}
+        for column in ('descriptors', 'counts'):
+            dtype, shape = COLUMNS[column]
+            columns[column] = np.memmap(os.path.join(path, f"{column}.bin"), dtype=dtype, mode='r',
+                                        shape=(count,) + shape)
+        cached = _mapped[path] = (count, columns['descriptors'], columns['counts'])
+    return cached[1], cached[2]
+
+
+def _score_shard(path, count, start, end, probe, top_k, chunk_size):
+    """İşçi prosesdə [start, end) şablonlarının ən yaxşı top_k-sı: (indekslər, ballar)"""
+    from fingerprint.matcher import score_templates
+    descriptors, counts = _map_store(path, count)
+    scores = score_templates(probe, descriptors[start:end], counts[start:end], chunk_size)
+    top_k = min(top_k, len(scores))
+    best = np.argpartition(-scores, top_k - 1)[:top_k]
+    return best + start, scores[best]
+
+
+def _ready():
+    return os.getpid()
+
+
+class ParallelScorer:
+    """Şablonları işçi proseslər arasında bölüb müqayisə edir"""
+
+    def __init__(self, workers=WORKERS, min_templates=PARALLEL_MIN):
+        self.workers = workers
+        self.min_templates = min_templates
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def enabled(self, count):
+        return self.workers > 1 and count >= self.min_templates
+
+    def start(self):
+        """Prosesləri əvvəlcədən başlat - ilk identifikasiya spawn gözləməsin"""
+        with self._lock:
+            if self._executor is None:
+                # spawn: GUI və hovuz thread-ləri olan prosesi fork etmək təhlükəlidir
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+                for future in [self._executor.submit(_ready) for _ in range(self.workers)]:
+                    future.result()
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def top_scores(self, path, count, probe, top_k, chunk_size):
+        """Bütün count şablon üzrə ən yaxşı top_k: (indekslər, ballar) və ya işçilər
+        sıradan çıxıbsa None (çağıran bir prosesdə davam edir)"""
+        executor = self.start()
+        bounds = np.linspace(0, count, self.workers + 1).astype(int)
+        try:
+            futures = [executor.submit(_score_shard, path, count, int(start), int(end), probe, top_k, chunk_size)
+                       for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+            results = [future.result() for future in futures]
+        except BrokenProcessPool as e:
+            print(f"Barmaq izi işçi prosesləri dayandı: {e}")
+            self.shutdown()
+            return None
+        except OSError as e:
+            # Snapshot-un nəsil qovluğu artıq əvəz olunub - çağıran öz xəritəsi ilə davam edir
+            print(f"Barmaq izi anbarı işçi prosesdə açılmadı: {e}")
+            return None
+        indices = np.concatenate([result[0] for result in results])
+        scores = np.concatenate([result[1] for result in results])
+        top_k = min(top_k, len(scores))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        return indices[best], scores[best]
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Barmaq izi şablonlarının diskdəki, yaddaşa xəritələnmiş (memory-mapped) anbarı.
+
+Hər sütun ayrıca ikili fayldır (sabit ölçülü sətirlər) və yalnız sonuna
+yazılır, ona görə yeni qeydiyyat bütün anbarı yenidən yazmır. Fayllar
+np.memmap ilə açılır: proqram başlayanda şablonlar MySQL-dən yenidən
+yüklənmir və müqayisə edilməyən hissələr RAM-a oxunmur. Sətir sayı, MySQL
+versiyası və LSH parametrləri store.json-dadır; o, məlumat yazıldıqdan
+sonra atomik əvəz olunur, yəni yarımçıq əlavə görünmür.
+
+Sütun faylları "nəsil" qovluğundadır (gen-<id>/). Tam yenidən yükləmə
+yeni nəsil qovluğuna yazılır və store.json os.replace ilə ona keçirilir -
+köhnə fayllar kəsilmir, onları xəritələmiş oxuyucular (işçi proseslər də)
+köhnə snapshot ilə işini bitirir.
+
+Yer: FINGERPRINT_STORE_PATH (standart ~/.bioscript/fingerprints).
+"""
+
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import namedtuple
+
+import numpy as np
+
+from fingerprint.index import LSHIndex, PROJECTIONS, SEED, TABLES, BUCKET_WIDTH
+from fingerprint.template import DESCRIPTOR_SIZE, MAX_MINUTIAE
+
+FORMAT = 2
+PATIENT_ID_SIZE = 20  # patients.id varchar(20)
+
+# Boş yerlərin normu - heç vaxt ən yaxın olmasın
+EMPTY_NORM = np.float32(1e9)
+
+COLUMNS = {
+    'patient_ids': (f'S{PATIENT_ID_SIZE}', ()),
+    'row_ids': ('<i8', ()),
+    'counts': ('<i2', ()),
+    'minutiae': ('<f4', (MAX_MINUTIAE, 3)),
+    # [−2g, ‖g‖²] - matcher.score_templates bir matris vurması ilə ‖g‖² − 2q·g alır
+    'descriptors': ('<f4', (MAX_MINUTIAE, DESCRIPTOR_SIZE + 1)),
+    'codes': ('<u4', (MAX_MINUTIAE, TABLES)),
+}
+
+# path - snapshot-un nəsil qovluğu (işçi proseslər eyni faylları xəritələyir)
+StoreView = namedtuple('StoreView', 'count path ' + ' '.join(COLUMNS))
+
+
+def default_path():
+    return os.getenv('FINGERPRINT_STORE_PATH',
+                     os.path.join(os.path.expanduser("~"), ".bioscript", "fingerprints"))
+
+
+def _row_size(column):
+    dtype, shape = COLUMNS[column]
+    return np.dtype(dtype).itemsize * int(np.prod(shape, dtype=np.int64))
+
+
+def _new_generation():
+    return f"gen-{uuid.uuid4().hex[:12]}"
+
+
+def _map_columns(directory, count):
+    columns = {}
+    for column, (dtype, shape) in COLUMNS.items():
+        if count:
+            columns[column] = np.memmap(os.path.join(directory, f"{column}.bin"), dtype=dtype, mode='r',
+                                        shape=(count,) + shape)
+        else:
+            columns[column] = np.zeros((0,) + shape, dtype=dtype)
+    return StoreView(count, directory, **columns)
+
+
+def _write_columns(directory, rows):
+    for column, (dtype, shape) in COLUMNS.items():
+        data = np.ascontiguousarray(rows[column], dtype=dtype)
+        with open(os.path.join(directory, f"{column}.bin"), 'ab') as f:
+            f.write(data.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class StoreBuilder:
+    """Tam yenidən yükləmə - yeni nəsil qovluğuna yazılır, commit_rebuild() ilə keçilir"""
+
+    def __init__(self, store, source):
+        self.store = store
+        self.source = source
+        self.generation = _new_generation()
+        self.path = os.path.join(store.path, self.generation)
+        self.count = 0
+        self.max_id = 0
+        os.makedirs(self.path)
+        for column in COLUMNS:
+            open(os.path.join(self.path, f"{column}.bin"), 'wb').close()
+
+    def append(self, rows, max_id=None):
+        added = len(rows['row_ids'])
+        if added:
+            _write_columns(self.path, rows)
+            self.count += added
+        if max_id is not None:
+            self.max_id = max(self.max_id, max_id)
+        return added
+
+    def discard(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class TemplateStore:
+    """Yalnız sonuna yazılan şablon anbarı + LSH indeksi"""
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+        meta = self._read_meta()
+        if not self._compatible(meta):
+            # Köhnə formatın kökdəki sütun faylları
+            for column in COLUMNS:
+                if os.path.exists(os.path.join(self.path, f"{column}.bin")):
+                    os.remove(os.path.join(self.path, f"{column}.bin"))
+            meta = self._empty_meta()
+            os.makedirs(self._generation_path(meta), exist_ok=True)
+            self._write_meta(meta)
+        self.meta = meta
+        self._truncate_files(meta['count'])
+        self._remove_stale_generations()
+        self._view = _map_columns(self._generation_path(meta), meta['count'])
+        self.index = self._build_index(self._view)
+
+    # --- Meta ---
+
+    def _meta_path(self):
+        return os.path.join(self.path, 'store.json')
+
+    def _generation_path(self, meta=None):
+        return os.path.join(self.path, (meta or self.meta)['generation'])
+
+    def _column_path(self, column):
+        return os.path.join(self._generation_path(), f"{column}.bin")
+
+    @staticmethod
+    def _empty_meta(source=None):
+        return {
+            'format': FORMAT, 'generation': _new_generation(), 'count': 0, 'max_id': 0,
+            'db_version': None, 'source': source,
+            'max_minutiae': MAX_MINUTIAE, 'descriptor_size': DESCRIPTOR_SIZE,
+            'tables': TABLES, 'projections': PROJECTIONS, 'bucket_width': BUCKET_WIDTH, 'seed': SEED,
+        }
+
+    def _compatible(self, meta):
+        """Şablon/indeks parametrləri dəyişibsə anbar yenidən qurulmalıdır"""
+        expected = self._empty_meta()
+        keys = ('format', 'max_minutiae', 'descriptor_size', 'tables', 'projections', 'bucket_width', 'seed')
+        return (meta is not None and all(meta.get(key) == expected[key] for key in keys)
+                and os.path.isdir(self._generation_path(meta)))
+
+    def _read_meta(self):
+        try:
+            with open(self._meta_path(), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta):
+        tmp_path = f"{self._meta_path()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._meta_path())
+
+    # --- Fayllar ---
+
+    def _truncate_files(self, count):
+        """Yarımçıq qalmış əlavələri (meta-da sayılmayan sətirləri) kəs.
+
+        Yalnız xəritələnmiş hissədən sonrasını kəsir - oxuyuculara toxunmur.
+        """
+        for column in COLUMNS:
+            with open(self._column_path(column), 'ab') as f:
+                f.truncate(count * _row_size(column))
+
+    def _remove_stale_generations(self):
+        """Yarımçıq qalmış və ya əvəz olunmuş nəsil qovluqlarını sil"""
+        for entry in os.scandir(self.path):
+            if entry.is_dir() and entry.name.startswith('gen-') and entry.name != self.meta['generation']:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    @staticmethod
+    def _build_index(view):
+        index = LSHIndex(DESCRIPTOR_SIZE)
+        index.build(view.codes, view.counts)
+        return index
+
+    # --- İctimai interfeys ---
+
+    def __len__(self):
+        return self._view.count
+
+    @property
+    def max_id(self):
+        return self.meta['max_id']
+
+    @property
+    def db_version(self):
+        version = self.meta['db_version']
+        return tuple(version) if version is not None else None
+
+    @property
+    def source(self):
+        return self.meta['source']
+
+    def view(self):
+        """Dəyişməz snapshot - əlavə zamanı oxuyanlar köhnə görünüşlə davam edir"""
+        return self._view
+
+    def snapshot(self):
+        """(view, index) - eyni nəslə aid cüt"""
+        with self._lock:
+            return self._view, self.index
+
+    def template(self, index):
+        view = self._view
+        patient_id = view.patient_ids[index].decode('utf-8')
+        return patient_id, np.array(view.minutiae[index, :view.counts[index]])
+
+    def rebuild(self, source=None):
+        """Tam yenidən yükləmə üçün yeni nəsil; hazır olanda commit_rebuild()"""
+        return StoreBuilder(self, source)
+
+    def commit_rebuild(self, builder, db_version=None):
+        """Yeni nəsli aktiv et - store.json os.replace ilə bir addımda dəyişir"""
+        meta = self._empty_meta(builder.source)
+        meta.update(generation=builder.generation, count=builder.count, max_id=builder.max_id,
+                    db_version=list(db_version) if db_version is not None else None)
+        view = _map_columns(builder.path, builder.count)
+        index = self._build_index(view)
+        with self._lock:
+            old_path = self._generation_path()
+            self._write_meta(meta)
+            self.meta = meta
+            self._view = view
+            self.index = index
+        # Köhnə fayllar silinir, amma onları xəritələyənlər (POSIX) oxumağa davam edir
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    def append(self, rows, max_id=None, db_version=None):
+        """Hazır sütunları (pack() nəticəsi) sona yaz; yeni sətir sayını qaytar"""
+        added = len(rows['row_ids'])
+        with self._lock:
+            count = self.meta['count']
+            if added:
+                self._truncate_files(count)
+                _write_columns(self._generation_path(), rows)
+            meta = dict(self.meta, count=count + added)
+            if max_id is not None:
+                meta['max_id'] = max(meta['max_id'], max_id)
+            if db_version is not None:
+                meta['db_version'] = list(db_version)
+            self._write_meta(meta)
+            self.meta = meta
+            if added:
+                self._view = _map_columns(self._generation_path(), count + added)
+                self.index.add(np.asarray(rows['codes']), np.asarray(rows['counts']), count)
+        return added
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Barmaq izi şablonu: minutiae nöqtələri və onların invariant təsvirləri.
+
+Şablon (N, 3) float32 massividir: x, y (piksel, 500 dpi) və θ (radian,
+papilyar xəttin istiqaməti). Barmaq oxuyucuya hər dəfə başqa yerdə və
+bucaqla qoyulur, ona görə müqayisə koordinatlarla deyil, hər nöqtənin
+yerli təsviri ilə aparılır: ən yaxın K qonşuya məsafə, qonşunun nöqtənin
+öz istiqamətinə nisbətən hansı tərəfdə olduğu və iki istiqamət
+arasındakı fərq. Bu kəmiyyətlər sürüşmə və fırlanmadan asılı deyil.
+"""
+
+import numpy as np
+
+NEIGHBOURS = 3          # hər nöqtə üçün qonşu sayı (çox qonşu - itən nöqtəyə həssas)
+FEATURES = 5            # qonşu başına: məsafə, cos/sin(istiqamət), cos/sin(θ fərqi)
+DESCRIPTOR_SIZE = NEIGHBOURS * FEATURES
+MAX_MINUTIAE = 40       # paketdə şablon başına yer (artıqları kənardan atılır)
+MIN_MINUTIAE = 8        # bundan az nöqtə ilə identifikasiya etibarsızdır
+DISTANCE_SCALE = 40.0   # piksel -> təsvir vahidi (bucaq xüsusiyyətləri ilə eyni çəkidə olsun)
+
+
+class TemplateError(ValueError):
+    """Yararsız şablon (az nöqtə, səhv format)"""
+
+
+def as_minutiae(minutiae):
+    """Siyahı / massiv -> (N, 3) float32"""
+    array = np.asarray(minutiae, dtype=np.float32)
+    if array.ndim != 2 or array.shape[1] != 3:
+        raise TemplateError(f"Şablon (N, 3) olmalıdır, {array.shape} verildi")
+    return array
+
+
+def encode_template(minutiae):
+    """patient_fingerprints.template BLOB-u üçün baytlar"""
+    return as_minutiae(minutiae).astype('<f4').tobytes()
+
+
+def decode_template(blob):
+    return np.frombuffer(blob, dtype='<f4').reshape(-1, 3).astype(np.float32)
+
+
+def select_minutiae(minutiae, limit=MAX_MINUTIAE):
+    """Ən çox limit nöqtə saxla - mərkəzə yaxın olanlar (kənarlar daha çox təhrif olunur)"""
+    if len(minutiae) <= limit:
+        return minutiae
+    centre = minutiae[:, :2].mean(axis=0)
+    order = np.argsort(((minutiae[:, :2] - centre) ** 2).sum(axis=1), kind='stable')
+    return minutiae[np.sort(order[:limit])]
+
+
+def descriptors(minutiae):
+    """(n, DESCRIPTOR_SIZE) invariant təsvirlər, n = min(N, MAX_MINUTIAE)"""
+    minutiae = select_minutiae(as_minutiae(minutiae))
+    count = len(minutiae)
+    if count < max(MIN_MINUTIAE, NEIGHBOURS + 1):
+        raise TemplateError(f"Şablonda kifayət qədər nöqtə yoxdur ({count})")
+
+    xy = minutiae[:, :2]
+    theta = minutiae[:, 2]
+    delta = xy[None, :, :] - xy[:, None, :]               # i -> j vektorları
+    distance = np.sqrt((delta ** 2).sum(axis=2))
+    np.fill_diagonal(distance, np.inf)
+    neighbours = np.argsort(distance, axis=1)[:, :NEIGHBOURS]
+    rows = np.arange(count)[:, None]
+
+    d = distance[rows, neighbours] / DISTANCE_SCALE
+    # Qonşunun istiqaməti nöqtənin öz θ-sına nisbətən - fırlanmaya invariant
+    direction = np.arctan2(delta[rows, neighbours, 1], delta[rows, neighbours, 0]) - theta[:, None]
+    turn = theta[neighbours] - theta[:, None]
+
+    features = np.stack([d, np.cos(direction), np.sin(direction), np.cos(turn), np.sin(turn)], axis=2)
+    return features.reshape(count, DESCRIPTOR_SIZE).astype(np.float32)
+
+
+def alignment_score(probe, candidate, probe_features=None, candidate_features=None,
+                    descriptor_threshold=0.6, position_tolerance=15.0, angle_tolerance=0.35):
+    """İki şablonun həndəsi uyğunluğu (0..1) - təsvirlər təsadüfən oxşar ola bilər.
+
+    Təsvirlərinə görə uyğun gələn hər nöqtə cütü bir fırlanma + sürüşmə
+    fərziyyəsi verir; fərziyyə ilə yerləşdirilən yoxlanan nöqtələrdən neçəsinin
+    yanında eyni istiqamətli nöqtə olduğu sayılır. Ən yaxşı fərziyyənin sayı /
+    min(nöqtə sayları) qaytarılır.
+    """
+    probe = select_minutiae(as_minutiae(probe))
+    candidate = select_minutiae(as_minutiae(candidate))
+    if probe_features is None:
+        probe_features = descriptors(probe)
+    if candidate_features is None:
+        candidate_features = descriptors(candidate)
+
+    distances = ((probe_features[:, None, :] - candidate_features[None, :, :]) ** 2).sum(axis=2)
+    nearest = distances.argmin(axis=1)
+    pairs = np.flatnonzero(distances[np.arange(len(probe)), nearest] < descriptor_threshold)
+    if not len(pairs):
+        return 0.0
+
+    # Hər cüt üçün fırlanma bucağı və sürüşmə: candidate ≈ R(α)·probe + t
+    alpha = candidate[nearest[pairs], 2] - probe[pairs, 2]
+    cos_a, sin_a = np.cos(alpha), np.sin(alpha)
+    px, py = probe[pairs, 0], probe[pairs, 1]
+    tx = candidate[nearest[pairs], 0] - (cos_a * px - sin_a * py)
+    ty = candidate[nearest[pairs], 1] - (sin_a * px + cos_a * py)
+
+    # (H, N) - hər fərziyyə ilə bütün yoxlanan nöqtələrin yeri
+    x = cos_a[:, None] * probe[None, :, 0] - sin_a[:, None] * probe[None, :, 1] + tx[:, None]
+    y = sin_a[:, None] * probe[None, :, 0] + cos_a[:, None] * probe[None, :, 1] + ty[:, None]
+    theta = probe[None, :, 2] + alpha[:, None]
+
+    near = ((x[:, :, None] - candidate[None, None, :, 0]) ** 2 +
+            (y[:, :, None] - candidate[None, None, :, 1]) ** 2) <= position_tolerance ** 2
+    turn = np.abs(np.angle(np.exp(1j * (theta[:, :, None] - candidate[None, None, :, 2]))))
+    matched = (near & (turn <= angle_tolerance)).any(axis=2).sum(axis=1)
+    return float(matched.max()) / min(len(probe), len(candidate))
+
+
+# --- Sintetik şablonlar (simulyasiya edilmiş oxuyucu və test məlumatları üçün) ---
+
+def synthetic_minutiae(rng, count=None, width=300, height=400, min_spacing=12.0):
+    """Təsadüfi, bir-birindən min_spacing uzaqlıqda yerləşən nöqtələr"""
+    count = count or int(rng.integers(28, 45))
+    candidates = rng.uniform((0, 0), (width, height), size=(count * 4, 2))
+    too_close = ((candidates[:, None, :] - candidates[None, :, :]) ** 2).sum(axis=2) < min_spacing ** 2
+    accepted = []
+    for index in range(len(candidates)):
+        if not too_close[index, accepted].any():
+            accepted.append(index)
+            if len(accepted) == count:
+                break
+    points = candidates[accepted].astype(np.float32)
+    angles = rng.uniform(-np.pi, np.pi, size=(len(points), 1)).astype(np.float32)
+    return np.hstack([points, angles])
+
+
+def distort(minutiae, rng, max_rotation=0.5, max_shift=40.0, jitter=2.0, angle_jitter=0.08,
+            drop=0.1, spurious=0.08):
+    """Eyni barmağın yenidən oxunması: fırlanma, sürüşmə, səs-küy, itən və əlavə nöqtələr"""
+    minutiae = as_minutiae(minutiae)
+    angle = rng.uniform(-max_rotation, max_rotation)
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]], dtype=np.float32)
+    centre = minutiae[:, :2].mean(axis=0)
+    xy = (minutiae[:, :2] - centre) @ rotation.T + centre + rng.uniform(-max_shift, max_shift, size=2)
+    xy += rng.normal(0, jitter, size=xy.shape)
+    theta = minutiae[:, 2] + angle + rng.normal(0, angle_jitter, size=len(minutiae))
+    result = np.column_stack([xy, np.angle(np.exp(1j * theta))]).astype(np.float32)
+
+    keep = rng.random(len(result)) >= drop
+    result = result[keep]
+    extra = int(round(len(minutiae) * spurious))
+    if extra:
+        low = result[:, :2].min(axis=0)
+        high = result[:, :2].max(axis=0)
+        noise = np.column_stack([rng.uniform(low, high, size=(extra, 2)),
+                                 rng.uniform(-np.pi, np.pi, size=extra)]).astype(np.float32)
+        result = np.vstack([result, noise])
+    return result[rng.permutation(len(result))]
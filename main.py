@@ -4,8 +4,12 @@
 import sys
 import os
 from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from ui.pharmacy_login import PharmacyLoginWindow
+from database.connection import DatabaseConnection
+from database.instrumentation import export_metrics
+from database.audit import close_audit_writer
+from fingerprint.matcher import gallery
 
 def main():
     # QT_QPA_PLATFORM=offscreen məhiti üçün
@@ -20,6 +24,23 @@ def main():
     app.setApplicationName("BioScript Aptek Sistemi")
     app.setApplicationVersion("1.0")
     
+    # Növbədə qalan jurnal hadisələri çıxışda yazılır (MySQL yoxdursa - ehtiyat fayla).
+    # Hovuz bağlanmadan əvvəl qoşulmalıdır
+    app.aboutToQuit.connect(close_audit_writer)
+    
+    # Barmaq izi müqayisəsinin işçi prosesləri (yalnız dəqiq rejimdə başladılır)
+    app.aboutToQuit.connect(gallery.close)
+    
+    # Çıxışda hovuzdakı bağlantıları bağla
+    app.aboutToQuit.connect(DatabaseConnection.close_pool)
+    
+    # Sorğu ölçmələri DB_METRICS_FILE faylına vaxtaşırı və çıxışda yazılır
+    metrics_timer = QTimer()
+    metrics_timer.timeout.connect(export_metrics)
+    if os.getenv('DB_METRICS_FILE'):
+        metrics_timer.start(int(os.getenv('DB_METRICS_INTERVAL', '60')) * 1000)
+    app.aboutToQuit.connect(export_metrics)
+    
     # Ana giriş pəncərəsi
     login_window = PharmacyLoginWindow()
     login_window.show()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Bir neçə aptek üçün satış hesabatlarının toplu yaradılması.
+
+Hər aptek üçün ayrıca Excel faylı (dashboard export-u ilə eyni sütunlar)
+paralel proseslərdə yaradılır. Hər proses öz bağlantısı ilə işləyir və
+sətirləri axınla yazır.
+
+İstifadə:
+    python -m reports.batch_report --from 2026-09-01 --to 2026-09-30 --pharmacy 1 2 9
+    python -m reports.batch_report --from 2026-09-01 --to 2026-09-30 --all --workers 8
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from database.connection import DatabaseConnection
+from reports.sales_export import export_sales
+
+
+def report_filename(pharmacy_id, start, end):
+    """Hesabat faylının adı (son gün daxil olmaqla)"""
+    last_day = end - timedelta(days=1)
+    return (f"BioScript_Satış_Hesabatı_{pharmacy_id}_"
+            f"{start.strftime('%Y_%m_%d')}-{last_day.strftime('%Y_%m_%d')}.xlsx")
+
+
+def export_pharmacy(pharmacy_id, start, end, out_dir):
+    """Bir aptekin hesabatını yarat (işçi prosesdə icra olunur)"""
+    db = DatabaseConnection()
+    if not db.connect():
+        raise RuntimeError("Verilənlər bazasına qoşulma xətası!")
+    try:
+        filepath = os.path.join(out_dir, report_filename(pharmacy_id, start, end))
+        written = export_sales(db, pharmacy_id, start, end, filepath)
+        return filepath, written
+    finally:
+        db.disconnect()
+
+
+def active_pharmacy_ids(db):
+    """Bütün aktiv apteklərin ID-ləri"""
+    rows = db.execute_query("SELECT id FROM pharmacies WHERE is_active = 1 ORDER BY id")
+    if rows is None:
+        raise RuntimeError("Apteklər siyahısı alına bilmədi")
+    return [row['id'] for row in rows]
+
+
+def run_batch(pharmacy_ids, start, end, out_dir, workers=None):
+    """Hesabatları paralel yarat: {aptek_id: (fayl, sətir sayı) və ya Exception}"""
+    os.makedirs(out_dir, exist_ok=True)
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(export_pharmacy, pharmacy_id, start, end, out_dir): pharmacy_id
+            for pharmacy_id in pharmacy_ids
+        }
+        for future in as_completed(futures):
+            pharmacy_id = futures[future]
+            try:
+                results[pharmacy_id] = future.result()
+                filepath, written = results[pharmacy_id]
+                print(f"✓ Aptek {pharmacy_id}: {written} satış → {filepath}")
+            except Exception as e:
+                results[pharmacy_id] = e
+                print(f"✗ Aptek {pharmacy_id}: {e}")
+
+    return results
+
+
+def parse_day(value):
+    return datetime.strptime(value, '%Y-%m-%d')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apteklər üzrə toplu satış hesabatı")
+    parser.add_argument('--from', dest='start', type=parse_day, required=True,
+                        help="Başlanğıc tarix (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='end', type=parse_day, required=True,
+                        help="Son tarix, daxil olmaqla (YYYY-MM-DD)")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--pharmacy', type=int, nargs='+', help="Aptek ID-ləri")
+    group.add_argument('--all', action='store_true', help="Bütün aktiv apteklər")
+    parser.add_argument('--out', default='.', help="Faylların yazılacağı qovluq")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Paralel proses sayı (standart: CPU sayı)")
+    args = parser.parse_args()
+
+    # Son gün daxil olsun: [start, end + 1 gün)
+    start, end = args.start, args.end + timedelta(days=1)
+    if end <= start:
+        parser.error("--to tarixi --from tarixindən əvvəl ola bilməz")
+
+    pharmacy_ids = args.pharmacy
+    if args.all:
+        db = DatabaseConnection()
+        if not db.connect():
+            print("Verilənlər bazası qoşulma xətası!")
+            return 1
+        try:
+            pharmacy_ids = active_pharmacy_ids(db)
+        finally:
+            db.disconnect()
+        # İşçi proseslər valideynin bağlantılarını miras almasın
+        DatabaseConnection.close_pool()
+
+    results = run_batch(pharmacy_ids, start, end, args.out, args.workers)
+    failed = [pid for pid, result in results.items() if isinstance(result, Exception)]
+    print(f"\nHazır: {len(results) - len(failed)} / {len(results)} aptek")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Satış hesabatının Excel-ə axınla (streaming) yazılması.
+
+Sətirlər serverdən SSDictCursor ilə hissə-hissə oxunur və openpyxl-in
+write_only iş kitabına dərhal yazılır, ona görə yaddaş istifadəsi satış
+sayından asılı deyil.
+"""
+
+import os
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment
+
+SHEET_TITLE = "Satış Hesabatı"
+HEADERS = ["Tarix", "Pasiyent", "Məbləğ (₼)", "Komisyon (₼)", "Diaqnoz", "Şikayət"]
+
+SALES_QUERY = """
+    SELECT dl.dispensed_at, p.name as patient_name, dl.total_price,
+           dl.commission_amount, pr.diagnosis, pr.complaint
+    FROM dispensing_logs dl
+    JOIN patients p ON dl.patient_id = p.id
+    JOIN prescriptions pr ON dl.prescription_id = pr.id
+    WHERE dl.pharmacy_id = %s
+    AND dl.dispensed_at >= %s AND dl.dispensed_at < %s
+    ORDER BY dl.dispensed_at DESC
+"""
+
+
+class ExportCancelled(Exception):
+    """İstifadəçi export-u dayandırdı"""
+
+
+def count_sales(db, pharmacy_id, start, end):
+    """Aralıqdakı satış sayı (progress bar üçün)"""
+    rows = db.execute_query("""
+        SELECT COUNT(*) as count
+        FROM dispensing_logs
+        WHERE pharmacy_id = %s AND dispensed_at >= %s AND dispensed_at < %s
+    """, (pharmacy_id, start, end))
+    if rows is None:
+        raise RuntimeError("Satış sayı alına bilmədi")
+    return rows[0]['count']
+
+
+def header_row(ws):
+    """Rənglənmiş başlıq sətri"""
+    cells = []
+    for header in HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = Font(bold=True)
+        cell.fill = PatternFill(start_color="00BCD4", end_color="00BCD4", fill_type="solid")
+        cell.alignment = Alignment(horizontal="center")
+        cells.append(cell)
+    return cells
+
+
+def sale_row(sale):
+    """Bir satışın Excel sətri"""
+    return [
+        sale['dispensed_at'].strftime('%d.%m.%Y %H:%M'),
+        sale['patient_name'],
+        float(sale['total_price']),
+        float(sale['commission_amount']),
+        sale.get('diagnosis', ''),
+        sale.get('complaint', ''),
+    ]
+
+
+def export_sales(db, pharmacy_id, start, end, filepath,
+                 progress=None, is_cancelled=None, chunk_size=500):
+    """[start, end) aralığındakı satışları Excel faylına yaz, yazılan sətir sayını qaytar.
+
+    progress(yazılan, cəmi) hər hissədən sonra çağırılır. is_cancelled()
+    True qaytararsa fayl yaradılmır və ExportCancelled atılır.
+    """
+    total = count_sales(db, pharmacy_id, start, end)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(SHEET_TITLE)
+    ws.append(header_row(ws))
+
+    written = 0
+    if progress:
+        progress(written, total)
+
+    stream = db.stream_query(SALES_QUERY, (pharmacy_id, start, end), chunk_size)
+    try:
+        for chunk in stream:
+            if is_cancelled and is_cancelled():
+                raise ExportCancelled()
+            for sale in chunk:
+                ws.append(sale_row(sale))
+            written += len(chunk)
+            if progress:
+                progress(written, max(total, written))
+    except BaseException:
+        # Yarımçıq vərəqin müvəqqəti faylını səliqəli bağla
+        ws.close()
+        raise
+    finally:
+        stream.close()
+
+    try:
+        wb.save(filepath)
+    except BaseException:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        raise
+    return written
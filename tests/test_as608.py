@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""AS608 protokolu: paketlərin ayrılması və pty üzərində tam oxuma"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from fingerprint.as608 import (ACK, DATA, END, GEN_IMAGE, OK, AS608Device, PacketParser, build_packet,
+                               command_packet)
+from fingerprint.as608_replay import Replayer, serve, synthesize_recording
+from fingerprint.device import DeviceError
+from fingerprint.template import synthetic_minutiae
+
+
+def test_parser_resynchronises_after_noise_and_split_packets():
+    first = build_packet(ACK, bytes([OK]))
+    second = build_packet(DATA, bytes(range(40)))
+    # Səs-küy, yalançı başlıq (EF 01 + mümkün olmayan uzunluq) və iki hissəyə bölünmüş paket
+    stream = b'\x00\x13\xef' + b'\xef\x01\xff\xff\xff\xff\x02\xff\xff' + first + second
+    parser = PacketParser()
+    packets = parser.feed(stream[:-7]) + parser.feed(stream[-7:])
+    assert [(packet.kind, packet.payload) for packet in packets] == [(ACK, bytes([OK])),
+                                                                     (DATA, bytes(range(40)))]
+    assert parser.errors == 1
+
+
+def test_parser_rejects_bad_checksum():
+    corrupted = bytearray(build_packet(END, b'\x01\x02\x03'))
+    corrupted[-1] ^= 0xFF
+    good = command_packet(GEN_IMAGE)
+    parser = PacketParser()
+    packets = parser.feed(bytes(corrupted) + good)
+    assert len(packets) == 1 and packets[0].payload == bytes([GEN_IMAGE])
+    assert parser.errors >= 1
+
+
+@pytest.fixture
+def sensor():
+    """Replayer-i pty-də işə sal və ona qoşulmuş AS608Device qaytar"""
+    devices = []
+
+    def start(exchanges):
+        ready = queue.Queue()
+        threading.Thread(target=serve, args=(Replayer(exchanges),), kwargs={'ready': ready.put},
+                         daemon=True).start()
+        device = AS608Device(ready.get(timeout=5), poll_interval=0.02)
+        device.open()
+        devices.append(device)
+        return device
+
+    yield start
+    for device in devices:
+        device.close()
+
+
+def test_capture_round_trip(sensor):
+    minutiae = synthetic_minutiae(np.random.default_rng(5))
+    device = sensor(synthesize_recording(minutiae, no_finger=2))
+    steps = []
+    captured = device.capture(timeout=5.0, progress=lambda text, fraction: steps.append(fraction))
+    assert captured.shape == minutiae.shape
+    assert np.allclose(captured[:, :2], minutiae[:, :2], atol=0.5)
+    assert np.allclose(np.angle(np.exp(1j * (captured[:, 2] - minutiae[:, 2]))), 0, atol=2 * np.pi / 256)
+    assert steps[0] == 0.0 and steps[-1] == 1.0
+
+
+def test_capture_times_out_without_finger(sensor):
+    device = sensor([])
+    started = time.monotonic()
+    with pytest.raises(DeviceError, match="vaxtı bitdi"):
+        device.capture(timeout=0.5)
+    assert time.monotonic() - started < 2.0
+
+
+def test_cancel_stops_capture(sensor):
+    device = sensor([])
+    threading.Timer(0.2, device.cancel).start()
+    started = time.monotonic()
+    with pytest.raises(DeviceError, match="ləğv"):
+        device.capture(timeout=10.0)
+    assert time.monotonic() - started < 2.0
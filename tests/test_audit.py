@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Bazanın qəbul etmədiyi bir jurnal hadisəsi qalan hadisələri saxlamamalıdır"""
+
+import json
+from contextlib import contextmanager
+
+import pymysql
+
+from database import audit
+from database.audit import AuditWriter
+
+
+class FakeDB:
+    rows = []
+
+    def connect(self):
+        return True
+
+    def disconnect(self):
+        pass
+
+    @contextmanager
+    def transaction(self):
+        yield None
+
+    def execute_many(self, query, rows, chunk_size=1000):
+        rows = list(rows)
+        if any(row[1] == 'bad' for row in rows):
+            raise pymysql.err.DataError(1265, "Data truncated for column 'action'")
+        FakeDB.rows.extend(rows)
+        return len(rows)
+
+
+def test_rejected_event_is_quarantined(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit, 'DatabaseConnection', FakeDB)
+    FakeDB.rows = []
+    spill_path = str(tmp_path / 'audit_spill.jsonl')
+    writer = AuditWriter(spill_path=spill_path)
+    writer._spill([('admin_action_logs', ('ali', 'bad', None, '2026-10-18 09:00:00'))])
+
+    written = writer.flush([('admin_action_logs', ('ali', 'sale', None, '2026-10-18 09:00:01'))])
+
+    assert written == 1
+    assert [row[1] for row in FakeDB.rows] == ['sale']
+    assert not (tmp_path / 'audit_spill.jsonl').exists()
+    assert not (tmp_path / 'audit_spill.jsonl.replay').exists()
+    with open(f"{spill_path}.rejected", encoding='utf-8') as f:
+        rejected = [json.loads(line) for line in f]
+    assert rejected[0]['values'][1] == 'bad'
+
+    # Növbəti yazmada rədd edilmiş hadisə yenidən göndərilmir
+    assert writer.flush([]) == 0
+
+
+def test_long_user_is_truncated(monkeypatch):
+    writer = AuditWriter()
+    monkeypatch.setattr(writer, 'start', lambda: None)
+    writer.log_action('x' * 300, 'login')
+    table, values = writer._queue.get_nowait()
+    assert len(values[0]) == audit.MAX_USER
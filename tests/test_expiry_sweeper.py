@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Vaxtı keçmiş reseptlərin süpürülməsi: paketlər və bir süpürgəçi kilidi"""
+
+from contextlib import contextmanager
+from datetime import datetime
+
+from database.expiry_sweeper import sweep_expired
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+
+    def execute(self, sql, params):
+        status, now, limit = params
+        expired = [pid for pid, (row_status, expires_at) in sorted(self.db.rows.items())
+                   if row_status == status and expires_at < now][:limit]
+        for pid in expired:
+            self.db.rows[pid] = ('expired', self.db.rows[pid][1])
+        self.db.batches += 1
+        return len(expired)
+
+
+class FakeDB:
+    def __init__(self, rows, lock_free=True):
+        self.rows = rows
+        self.lock_free = lock_free
+        self.batches = 0
+        self.released = False
+
+    def execute_query(self, query, params=None):
+        if 'GET_LOCK' in query:
+            return [{'locked': 1 if self.lock_free else 0}]
+        if 'RELEASE_LOCK' in query:
+            self.released = True
+        return []
+
+    @contextmanager
+    def transaction(self):
+        yield FakeCursor(self)
+
+
+NOW = datetime(2026, 10, 18, 12, 0)
+
+
+def _rows():
+    rows = {pid: ('active', datetime(2026, 10, 1)) for pid in range(1, 6)}
+    rows.update({pid: ('partially_dispensed', datetime(2026, 10, 2)) for pid in range(6, 9)})
+    rows[9] = ('active', datetime(2026, 11, 1))
+    return rows
+
+
+def test_sweep_expires_in_batches_and_releases_lock():
+    db = FakeDB(_rows())
+    assert sweep_expired(db, batch_size=2, pause=0, now=NOW) == 8
+    assert db.rows[9][0] == 'active'
+    assert all(status == 'expired' for pid, (status, _) in db.rows.items() if pid != 9)
+    assert db.released
+
+
+def test_max_batches_leaves_the_rest_for_next_run():
+    db = FakeDB(_rows())
+    assert sweep_expired(db, batch_size=2, max_batches=2, pause=0, now=NOW) == 4
+    assert sweep_expired(db, batch_size=2, pause=0, now=NOW) == 4
+
+
+def test_sweep_is_skipped_while_another_host_holds_the_lock():
+    db = FakeDB(_rows(), lock_free=False)
+    assert sweep_expired(db, batch_size=2, pause=0, now=NOW) == 0
+    assert db.batches == 0 and not db.released
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""1:N identifikasiya: eyni barmağın yenidən oxunması tanınır, başqası rədd edilir"""
+
+import numpy as np
+
+from fingerprint.matcher import TemplateGallery
+from fingerprint.parallel import ParallelScorer
+from fingerprint.store import TemplateStore
+from fingerprint.template import distort, synthetic_minutiae
+
+
+def _gallery(path, rng, count=300, **kwargs):
+    entries = [(row_id, f"P{row_id:05d}", synthetic_minutiae(rng)) for row_id in range(1, count + 1)]
+    gallery = TemplateGallery(TemplateStore(path), parallel=ParallelScorer(workers=1), **kwargs)
+    gallery.add(entries, max_id=count, version=(count, count))
+    return gallery, entries
+
+
+def test_identify_matches_genuine_and_rejects_impostor(tmp_path):
+    rng = np.random.default_rng(7)
+    # index_min=0 - LSH namizədləri də yoxlanılsın
+    gallery, entries = _gallery(str(tmp_path), rng, index_min=0, candidates=50)
+
+    for use_index in (False, True):
+        for _, patient_id, minutiae in entries[::60]:
+            result = gallery.identify(distort(minutiae, rng), use_index=use_index)
+            assert result.patient_id == patient_id
+            assert result.scored == (50 if use_index else len(entries))
+
+        impostor = gallery.identify(synthetic_minutiae(rng), use_index=use_index)
+        assert impostor.patient_id is None
+        assert impostor.score < 0.4
+
+
+def test_identify_on_empty_gallery(tmp_path):
+    gallery = TemplateGallery(TemplateStore(str(tmp_path)), parallel=ParallelScorer(workers=1))
+    assert gallery.identify(synthetic_minutiae(np.random.default_rng(3))).patient_id is None
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Dəqiq rejim: işçi proseslərdəki müqayisə bir prosesdəki ilə eyni nəticə verir"""
+
+import numpy as np
+import pytest
+
+from fingerprint.matcher import TemplateGallery, score_templates
+from fingerprint.parallel import ParallelScorer
+from fingerprint.store import TemplateStore
+from fingerprint.template import descriptors, distort, encode_template, synthetic_minutiae
+
+
+def _entries(count, rng):
+    return [(row_id, f"P{row_id:05d}", synthetic_minutiae(rng)) for row_id in range(1, count + 1)]
+
+
+@pytest.fixture(scope='module')
+def scorer():
+    scorer = ParallelScorer(workers=2, min_templates=0)
+    yield scorer
+    scorer.shutdown()
+
+
+def test_top_scores_equal_single_process_scores(tmp_path, scorer):
+    rng = np.random.default_rng(11)
+    gallery = TemplateGallery(TemplateStore(str(tmp_path)), parallel=ParallelScorer(workers=1))
+    entries = _entries(150, rng)
+    gallery.add(entries, max_id=150)
+    view, _ = gallery.store.snapshot()
+    probe = descriptors(distort(entries[42][2], rng))
+
+    expected = score_templates(probe, view.descriptors, view.counts, gallery.chunk_size)
+    indices, scores = scorer.top_scores(view.path, view.count, probe, 10, gallery.chunk_size)
+
+    assert len(indices) == 10
+    assert np.allclose(scores, expected[indices])
+    assert np.allclose(np.sort(scores), np.sort(expected)[-10:])
+    assert 42 in indices
+
+
+class FakeDB:
+    host = 'test'
+    database = 'bioscript'
+
+    def __init__(self, entries):
+        self.rows = [{'id': row_id, 'patient_id': patient_id, 'template': encode_template(minutiae)}
+                     for row_id, patient_id, minutiae in entries]
+
+    def execute_query(self, query, params=None):
+        return [{'count': len(self.rows), 'max_id': self.rows[-1]['id']}]
+
+    def stream_query(self, query, params, chunk_size=500):
+        rows = [row for row in self.rows if row['id'] > params[0]]
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+
+class RecordingScorer(ParallelScorer):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.started = 0
+
+    def start(self):
+        self.started += 1
+
+
+def test_workers_start_only_in_exact_mode(tmp_path):
+    db = FakeDB(_entries(60, np.random.default_rng(12)))
+    # Standart rejim: PARALLEL_MIN-i keçən qalereya indekslə axtarılır
+    scorer = RecordingScorer(workers=2, min_templates=50)
+    gallery = TemplateGallery(TemplateStore(str(tmp_path / 'indexed')), index_min=10, parallel=scorer)
+    gallery.prepare(db)
+    assert scorer.started == 0 and not gallery.uses_parallel(len(gallery))
+
+    scorer = RecordingScorer(workers=2, min_templates=50)
+    gallery = TemplateGallery(TemplateStore(str(tmp_path / 'exact')), index_min=10, use_index=False,
+                              parallel=scorer)
+    gallery.prepare(db)
+    assert scorer.started == 1 and gallery.uses_parallel(len(gallery))
+
+
+def test_exact_mode_identifies_across_workers(tmp_path, scorer):
+    rng = np.random.default_rng(13)
+    entries = _entries(200, rng)
+    gallery = TemplateGallery(TemplateStore(str(tmp_path)), use_index=False, parallel=scorer)
+    gallery.add(entries, max_id=200)
+    single = TemplateGallery(gallery.store, use_index=False, parallel=ParallelScorer(workers=1))
+
+    for _, patient_id, minutiae in entries[::50]:
+        probe = distort(minutiae, rng)
+        result = gallery.identify(probe)
+        assert result.patient_id == patient_id and result.scored == len(entries)
+        assert result.candidates == single.identify(probe).candidates
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Barmaq izi anbarı: əlavə, tam yenidən yükləmə və yenidən açılma"""
+
+import os
+
+import numpy as np
+
+from fingerprint.matcher import pack
+from fingerprint.store import TemplateStore
+from fingerprint.template import synthetic_minutiae
+
+
+def _entries(start, count, rng):
+    return [(row_id, f"P{row_id:05d}", synthetic_minutiae(rng)) for row_id in range(start, start + count)]
+
+
+def _generations(path):
+    return [name for name in os.listdir(path) if name.startswith('gen-')]
+
+
+def test_append_rebuild_and_reopen(tmp_path):
+    rng = np.random.default_rng(1)
+    path = str(tmp_path)
+    store = TemplateStore(path)
+    store.append(pack(_entries(1, 5, rng), store.index), max_id=5)
+    store.append(pack(_entries(6, 3, rng), store.index), max_id=8, db_version=(8, 8))
+    assert len(store) == 8
+    assert store.template(7)[0] == 'P00008'
+
+    reopened = TemplateStore(path)
+    assert len(reopened) == 8
+    assert reopened.max_id == 8 and reopened.db_version == (8, 8)
+    assert np.array_equal(reopened.view().minutiae, store.view().minutiae)
+
+    # Tam yenidən yükləmə: köhnə snapshot əvəz olunana qədər oxunur
+    old_view, _ = reopened.snapshot()
+    builder = reopened.rebuild('test')
+    builder.append(pack(_entries(100, 4, rng), reopened.index), max_id=103)
+    assert len(reopened) == 8
+    reopened.commit_rebuild(builder, db_version=(4, 103))
+    assert len(reopened) == 4 and reopened.template(0)[0] == 'P00100'
+    assert old_view.patient_ids[0] == b'P00001'  # köhnə xəritə hələ oxunur
+    assert len(_generations(path)) == 1
+
+    again = TemplateStore(path)
+    assert len(again) == 4 and again.source == 'test' and again.max_id == 103
+
+
+def test_discarded_rebuild_keeps_current_generation(tmp_path):
+    rng = np.random.default_rng(2)
+    store = TemplateStore(str(tmp_path))
+    store.append(pack(_entries(1, 3, rng), store.index), max_id=3)
+    builder = store.rebuild()
+    builder.append(pack(_entries(10, 2, rng), store.index))
+    builder.discard()
+    assert len(store) == 3
+    assert len(TemplateStore(str(tmp_path))) == 3
+    assert len(_generations(str(tmp_path))) == 1
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Şifrə sütunlu əmrlərin parametrləri ölçmələrə düşməməlidir"""
+
+from database.instrumentation import REDACTED, add_hook, record_query, remove_hook
+
+
+def test_password_params_are_redacted():
+    events = []
+    add_hook(events.append)
+    try:
+        record_query("UPDATE pharmacy_staff SET password = %s WHERE id = %s AND password = %s",
+                     ('$2b$11$hash', 1, 'ali123'), 0.0)
+        record_query("SELECT * FROM pharmacy_staff WHERE username = %s", ('ali',), 0.0)
+    finally:
+        remove_hook(events.append)
+    assert events[0].params == REDACTED
+    assert events[1].params == ('ali',)
+
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Sorğu keşi və onun üzərində işləyən həkim/xəstəxana adları surəti"""
+
+from database.cache import QueryCache
+from database.connection import DatabaseConnection
+from database.dimensions import DimensionCache
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.connection.queries.append(' '.join(query.split()))
+        self.rows = self.connection.answer(query, params)
+        return len(self.rows)
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, answer):
+        self.answer = answer
+        self.queries = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+def _db(answer):
+    DatabaseConnection._query_cache.clear()
+    db = DatabaseConnection()
+    db.connection = FakeConnection(answer)
+    return db
+
+
+def test_ttl_and_table_invalidation():
+    cache = QueryCache(max_size=2)
+    key = QueryCache.make_key("SELECT id, name FROM doctors")
+    cache.put(key, [{'id': 1}], 60, {'doctors'})
+    rows = cache.get(key)
+    rows[0]['id'] = 2  # çağıranın dəyişikliyi keşə təsir etmir
+    assert cache.get(key) == [{'id': 1}]
+    cache.invalidate_tables({'hospitals'})
+    assert cache.get(key) is not None
+    cache.invalidate_tables({'DOCTORS'})
+    assert cache.get(key) is None
+    cache.put(key, [], -1, {'doctors'})
+    assert cache.get(key) is None
+
+
+def test_write_through_connection_invalidates_cached_reads():
+    db = _db(lambda query, params: [{'id': 1, 'name': 'Əli'}])
+    db.execute_query("SELECT id, name FROM doctors", cache_ttl=60)
+    db.execute_query("SELECT id, name FROM doctors", cache_ttl=60)
+    assert len(db.connection.queries) == 1
+    db.execute_query("UPDATE doctors SET name = %s WHERE id = %s", ('Vəli', 1))
+    db.execute_query("SELECT id, name FROM doctors", cache_ttl=60)
+    assert len(db.connection.queries) == 3
+
+
+def test_unknown_dimension_ids_are_not_requeried_per_page():
+    def answer(query, params):
+        if 'COUNT(*)' in query:
+            return [{'doctors_count': 1, 'doctors_max_id': 1, 'hospitals_count': 1, 'hospitals_max_id': 1}]
+        if 'WHERE id IN' in query:
+            return []  # silinmiş həkim
+        return [{'id': 1, 'name': 'Ad'}]
+
+    db = _db(answer)
+    dimensions = DimensionCache()
+    rows = [{'doctor_id': 7, 'hospital_id': 1}]
+    dimensions.ensure(db, rows)
+    lookups = [query for query in db.connection.queries if 'WHERE id IN' in query]
+    dimensions.ensure(db, rows)
+    assert [query for query in db.connection.queries if 'WHERE id IN' in query] == lookups
+    assert dimensions.doctor_name(7) == '—' and dimensions.hospital_name(1) == 'Ad'
+
+    # Versiya yoxlaması TTL ərzində bir dəfə
+    dimensions.refresh(db)
+    dimensions.refresh(db)
+    assert sum('COUNT(*)' in query for query in db.connection.queries) == 1
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Satış yazılması: dərhal yazma, bağlantı yoxdursa növbə, artıq satılmış resept - konflikt"""
+
+from contextlib import contextmanager
+from datetime import datetime
+
+import pymysql
+
+from database.local_store import LocalStore
+from database.sale_sync import SALE_CONFLICT, SALE_QUEUED, SALE_WRITTEN, record_sale, sync_pending
+
+
+class FakeCursor:
+    """replay_sales-in göndərdiyi əmrlərin sadə yaddaş modeli"""
+
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    def execute(self, sql, params=()):
+        sql = ' '.join(sql.split())
+        if sql.startswith('SELECT client_sale_key FROM dispensing_logs'):
+            self.rows = [{'client_sale_key': key} for key in params if key in self.db.logs]
+        elif sql.startswith('SELECT id FROM prescriptions'):
+            self.rows = [{'id': pid} for pid in params if self.db.status.get(pid) == 'active']
+        elif sql.startswith('UPDATE prescriptions'):
+            updated = 0
+            for pid in params:
+                if self.db.status.get(pid) == 'active':
+                    self.db.status[pid] = 'partially_dispensed'
+                    updated += 1
+            return updated
+        return 0
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeDB:
+    def __init__(self, status):
+        self.status = status
+        self.logs = {}
+
+    @contextmanager
+    def transaction(self):
+        yield FakeCursor(self)
+
+    def execute_many(self, sql, rows, chunk_size=None):
+        for row in rows:
+            self.logs[row[0]] = row
+
+
+def _sale(key, prescription_id):
+    return {'client_sale_key': key, 'prescription_id': prescription_id, 'pharmacy_id': 1,
+            'staff_id': 1, 'patient_id': 'P1', 'total_price': 10.0, 'commission_amount': 0.3,
+            'dispensed_at': datetime(2026, 10, 18, 9, 0)}
+
+
+def test_sale_of_already_dispensed_prescription_is_a_conflict(tmp_path):
+    store = LocalStore(str(tmp_path / 'local.db'))
+    db = FakeDB({1: 'active', 2: 'partially_dispensed'})
+    store.enqueue_sale(_sale('a', 1))
+    store.enqueue_sale(_sale('b', 2))
+    assert store.queued_prescription_ids() == {1, 2}
+
+    written, taken = sync_pending(db, store)
+
+    assert (written, taken) == (1, 2)
+    assert set(db.logs) == {'a'}
+    assert store.pending_count() == 0
+    conflicts = store.take_conflicts()
+    assert [sale['client_sale_key'] for sale in conflicts] == ['b']
+    assert store.take_conflicts() == []  # bir dəfə göstərilir
+    store.close()
+
+
+class OfflineDB(FakeDB):
+    @contextmanager
+    def transaction(self):
+        raise pymysql.err.OperationalError(2013, "Lost connection to MySQL server")
+        yield
+
+
+def test_record_sale_writes_immediately_and_reports_conflicts(tmp_path):
+    store = LocalStore(str(tmp_path / 'local.db'))
+    db = FakeDB({1: 'active'})
+    assert record_sale(db, store, _sale('a', 1)) == SALE_WRITTEN
+    assert record_sale(db, store, _sale('a', 1)) == SALE_WRITTEN  # təkrar təsdiq
+    assert record_sale(db, store, _sale('b', 1)) == SALE_CONFLICT
+    assert set(db.logs) == {'a'}
+    assert store.pending_count() == 0
+
+    assert record_sale(OfflineDB({}), store, _sale('c', 2)) == SALE_QUEUED
+    assert store.queued_prescription_ids() == {2}
+    store.close()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""SALES_QUERY sxem faylındakı (attached_assets/*.sql) sütunlara uyğun olmalıdır"""
+
+import glob
+import os
+import re
+
+from reports.sales_export import HEADERS, SALES_QUERY
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def schema_columns():
+    """Sxem dump-ından {cədvəl: {sütunlar}}"""
+    tables = {}
+    for path in glob.glob(os.path.join(ROOT, 'attached_assets', '*.sql')):
+        with open(path, encoding='utf-8') as f:
+            sql = f.read()
+        for table, body in re.findall(r"CREATE TABLE `(\w+)` \((.*?)\n\)", sql, re.S):
+            tables[table] = set(re.findall(r"^\s*`(\w+)`", body, re.M))
+    return tables
+
+
+def query_aliases(query):
+    """FROM/JOIN <cədvəl> <alias> -> {alias: cədvəl}"""
+    return {alias: table for table, alias in re.findall(r"(?:FROM|JOIN)\s+(\w+)\s+(\w+)", query)}
+
+
+def test_sales_query_columns_exist():
+    tables = schema_columns()
+    aliases = query_aliases(SALES_QUERY)
+    assert aliases, "SALES_QUERY-də cədvəl tapılmadı"
+    for alias, column in re.findall(r"\b(\w+)\.(\w+)\b", SALES_QUERY):
+        table = aliases[alias]
+        assert table in tables, f"{table} cədvəli sxemdə yoxdur"
+        assert column in tables[table], f"{table}.{column} sütunu sxemdə yoxdur"
+
+
+def test_sales_query_matches_headers():
+    select = SALES_QUERY.split('FROM')[0]
+    assert select.count(',') + 1 == len(HEADERS)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+from PyQt5.QtCore import QThread, pyqtSignal
+from database.connection import DatabaseConnection
+from reports.sales_export import export_sales, ExportCancelled
+
+
+class ExcelExportWorker(QThread):
+    """Satış hesabatını arxa fon thread-ində Excel-ə yazır"""
+
+    progress = pyqtSignal(int, int)       # yazılan, cəmi
+    completed = pyqtSignal(str, int)      # fayl yolu, sətir sayı
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, pharmacy_id, start, end, filepath, parent=None):
+        super().__init__(parent)
+        self.pharmacy_id = pharmacy_id
+        self.start_at = start
+        self.end_at = end
+        self.filepath = filepath
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Export-u növbəti hissədən sonra dayandır"""
+        self._cancel_event.set()
+
+    def run(self):
+        # Uzun sürən oxuma üçün hovuzdan ayrıca bağlantı
+        db = DatabaseConnection()
+        if not db.connect():
+            self.failed.emit("Verilənlər bazasına qoşulma xətası!")
+            return
+
+        try:
+            written = export_sales(db, self.pharmacy_id, self.start_at, self.end_at,
+                                   self.filepath,
+                                   progress=self.progress.emit,
+                                   is_cancelled=self._cancel_event.is_set)
+        except ExportCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        finally:
+            db.disconnect()
+
+        self.completed.emit(self.filepath, written)
@@ -1,17 +1,94 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
+
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                             QPushButton, QProgressBar)
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QPalette, QBrush, QLinearGradient, QColor
+from database.connection import DatabaseConnection
+from fingerprint.device import DeviceError, open_device
+from fingerprint.matcher import gallery
+from fingerprint.template import TemplateError
+
+# Dialoq bağlanandan sonra hələ bitməmiş oxumalar - bitənə qədər silinməsinlər
+_finishing_workers = set()
+
+
+class FingerprintScanWorker(QThread):
+    """Barmaq izini oxu və qeydiyyatdakı pasiyentlər arasında tap"""
+
+    status = pyqtSignal(str, int)      # vəziyyət yazısı, progress
+    identified = pyqtSignal(object)    # MatchResult
+    failed = pyqtSignal(str)
+
+    def __init__(self, device, timeout, parent=None):
+        super().__init__(parent)
+        self.device = device
+        self.timeout = timeout
+
+    def run(self):
+        try:
+            self.refresh_gallery()
+            if not gallery.is_loaded():
+                self.failed.emit("Barmaq izi bazası yüklənmədi")
+                return
+            self.status.emit("Barmağınızı oxuyucu üzərinə qoyun...", 20)
+            probe = self.device.capture(self.timeout, progress=self.report_capture)
+            self.status.emit("Barmaq izi yoxlanılır...", 70)
+            self.identified.emit(gallery.identify(probe))
+        except (DeviceError, TemplateError) as e:
+            self.failed.emit(str(e))
+        except Exception as e:
+            print(f"Barmaq izi xətası: {e}")
+            self.failed.emit("Barmaq izi oxunmadı")
+
+    def report_capture(self, text, fraction):
+        """Oxuyucunun mərhələləri progress bar-ın 20-70 aralığında"""
+        self.status.emit(text, 20 + int(50 * min(1.0, max(0.0, fraction))))
+
+    def refresh_gallery(self):
+        """Yeni qeydiyyatları götür; server əlçatmazdırsa diskdəki anbarla davam et"""
+        db = DatabaseConnection()
+        if not db.connect():
+            return
+        try:
+            gallery.refresh(db)
+        except Exception as e:
+            print(f"Barmaq izi bazası yenilənmədi: {e}")
+        finally:
+            db.disconnect()
+
+
+def _release_worker(worker, device):
+    """Bağlanmış dialoqun oxuması bitdi - oxuyucunu bağla, worker-i sil"""
+    if device is not None:
+        try:
+            device.close()
+        except Exception as e:
+            print(f"Oxuyucu bağlanmadı: {e}")
+    worker.destroyed.connect(lambda: _finishing_workers.discard(worker))
+    worker.deleteLater()
+
 
 class FingerprintScanDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, device=None):
         super().__init__(parent)
-        self.progress_value = 0
+        self.device = device
+        self.device_error = None
+        if self.device is None:
+            try:
+                self.device = open_device(gallery=gallery)
+            except DeviceError as e:
+                self.device_error = str(e)
+        self.timeout = float(os.getenv('FINGERPRINT_CAPTURE_TIMEOUT', '15'))
+        self.worker = None
+        self.device_open = False
+        self.match_result = None
+        self.matched_patient_id = None  # tanınmadıqda None - satış dialoqunda əl ilə axtarış
         self.init_ui()
-        self.start_fake_scan()
+        self.start_scan()
         
     def init_ui(self):
         """Barmaq izi oxuma UI-ni hazırla"""
@@ -109,6 +186,28 @@ class FingerprintScanDialog(QDialog):
         """)
         exit_button.clicked.connect(self.reject)
         
+        # Tanınmadıqda: yenidən oxu və ya pasiyenti əl ilə axtar
+        self.retry_button = QPushButton("🔁 YENİDƏN")
+        self.manual_button = QPushButton("⌨️ ƏL İLƏ AXTAR")
+        for button in (self.retry_button, self.manual_button):
+            button.setFixedSize(150, 40)
+            button.setFont(QFont("Segoe UI", 10))
+            button.setStyleSheet("""
+                QPushButton {
+                    background: rgba(255, 255, 255, 0.2);
+                    color: white;
+                    border: 2px solid white;
+                    border-radius: 8px;
+                    font-weight: bold;
+                }
+                QPushButton:hover {
+                    background: rgba(255, 255, 255, 0.35);
+                }
+            """)
+            button.setVisible(False)
+        self.retry_button.clicked.connect(self.start_scan)
+        self.manual_button.clicked.connect(self.accept)
+        
         # Layout-a əlavə et
         main_layout.addWidget(title_label)
         
@@ -125,6 +224,8 @@ class FingerprintScanDialog(QDialog):
         # Çıxış düyməsini mərkəzləşdir
         button_layout = QHBoxLayout()
         button_layout.addStretch()
+        button_layout.addWidget(self.retry_button)
+        button_layout.addWidget(self.manual_button)
         button_layout.addWidget(exit_button)
         button_layout.addStretch()
         main_layout.addLayout(button_layout)
@@ -141,29 +242,65 @@ class FingerprintScanDialog(QDialog):
         palette.setBrush(QPalette.Window, QBrush(gradient))
         self.setPalette(palette)
         
-    def start_fake_scan(self):
-        """Saxta barmaq izi oxuma prosesini başlat"""
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_progress)
-        self.timer.start(50)  # Hər 50ms-də bir yenilə
-        
-    def update_progress(self):
-        """Progress-i yenilə"""
-        self.progress_value += 2
-        self.progress_bar.setValue(self.progress_value)
-        
-        if self.progress_value <= 30:
-            self.status_label.setText("Barmaq izi axtarılır...")
-        elif self.progress_value <= 60:
-            self.status_label.setText("Barmaq izi oxunur...")
-        elif self.progress_value <= 90:
-            self.status_label.setText("Məlumatlar yoxlanılır...")
-        elif self.progress_value >= 100:
-            self.timer.stop()
-            self.status_label.setText("✅ Barmaq izi uğurla oxundu!")
-            
-            # 2 saniyə sonra dialog-u bağla
-            QTimer.singleShot(2000, self.accept)
+    def start_scan(self):
+        """Oxumanı arxa fonda başlat"""
+        self.retry_button.setVisible(False)
+        self.manual_button.setVisible(False)
+        if self.device is None:
+            self.on_failed(self.device_error)
+            self.retry_button.setVisible(False)
+            return
+        if not self.device_open:
+            try:
+                self.device.open()
+                self.device_open = True
+            except DeviceError as e:
+                self.on_failed(f"Oxuyucu açılmadı: {e}")
+                return
+        self.on_status("Barmaq izi bazası hazırlanır...", 5)
+        self.worker = FingerprintScanWorker(self.device, self.timeout, self)
+        self.worker.status.connect(self.on_status)
+        self.worker.identified.connect(self.on_identified)
+        self.worker.failed.connect(self.on_failed)
+        self.worker.start()
+        
+    def on_status(self, text, value):
+        self.status_label.setText(text)
+        self.progress_bar.setValue(value)
+        
+    def on_identified(self, result):
+        """Müqayisə bitdi"""
+        self.match_result = result
+        self.progress_bar.setValue(100)
+        if result.patient_id is None:
+            self.on_failed("Barmaq izi tanınmadı")
+            return
+        self.matched_patient_id = result.patient_id
+        self.status_label.setText(f"✅ Pasiyent tanındı: {result.patient_id}")
+        QTimer.singleShot(800, self.accept)
+        
+    def on_failed(self, message):
+        self.status_label.setText(f"❌ {message}")
+        self.retry_button.setVisible(True)
+        self.manual_button.setVisible(True)
+        
+    def done(self, result):
+        """Bağlananda gözləyən oxumanı dayandır - GUI thread-i onun bitməsini gözləmir"""
+        if self.device is not None:
+            self.device.cancel()
+        worker, self.worker = self.worker, None
+        if worker is not None and worker.isRunning():
+            # Oxuyucu worker bitəndən sonra bağlanır
+            for signal in (worker.status, worker.identified, worker.failed):
+                signal.disconnect()
+            worker.setParent(None)
+            _finishing_workers.add(worker)
+            device = self.device if self.device_open else None
+            worker.finished.connect(lambda: _release_worker(worker, device))
+        elif self.device_open:
+            self.device.close()
+        self.device_open = False
+        super().done(result)
             
     def keyPressEvent(self, event):
         """ESC açarı ilə çıxış"""
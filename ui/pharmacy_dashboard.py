@@ -2,23 +2,74 @@
 # -*- coding: utf-8 -*-
 
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                            QLabel, QPushButton, QFrame, QScrollArea, QListWidget,
-                            QListWidgetItem, QGridLayout, QDialog, QMessageBox)
+                            QLabel, QPushButton, QFrame, QScrollArea, QListView,
+                            QGridLayout, QDialog, QMessageBox, QProgressDialog)
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QPalette, QBrush, QLinearGradient, QColor
 from datetime import datetime, date
+import os
 from ui.fingerprint_scan import FingerprintScanDialog
 from ui.sales_dialog import SalesDialog
+from ui.query_worker import QueryExecutor
+from ui.export_worker import ExcelExportWorker
+from ui.recent_sales_model import RecentSalesModel
+from ui.sync_worker import SaleSyncWorker
+from database import queries
+from database.cache import LRUCache
+from database.dimensions import dimensions
+from database.expiry_sweeper import sweep_expired
+from database.local_store import local_store
+from fingerprint.matcher import gallery
 
 class PharmacyDashboard(QMainWindow):
     def __init__(self, user_data, db):
         super().__init__()
         self.user_data = user_data
         self.db = db
+        self.query_executor = QueryExecutor(self)
+        self.export_worker = None
+        # Açılmış satış təfərrüatları - dispensing_logs.id üzrə
+        self.sale_details_cache = LRUCache(max_size=50)
+        # Görülən ən böyük dispensing_logs.id - None olduqda siyahı tam yüklənir
+        self.last_sale_id = None
+        self.recent_sales_task = None
+        self.pending_sales_refresh = None  # sorğu gedərkən istənmiş yeniləmə (with_stats)
         self.init_ui()
+        # Statistika və son satışlar arxa fonda yüklənir
         self.load_dashboard_data()
-        # İlk dəfə statistikləri yüklə
-        QTimer.singleShot(1000, self.refresh_stats)
+        
+        # Digər terminalların satışlarını görmək üçün avtomatik yeniləmə
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.auto_refresh)
+        self.refresh_timer.start(int(os.getenv('DASHBOARD_REFRESH_INTERVAL', '10')) * 1000)
+        
+        # Həkim/xəstəxana adları girişdən dərhal sonra yüklənir, sonra versiya ilə yoxlanılır
+        self.refresh_dimensions()
+        self.dimensions_timer = QTimer(self)
+        self.dimensions_timer.timeout.connect(self.refresh_dimensions)
+        self.dimensions_timer.start(int(os.getenv('DIMENSION_REFRESH_INTERVAL', '300')) * 1000)
+        
+        # Barmaq izi şablonları (və işçi proseslər) əvvəlcədən hazırlanır - ilk oxuma gözləməsin
+        self.query_executor.submit(gallery.prepare,
+                                   on_error=lambda message: print(f"Barmaq izi bazası yüklənmədi: {message}"))
+        
+        # Vaxtı keçmiş reseptlər vaxtaşırı 'expired' edilir (EXPIRY_SWEEP_INTERVAL=0 - söndürülüb,
+        # məsələn, süpürmə serverdə cron ilə işləyirsə). Bir hostda yandırmaq kifayətdir -
+        # bir neçə terminalda yandırılsa da GET_LOCK ilə eyni anda yalnız biri süpürür
+        self.expiry_timer = QTimer(self)
+        self.expiry_timer.timeout.connect(self.sweep_expired_prescriptions)
+        expiry_interval = int(os.getenv('EXPIRY_SWEEP_INTERVAL', '0'))
+        if expiry_interval > 0:
+            self.expiry_timer.start(expiry_interval * 1000)
+        
+        # Satışlar yerli növbədən MySQL-ə arxa fonda göndərilir
+        self.pending_sales = 0
+        self.sync_worker = SaleSyncWorker(local_store(), self)
+        self.sync_worker.synced.connect(self.on_sales_synced)
+        self.sync_worker.pending_changed.connect(self.on_pending_sales_changed)
+        self.sync_worker.online_changed.connect(self.on_online_changed)
+        self.sync_worker.conflicted.connect(self.on_sale_conflicts)
+        self.sync_worker.start()
         
     def init_ui(self):
         """Dashboard UI-ni hazırla"""
@@ -97,6 +148,10 @@ class PharmacyDashboard(QMainWindow):
         date_label.setFont(QFont("Segoe UI", 12))
         date_label.setStyleSheet("color: #424242; background: transparent;")
         
+        self.sync_label = QLabel("")
+        self.sync_label.setFont(QFont("Segoe UI", 10))
+        self.sync_label.setStyleSheet("color: #424242; background: transparent;")
+        
         exit_button = QPushButton("ÇIXIŞ")
         exit_button.setFixedSize(80, 35)
         exit_button.setStyleSheet("""
@@ -112,6 +167,7 @@ class PharmacyDashboard(QMainWindow):
         exit_button.clicked.connect(self.close)
         
         right_info.addWidget(date_label)
+        right_info.addWidget(self.sync_label)
         right_info.addWidget(exit_button)
         
         header_layout.addLayout(left_info)
@@ -221,25 +277,28 @@ class PharmacyDashboard(QMainWindow):
         sales_title.setStyleSheet("color: #1976D2; background: transparent;")
         
         # Siyahı
-        self.sales_list = QListWidget()
+        self.recent_sales_model = RecentSalesModel(self)
+        self.sales_list = QListView()
+        self.sales_list.setModel(self.recent_sales_model)
+        self.sales_list.setUniformItemSizes(True)
         self.sales_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 border: 1px solid #E0E0E0;
                 border-radius: 8px;
                 background: white;
                 alternate-background-color: #F5F5F5;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 10px;
                 border-bottom: 1px solid #EEEEEE;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background: #E3F2FD;
                 color: #1976D2;
             }
         """)
         self.sales_list.setAlternatingRowColors(True)
-        self.sales_list.itemClicked.connect(self.show_sale_details)
+        self.sales_list.clicked.connect(self.on_sale_clicked)
         
         # Excel export düyməsi
         export_button = QPushButton("📊 Excel-ə Export Et")
@@ -255,6 +314,7 @@ class PharmacyDashboard(QMainWindow):
             QPushButton:hover { background: #45a049; }
         """)
         export_button.clicked.connect(self.export_to_excel)
+        self.export_button = export_button
         
         sales_layout.addWidget(sales_title)
         sales_layout.addWidget(self.sales_list)
@@ -309,24 +369,12 @@ class PharmacyDashboard(QMainWindow):
         """)
         new_sale_button.clicked.connect(self.start_new_sale)
         
-        # Satış siyahısına klik event əlavə et
-        self.sales_list.itemClicked.connect(self.on_sale_clicked)
-        
-        # Satış məlumatlarını saxlamaq üçün
-        self.recent_sales_data = []
-        
         sale_layout.addWidget(sale_title)
         sale_layout.addWidget(new_sale_button)
         sale_layout.addStretch()
         
         bottom_layout.addWidget(sale_frame)
         
-    def refresh_stats(self):
-        """Statistikləri yenilə və UI-ni güncəllə"""
-        self.load_stats()
-        self.update_stats_display()
-        self.load_recent_sales()
-        
     def start_new_sale(self):
         """Yeni satış prosesini başlat"""
         from ui.fingerprint_scan import FingerprintScanDialog
@@ -334,59 +382,78 @@ class PharmacyDashboard(QMainWindow):
         # Əvvəlcə barmaq izi oxuma dialoqu  
         fingerprint_dialog = FingerprintScanDialog(self)
         if fingerprint_dialog.exec_() == fingerprint_dialog.Accepted:
-            # Aktiv reseptləri göstər
-            self.show_sales_dialog()
+            # Tanınmış pasiyentin aktiv reseptləri (tanınmadıqda - bütün siyahı)
+            self.show_sales_dialog(fingerprint_dialog.matched_patient_id)
             
-    def show_sales_dialog(self):
+    def show_sales_dialog(self, patient_id=None):
         """Satış dialoqunu göstər"""
         from ui.sales_dialog import SalesDialog
         
-        sales_dialog = SalesDialog(self.user_data, self.db, self)
+        sales_dialog = SalesDialog(self.user_data, self.db, self, patient_id=patient_id)
         if sales_dialog.exec_() == QDialog.Accepted:
-            # Satış tamamlandı, statistikləri yenilə
-            self.refresh_stats()
+            # Satış MySQL-ə yazılıb və ya növbədədir (növbə göndəriləndə dashboard yenə yenilənir)
+            self.load_dashboard_data()
+            self.sync_worker.nudge()
+            
+    def on_sales_synced(self, count):
+        """Növbədəki satışlar MySQL-ə yazıldı"""
+        self.load_dashboard_data()
+        
+    def on_sale_conflicts(self, conflicts):
+        """Növbədəki satışın resepti artıq başqa terminalda satılıb - satış yazılmadı"""
+        lines = [f"Resept #{sale['prescription_id']} - {sale['total_price']:.2f} ₼ "
+                 f"({sale['dispensed_at'].strftime('%d.%m.%Y %H:%M')})" for sale in conflicts]
+        QMessageBox.warning(self, "Satış qeydə alınmadı",
+                            "Bu reseptlər artıq başqa terminalda satılıb, satışlar bazaya yazılmadı:\n\n"
+                            + "\n".join(lines))
+        
+    def on_pending_sales_changed(self, count):
+        """Növbədə qalan satış sayı"""
+        self.pending_sales = count
+        self.update_sync_label()
+        
+    def on_online_changed(self, online):
+        """Mərkəzi server əlçatanlığı dəyişdi"""
+        self.online = online
+        self.update_sync_label()
+        
+    def update_sync_label(self):
+        """Başlıqdakı sinxronizasiya vəziyyətini göstər"""
+        text = "🟢 Onlayn" if getattr(self, 'online', True) else "📴 Oflayn - satışlar yerli yadda saxlanılır"
+        if self.pending_sales:
+            text += f" ({self.pending_sales} satış göndərilməyib)"
+        self.sync_label.setText(text)
             
-    def show_sale_details(self, item):
-        """Satış təfərrüatlarını göstər"""
-        if not item or item.flags() & Qt.ItemIsSelectable == 0:
+    def on_sale_clicked(self, index):
+        """Satış elementinə kliklədikdə təfərrüatları göstər"""
+        sale_id = index.data(Qt.UserRole)
+        if sale_id is None:
             return
             
-        # Satış ID-sini mətndan çıxar
-        sale_text = item.text()
-        try:
-            # Satış məlumatlarını verilənlər bazasından al
-            if not self.db.connect():
-                return
-                
-            # Son satışları yenidən sorğula
-            query = """
-                SELECT dl.*, p.name as patient_name, pr.diagnosis, pr.instructions,
-                       GROUP_CONCAT(CONCAT(m.name, ' - ', m.dosage) SEPARATOR ', ') as medications
-                FROM dispensing_logs dl
-                JOIN patients p ON dl.patient_id = p.id
-                JOIN prescriptions pr ON dl.prescription_id = pr.id
-                LEFT JOIN prescription_items pi ON pr.id = pi.prescription_id
-                LEFT JOIN medications m ON pi.medication_id = m.id
-                WHERE dl.pharmacy_id = %s
-                GROUP BY dl.id
-                ORDER BY dl.dispensed_at DESC
-                LIMIT 10
-            """
+        sale = self.sale_details_cache.get(sale_id)
+        if sale is not None:
+            self.display_sale_details_dialog(sale)
+            return
             
-            sales = self.db.execute_query(query, (self.user_data['pharmacy_id'],))
-            if not sales:
-                return
-                
-            # Klik edilmiş sətirə uyğun satışı tap
-            row_index = self.sales_list.row(item)
-            if row_index < len(sales):
-                sale = sales[row_index]
-                self.display_sale_details_dialog(sale)
-                
-        except Exception as e:
-            QMessageBox.warning(self, "Xəta", f"Satış təfərrüatları yüklənmədi: {e}")
-        finally:
-            self.db.disconnect()
+        # Yalnız kliklənmiş satış primary key ilə oxunur
+        self.sales_list.setEnabled(False)
+        self.query_executor.submit(queries.fetch_sale_details, sale_id,
+                                   on_result=lambda sale: self.on_sale_details_loaded(sale_id, sale),
+                                   on_error=self.on_sale_details_failed)
+        
+    def on_sale_details_loaded(self, sale_id, sale):
+        """Satış təfərrüatları yükləndi"""
+        self.sales_list.setEnabled(True)
+        if not sale:
+            QMessageBox.warning(self, "Xəta", "Satış tapılmadı")
+            return
+        self.sale_details_cache.put(sale_id, sale)
+        self.display_sale_details_dialog(sale)
+        
+    def on_sale_details_failed(self, message):
+        """Satış təfərrüatları yüklənmədikdə"""
+        self.sales_list.setEnabled(True)
+        QMessageBox.warning(self, "Xəta", f"Satış təfərrüatları yüklənmədi: {message}")
     
     def display_sale_details_dialog(self, sale):
         """Satış təfərrüatları dialoqunu göstər"""
@@ -405,12 +472,12 @@ class PharmacyDashboard(QMainWindow):
         # Məlumat sahəsi
         info_text = f"""
 <b>Pasiyent:</b> {sale['patient_name']}<br>
-<b>Tarix:</b> {sale['created_at'].strftime('%d.%m.%Y %H:%M')}<br>
+<b>Tarix:</b> {sale['dispensed_at'].strftime('%d.%m.%Y %H:%M')}<br>
 <b>Yekun məbləğ:</b> {sale['total_price']:.2f} ₼<br>
 <b>Komisyon:</b> {sale['commission_amount']:.2f} ₼<br>
-<b>Diaqnoz:</b> {sale.get('diagnosis', 'Göstərilməyib')}<br>
-<b>Təlimatlar:</b> {sale.get('instructions', 'Göstərilməyib')}<br>
-<b>Dərmanlar:</b> {sale.get('medications', 'Məlumat yoxdur')}
+<b>Diaqnoz:</b> {sale.get('diagnosis') or 'Göstərilməyib'}<br>
+<b>Şikayət:</b> {sale.get('complaint') or 'Göstərilməyib'}<br>
+<b>Dərmanlar:</b> {sale.get('medications') or 'Məlumat yoxdur'}
         """
         
         info_label = QLabel(info_text)
@@ -439,148 +506,159 @@ class PharmacyDashboard(QMainWindow):
         dialog.exec_()
     
     def export_to_excel(self):
-        """Satış məlumatlarını Excel-ə export et"""
-        try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, PatternFill, Alignment
-            from datetime import datetime
-            import os
-            
-            if not self.db.connect():
-                QMessageBox.critical(self, "Xəta", "Verilənlər bazasına qoşulma xətası!")
-                return
-            
-            # Bu ayın satış məlumatlarını al
-            query = """
-                SELECT dl.dispensed_at, p.name as patient_name, dl.total_price, 
-                       dl.commission_amount, pr.diagnosis, pr.instructions
-                FROM dispensing_logs dl
-                JOIN patients p ON dl.patient_id = p.id
-                JOIN prescriptions pr ON dl.prescription_id = pr.id
-                WHERE dl.pharmacy_id = %s 
-                AND YEAR(dl.dispensed_at) = YEAR(CURDATE()) 
-                AND MONTH(dl.dispensed_at) = MONTH(CURDATE())
-                ORDER BY dl.dispensed_at DESC
-            """
-            
-            sales_data = self.db.execute_query(query, (self.user_data['pharmacy_id'],))
-            
-            # Excel faylı yarat
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Satış Hesabatı"
-            
-            # Başlıqlar
-            headers = ["Tarix", "Pasiyent", "Məbləğ (₼)", "Komisyon (₼)", "Diaqnoz", "Təlimatlar"]
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="00BCD4", end_color="00BCD4", fill_type="solid")
-                cell.alignment = Alignment(horizontal="center")
-            
-            # Məlumatları əlavə et
-            for row, sale in enumerate(sales_data, 2):
-                ws.cell(row=row, column=1, value=sale['dispensed_at'].strftime('%d.%m.%Y %H:%M'))
-                ws.cell(row=row, column=2, value=sale['patient_name'])
-                ws.cell(row=row, column=3, value=float(sale['total_price']))
-                ws.cell(row=row, column=4, value=float(sale['commission_amount']))
-                ws.cell(row=row, column=5, value=sale.get('diagnosis', ''))
-                ws.cell(row=row, column=6, value=sale.get('instructions', ''))
-            
-            # Fayl adı
-            filename = f"BioScript_Satış_Hesabatı_{datetime.now().strftime('%Y_%m_%d')}.xlsx"
-            filepath = os.path.join(os.path.expanduser("~"), filename)
-            
-            wb.save(filepath)
-            
-            QMessageBox.information(self, "Uğur", 
-                f"Excel faylı uğurla yaradıldı!\nYer: {filepath}\n\nYekun satış: {len(sales_data)} ədəd")
+        """Bu ayın satışlarını arxa fonda Excel-ə export et"""
+        if self.export_worker is not None:
+            return
             
-        except Exception as e:
-            QMessageBox.critical(self, "Xəta", f"Excel export xətası: {e}")
-        finally:
-            if hasattr(self, 'db'):
-                self.db.disconnect()
+        month_start, next_month = queries.month_range(date.today())
+        
+        # Fayl adı
+        filename = f"BioScript_Satış_Hesabatı_{datetime.now().strftime('%Y_%m_%d')}.xlsx"
+        filepath = os.path.join(os.path.expanduser("~"), filename)
+        
+        self.export_progress = QProgressDialog("Satışlar Excel-ə yazılır...", "İmtina", 0, 0, self)
+        self.export_progress.setWindowTitle("Excel Export")
+        self.export_progress.setWindowModality(Qt.WindowModal)
+        self.export_progress.setMinimumDuration(0)
+        self.export_progress.setAutoClose(False)
+        self.export_progress.setAutoReset(False)
+        
+        self.export_worker = ExcelExportWorker(self.user_data['pharmacy_id'],
+                                               month_start, next_month, filepath, self)
+        self.export_worker.progress.connect(self.on_export_progress)
+        self.export_worker.completed.connect(self.on_export_completed)
+        self.export_worker.failed.connect(self.on_export_failed)
+        self.export_worker.cancelled.connect(self.on_export_cancelled)
+        self.export_worker.finished.connect(self.on_export_finished)
+        self.export_progress.canceled.connect(self.export_worker.cancel)
+        
+        self.export_button.setEnabled(False)
+        self.export_worker.start()
+        
+    def on_export_progress(self, written, total):
+        """Export progress bar-ını yenilə"""
+        self.export_progress.setMaximum(max(total, 1))
+        self.export_progress.setValue(written)
+        self.export_progress.setLabelText(f"Satışlar Excel-ə yazılır... {written} / {total}")
+        
+    def on_export_completed(self, filepath, written):
+        """Export uğurla bitdi"""
+        self.export_progress.close()
+        QMessageBox.information(self, "Uğur", 
+            f"Excel faylı uğurla yaradıldı!\nYer: {filepath}\n\nYekun satış: {written} ədəd")
+        
+    def on_export_failed(self, message):
+        """Export xətası"""
+        self.export_progress.close()
+        QMessageBox.critical(self, "Xəta", f"Excel export xətası: {message}")
+        
+    def on_export_cancelled(self):
+        """İstifadəçi export-u dayandırdı"""
+        self.export_progress.close()
+        
+    def on_export_finished(self):
+        """Worker thread bitdi"""
+        self.export_worker.deleteLater()
+        self.export_worker = None
+        self.export_button.setEnabled(True)
         
     def load_dashboard_data(self):
-        """Dashboard məlumatlarını yüklə"""
-        if not self.db.connect():
-            return
-            
-        # Bu günkü satışları al
-        today = date.today()
-        daily_query = """
-            SELECT COUNT(*) as count, COALESCE(SUM(total_price), 0) as total
-            FROM dispensing_logs 
-            WHERE pharmacy_id = %s AND DATE(dispensed_at) = %s
-        """
-        daily_result = self.db.execute_query(daily_query, (self.user_data['pharmacy_id'], today))
+        """Dashboard məlumatlarını arxa fonda yüklə"""
+        self.refresh_stats()
+        self.refresh_recent_sales()
         
-        # Bu aylıq satışları al
-        month_query = """
-            SELECT COUNT(*) as count, COALESCE(SUM(total_price), 0) as total
-            FROM dispensing_logs 
-            WHERE pharmacy_id = %s AND YEAR(dispensed_at) = %s AND MONTH(dispensed_at) = %s
-        """
-        month_result = self.db.execute_query(month_query, 
-                                           (self.user_data['pharmacy_id'], today.year, today.month))
-        
-        # Son satışları al
-        recent_query = """
-            SELECT dl.*, p.name as patient_name 
-            FROM dispensing_logs dl
-            JOIN patients p ON dl.patient_id = p.id
-            WHERE dl.pharmacy_id = %s 
-            ORDER BY dl.dispensed_at DESC 
-            LIMIT 10
-        """
-        recent_sales = self.db.execute_query(recent_query, (self.user_data['pharmacy_id'],))
+    def refresh_dimensions(self):
+        """Soraq cədvəllərinin surətini arxa fonda yenilə"""
+        self.query_executor.submit(dimensions.refresh,
+                                   on_error=lambda message: print(f"Soraq məlumatları yenilənmədi: {message}"))
         
-        # UI-ni yenilə
-        self.update_dashboard_ui(daily_result, month_result, recent_sales)
+    def sweep_expired_prescriptions(self):
+        """Vaxtı keçmiş reseptləri arxa fonda süpür - bir dövrdə məhdud sayda paket"""
+        self.query_executor.submit(sweep_expired, batch_size=1000, max_batches=10,
+                                   on_error=lambda message: print(f"Resept süpürmə xətası: {message}"))
         
-        self.db.disconnect()
+    def auto_refresh(self):
+        """Yeni satış gəlibsə siyahını və statistikləri yenilə"""
+        self.refresh_recent_sales(with_stats=True)
         
     def refresh_stats(self):
-        """Statistikləri yenidən yüklə və kartları yenilə"""
-        if not self.db.connect():
-            return
-            
-        try:
-            # Bu günkü satış
-            today = date.today()
-            today_query = """
-                SELECT COUNT(*) as count, COALESCE(SUM(total_price), 0) as total
-                FROM dispensing_logs 
-                WHERE pharmacy_id = %s AND DATE(dispensed_at) = %s
-            """
-            today_result = self.db.execute_query(today_query, (self.user_data['pharmacy_id'], today))
-            today_sales = float(today_result[0]['total']) if today_result else 0.0
+        """Statistikləri arxa fonda yenidən yüklə"""
+        for card in (self.today_card, self.month_card, self.debt_card, self.count_card):
+            self.update_card_value(card, "...")
             
-            # Bu aylıq satış
-            month_query = """
-                SELECT COUNT(*) as count, COALESCE(SUM(total_price), 0) as total
-                FROM dispensing_logs 
-                WHERE pharmacy_id = %s AND YEAR(dispensed_at) = %s AND MONTH(dispensed_at) = %s
-            """
-            month_result = self.db.execute_query(month_query, 
-                                              (self.user_data['pharmacy_id'], today.year, today.month))
-            month_sales = float(month_result[0]['total']) if month_result else 0.0
-            month_count = month_result[0]['count'] if month_result else 0
+        self.query_executor.submit(queries.fetch_dashboard_stats,
+                                   self.user_data['pharmacy_id'],
+                                   on_result=self.on_stats_loaded,
+                                   on_error=self.on_stats_failed)
+        
+    def on_stats_loaded(self, stats):
+        """Statistika kartlarını yenilə"""
+        # BioScript borcu - bu ayın satışlarından yığılmış komisyon
+        self.update_card_value(self.today_card, f"{stats['today_total']:.2f} ₼")
+        self.update_card_value(self.month_card, f"{stats['month_total']:.2f} ₼")
+        self.update_card_value(self.debt_card, f"{stats['month_commission']:.2f} ₼")
+        self.update_card_value(self.count_card, str(stats['month_count']))
+        
+    def on_stats_failed(self, message):
+        """Statistika yüklənmədikdə"""
+        print(f"Stats refresh xətası: {message}")
+        for card in (self.today_card, self.month_card, self.debt_card, self.count_card):
+            self.update_card_value(card, "—")
             
-            # BioScript borcunu hesabla (3%)
-            bioscript_debt = month_sales * 0.03
+    def load_recent_sales(self):
+        """Son satışları arxa fonda tam yüklə"""
+        self.recent_sales_model.set_placeholder("⏳ Yüklənir...")
+        
+        self.recent_sales_task = self.query_executor.submit(
+            queries.fetch_recent_sales, self.user_data['pharmacy_id'], 10,
+            on_result=self.update_recent_sales,
+            on_error=self.on_recent_sales_failed)
+        
+    def refresh_recent_sales(self, with_stats=False):
+        """Yalnız son görülən satışdan sonrakı satışları yüklə"""
+        if self.recent_sales_task is not None:
+            # Əvvəlki sorğu hələ bitməyib - bitəndə yenidən yoxlanılsın
+            # (gedən sorğu bu arada yazılmış satışı görməmiş ola bilər)
+            self.pending_sales_refresh = bool(self.pending_sales_refresh) or with_stats
+            return
+        if self.last_sale_id is None:
+            self.load_recent_sales()
+            return
             
-            # Kartları yenilə
-            self.update_card_value(self.today_card, f"{today_sales:.2f} ₼")
-            self.update_card_value(self.month_card, f"{month_sales:.2f} ₼")
-            self.update_card_value(self.debt_card, f"{bioscript_debt:.2f} ₼")
-            self.update_card_value(self.count_card, str(month_count))
+        self.recent_sales_task = self.query_executor.submit(
+            queries.fetch_new_sales, self.user_data['pharmacy_id'], self.last_sale_id, 10,
+            on_result=lambda sales: self.on_new_sales_loaded(sales, with_stats),
+            on_error=self.on_new_sales_failed)
+        
+    def on_new_sales_loaded(self, sales, with_stats):
+        """Yeni satışları siyahının başına əlavə et"""
+        self.recent_sales_task = None
+        if sales:
+            self.recent_sales_model.prepend_sales(sales, keep=10)
+            self.last_sale_id = max(self.last_sale_id, self.recent_sales_model.last_id())
+            if with_stats:
+                self.refresh_stats()
+        self.run_pending_sales_refresh()
             
-        except Exception as e:
-            print(f"Stats refresh xətası: {e}")
-        finally:
-            self.db.disconnect()
+    def on_new_sales_failed(self, message):
+        """Yeniləmə alınmadıqda mövcud siyahı saxlanılır"""
+        self.recent_sales_task = None
+        print(f"Son satışlar yenilənmədi: {message}")
+        self.run_pending_sales_refresh()
+        
+    def run_pending_sales_refresh(self):
+        """Sorğu gedərkən istənmiş yeniləməni indi icra et"""
+        if self.pending_sales_refresh is None:
+            return
+        with_stats, self.pending_sales_refresh = self.pending_sales_refresh, None
+        self.refresh_recent_sales(with_stats)
+        
+    def on_recent_sales_failed(self, message):
+        """Son satışlar yüklənmədikdə"""
+        self.recent_sales_task = None
+        print(f"Son satışlar yüklənmədi: {message}")
+        self.recent_sales_model.set_placeholder("Satışlar yüklənə bilmədi")
+        self.run_pending_sales_refresh()
     
     def update_card_value(self, card, new_value):
         """Kartdakı dəyəri yenilə"""
@@ -590,32 +668,25 @@ class PharmacyDashboard(QMainWindow):
         value_label = text_layout.itemAt(1).widget()
         value_label.setText(new_value)
     
-    def update_dashboard_ui(self, daily_result, month_result, recent_sales):
-        """Dashboard UI-ni yenilə"""        
-        # Son satışları siyahıya əlavə et
-        self.sales_list.clear()
-        self.recent_sales_data = recent_sales if recent_sales else []
-        
-        if recent_sales:
-            for sale in recent_sales:
-                item_text = f"{sale['patient_name']} - {sale['total_price']:.2f} ₼ ({sale['dispensed_at'].strftime('%d.%m.%Y %H:%M')})"
-                item = QListWidgetItem(item_text)
-                self.sales_list.addItem(item)
-        else:
-            item = QListWidgetItem("Hələ ki satış əməliyyatı yoxdur")
-            item.setFlags(item.flags() & ~Qt.ItemIsSelectable)
-            self.sales_list.addItem(item)
-    
-    def on_sale_clicked(self, item):
-        """Satış elementinə kliklədikdə təfərrüatları göstər"""
-        if not item or item.flags() & Qt.ItemIsSelectable == 0:
-            return
+    def update_recent_sales(self, recent_sales):
+        """Son satışlar siyahısını yenilə"""
+        self.recent_sales_task = None
+        self.recent_sales_model.set_sales(recent_sales)
+        self.last_sale_id = self.recent_sales_model.last_id()
+        self.run_pending_sales_refresh()
             
-        # Seçilmiş satışın indeksini tap
-        row = self.sales_list.row(item)
-        if 0 <= row < len(self.recent_sales_data):
-            sale_data = self.recent_sales_data[row]
-            self.show_sale_details(sale_data)
+    def closeEvent(self, event):
+        """Bağlananda arxa fon sorğularını ləğv et"""
+        self.refresh_timer.stop()
+        self.dimensions_timer.stop()
+        self.expiry_timer.stop()
+        self.sync_worker.stop()
+        self.sync_worker.wait()
+        self.query_executor.cancel_all()
+        if self.export_worker is not None:
+            self.export_worker.cancel()
+            self.export_worker.wait()
+        super().closeEvent(event)
             
     def keyPressEvent(self, event):
         """ESC ilə çıxış"""
@@ -7,12 +7,17 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QPalette, QBrush, QLinearGradient, QColor
 from database.connection import DatabaseConnection
+from database import audit
+from database.passwords import authenticate
 from ui.pharmacy_dashboard import PharmacyDashboard
+from ui.query_worker import QueryExecutor
 
 class PharmacyLoginWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.db = DatabaseConnection()
+        self.query_executor = QueryExecutor(self)
+        self.login_task = None
         self.init_ui()
         
     def init_ui(self):
@@ -155,7 +160,7 @@ class PharmacyLoginWindow(QMainWindow):
         """)
         
         # Giriş düyməsi
-        login_button = QPushButton("GİRİŞ")
+        login_button = self.login_button = QPushButton("GİRİŞ")
         login_button.setFont(QFont("Segoe UI", 12, QFont.Bold))
         login_button.setFixedHeight(45)
         login_button.setStyleSheet("""
@@ -217,7 +222,9 @@ class PharmacyLoginWindow(QMainWindow):
         super().keyPressEvent(event)
         
     def login(self):
-        """Giriş prosedurunun aparılması"""
+        """Giriş prosedurunun aparılması - şifrə arxa fonda yoxlanılır (bcrypt yavaşdır)"""
+        if self.login_task is not None:
+            return  # əvvəlki yoxlama hələ bitməyib
         username = self.username_input.text().strip()
         password = self.password_input.text().strip()
         
@@ -225,24 +232,22 @@ class PharmacyLoginWindow(QMainWindow):
             QMessageBox.warning(self, "Xəta", "Bütün sahələri doldurun!")
             return
             
-        # Verilənlər bazasına qoşul
-        if not self.db.connect():
-            QMessageBox.critical(self, "Xəta", "Verilənlər bazasına qoşula bilmədi!")
-            return
-            
-        # Aptek personalını yoxla
-        query = """
-            SELECT ps.*, p.name as pharmacy_name, p.id as pharmacy_id,
-                   p.current_month_commission, p.commission_rate
-            FROM pharmacy_staff ps
-            JOIN pharmacies p ON ps.pharmacy_id = p.id
-            WHERE ps.username = %s AND ps.password = %s AND ps.is_active = 1
-        """
+        self.set_login_pending(True)
+        self.login_task = self.query_executor.submit(
+            authenticate, username, password,
+            on_result=lambda user_data: self.on_login_result(username, user_data),
+            on_error=self.on_login_error)
         
-        result = self.db.execute_query(query, (username, password))
+    def set_login_pending(self, pending):
+        self.login_button.setEnabled(not pending)
+        self.login_button.setText("YOXLANILIR..." if pending else "GİRİŞ")
         
-        if result and len(result) > 0:
-            user_data = result[0]
+    def on_login_result(self, username, user_data):
+        self.login_task = None
+        self.set_login_pending(False)
+        if user_data:
+            # Jurnal arxa fonda yazılır - girişi gecikdirmir
+            audit.log_login('PharmacyStaff', user_data['id'])
             
             # Uğurlu giriş - Dashboard-a get
             self.hide()
@@ -250,7 +255,12 @@ class PharmacyLoginWindow(QMainWindow):
             self.dashboard.show()
             
         else:
+            audit.log_action(username, 'login_failed', {'source': 'pharmacy_desktop'})
             QMessageBox.warning(self, "Giriş Xətası", 
                               "İstifadəçi adı və ya şifrə yanlışdır!")
                               
-        self.db.disconnect()
\ No newline at end of file
+    def on_login_error(self, message):
+        self.login_task = None
+        self.set_login_pending(False)
+        print(f"Giriş xətası: {message}")
+        QMessageBox.critical(self, "Xəta", "Verilənlər bazasına qoşula bilmədi!")
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+from database import queries
+from database.dimensions import dimensions
+
+
+class ActivePrescriptionsModel(QAbstractListModel):
+    """Aktiv reseptlər - səhifə-səhifə, sürüşdürdükcə yüklənir.
+
+    Axtarış mətni verildikdə model yalnız həmin pasiyentin(lərin) aktiv
+    reseptlərini göstərir. set_patient ilə isə tək pasiyentə dəqiq filtr
+    qoyulur (barmaq izi ilə tanınmış pasiyent) - axtarış mətni nəzərə alınmır.
+    """
+
+    loading_changed = pyqtSignal(bool)
+    offline_changed = pyqtSignal(bool)  # sətirlər yerli surətdən oxunur
+    load_failed = pyqtSignal(str)
+    rows_loaded = pyqtSignal(list)  # yeni gələn səhifənin sətirləri
+
+    def __init__(self, query_executor, page_size=50, local_store=None, parent=None):
+        super().__init__(parent)
+        self.query_executor = query_executor
+        self.local_store = local_store  # MySQL əlçatmaz olduqda oxunan surət
+        self.page_size = page_size
+        self._rows = []
+        self._exhausted = False
+        self._failed = False  # xətadan sonra avtomatik təkrar sorğu göndərilməsin
+        self._search = ""
+        self._patient_id = None  # dəqiq pasiyent filtri
+        self._task = None
+        self._cursor = None  # son oxunan sətrin (issued_at, id) - gizlədilən sətirlər də daxil
+        self._offline = False
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        prescription = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return self.format_prescription(prescription)
+        if role == Qt.UserRole:
+            return prescription
+        return None
+
+    @staticmethod
+    def format_prescription(prescription):
+        """Siyahı elementinin mətni (hər sətir eyni hündürlükdə)"""
+        item_text = f"📋 Resept #{prescription['id']} - {prescription['patient_name']}\n"
+        # Həkim və xəstəxana adları yaddaşdakı soraq surətindən
+        doctor = dimensions.doctor_name(prescription['doctor_id'])
+        hospital = dimensions.hospital_name(prescription['hospital_id'])
+        item_text += f"   👨‍⚕️ Dr. {doctor} ({hospital})\n"
+        item_text += f"   📅 {prescription['issued_at'].strftime('%d.%m.%Y %H:%M')}\n"
+        item_text += f"   🩺 Diaqnoz: {prescription['diagnosis'] or 'Göstərilməyib'}"
+        return item_text
+
+    def is_loading(self):
+        return self._task is not None
+
+    def is_offline(self):
+        return self._offline
+
+    def is_exhausted(self):
+        return self._exhausted
+
+    def search_text(self):
+        return self._search
+
+    def patient_id(self):
+        return self._patient_id
+
+    def set_patient(self, patient_id):
+        """Yalnız bu pasiyentin aktiv reseptlərini göstər (None - filtr yoxdur)"""
+        if patient_id == self._patient_id:
+            return
+        self._patient_id = patient_id
+        self.reload()
+
+    def set_search(self, text):
+        """Axtarış mətnini dəyiş - köhnə (artıq lazımsız) sorğu ləğv olunur"""
+        text = text.strip()
+        if text == self._search:
+            return
+        self._search = text
+        self.reload()
+
+    def reload(self):
+        """Siyahını sıfırla və ilk səhifəni yüklə"""
+        self.cancel()
+        self.beginResetModel()
+        self._rows = []
+        self._cursor = None
+        self._exhausted = False
+        self._failed = False
+        self._set_offline(False)
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def cancel(self):
+        """Gedən səhifə sorğusunu ləğv et"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self.loading_changed.emit(False)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self._exhausted and not self._failed and self._task is None
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Növbəti səhifəni arxa fonda sorğula"""
+        if not self.canFetchMore(parent):
+            return
+        if self._offline:
+            # Bu siyahı artıq yerli surətdən oxunur - hər səhifədə qoşulma gözlənilmir
+            self._load_local()
+            return
+
+        if self._patient_id is not None:
+            self._task = self.query_executor.submit(
+                queries.fetch_patient_active_prescriptions, self._patient_id, self.page_size,
+                on_result=self._on_search_loaded, on_error=self._on_page_failed)
+            self.loading_changed.emit(True)
+            return
+
+        if self._search:
+            # Axtarış nəticəsi bir neçə sətirdir - səhifələmə lazım deyil
+            self._task = self.query_executor.submit(
+                queries.search_active_prescriptions, self._search, self.page_size,
+                on_result=self._on_search_loaded, on_error=self._on_page_failed)
+            self.loading_changed.emit(True)
+            return
+
+        self._task = self.query_executor.submit(
+            queries.fetch_active_prescriptions_page, self._cursor, self.page_size,
+            on_result=self._on_page_loaded, on_error=self._on_page_failed)
+        self.loading_changed.emit(True)
+
+    def _on_search_loaded(self, rows):
+        self._exhausted = True
+        self._append_rows(self._without_queued(rows))
+
+    def _on_page_loaded(self, rows):
+        if len(rows) < self.page_size:
+            self._exhausted = True
+        if rows:
+            self._cursor = (rows[-1]['issued_at'], rows[-1]['id'])
+        self._append_rows(self._without_queued(rows))
+
+    def _without_queued(self, rows):
+        """Satışı bu terminalın növbəsində olan reseptlər MySQL-də hələ 'active'-dir -
+        göndərilənə qədər ikinci dəfə satılmasın"""
+        if self.local_store is None or not rows:
+            return rows
+        try:
+            queued = self.local_store.queued_prescription_ids()
+        except Exception as e:
+            print(f"Yerli satış növbəsi oxunmadı: {e}")
+            return rows
+        return [row for row in rows if row['id'] not in queued]
+
+    def _append_rows(self, rows):
+        self._task = None
+        if rows:
+            start = len(self._rows)
+            self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+            self.rows_loaded.emit(rows)
+        self.loading_changed.emit(False)
+
+    def _load_local(self):
+        """Növbəti səhifəni yerli surətdən oxu; surət yoxdursa False"""
+        if self.local_store is None or self.local_store.mirrored_at() is None:
+            return False
+
+        if self._patient_id is not None:
+            rows = self.local_store.patient_prescriptions(self._patient_id, self.page_size)
+            self._exhausted = True
+        elif self._search:
+            rows = self.local_store.search_prescriptions(self._search, self.page_size)
+            self._exhausted = True
+        else:
+            rows = self.local_store.prescriptions_page(self._cursor, self.page_size)
+            if len(rows) < self.page_size:
+                self._exhausted = True
+            if rows:
+                self._cursor = (rows[-1]['issued_at'], rows[-1]['id'])
+
+        dimensions.seed(self.local_store.dimension_names())
+        self._set_offline(True)
+        self._append_rows(rows)
+        return True
+
+    def _set_offline(self, offline):
+        if offline != self._offline:
+            self._offline = offline
+            self.offline_changed.emit(offline)
+
+    def _on_page_failed(self, message):
+        self._task = None
+        try:
+            if self._load_local():
+                return
+        except Exception as e:
+            print(f"Yerli surət oxunmadı: {e}")
+        self._failed = True
+        self.loading_changed.emit(False)
+        self.load_failed.emit(message)
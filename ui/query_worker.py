@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from database.connection import DatabaseConnection
+
+_thread_pool = None
+
+
+def query_thread_pool():
+    """Sorğular üçün ayrıca QThreadPool (ölçüsü bağlantı hovuzuna bərabər)"""
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = QThreadPool()
+        _thread_pool.setMaxThreadCount(int(os.getenv('DB_POOL_SIZE', '5')))
+    return _thread_pool
+
+
+class _QueryTaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class QueryTask(QRunnable):
+    """Arxa fon thread-ində icra olunan bir verilənlər bazası işi"""
+
+    def __init__(self, job, args, kwargs):
+        super().__init__()
+        self.job = job
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = _QueryTaskSignals()
+        self._cancelled = threading.Event()
+        self.offline = False  # bağlantı alınmadı - iş heç başlamadı
+
+    def cancel(self):
+        """Nəticəni ləğv et - callback-lər artıq çağırılmayacaq"""
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self):
+        """İşi öz bağlantısı ilə icra et"""
+        if self.is_cancelled():
+            return
+
+        # Hər iş hovuzdan öz bağlantısını götürür - GUI-nin db obyekti paylaşılmır
+        db = DatabaseConnection()
+        if not db.connect():
+            self.offline = True
+            self.signals.failed.emit("Verilənlər bazasına qoşula bilmədi!")
+            return
+
+        try:
+            result = self.job(db, *self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        finally:
+            db.disconnect()
+
+        if not self.is_cancelled():
+            self.signals.finished.emit(result)
+
+
+class QueryExecutor(QObject):
+    """GUI thread-ini bloklamadan sorğu icra edən xidmət"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tasks = set()
+
+    def submit(self, job, *args, on_result=None, on_error=None, on_offline=None, **kwargs):
+        """job(db, *args, **kwargs) funksiyasını arxa fonda işə sal.
+
+        Callback-lər GUI thread-ində çağırılır. on_offline verilərsə
+        bağlantı alınmadıqda on_error əvəzinə o çağırılır. Qaytarılan
+        QueryTask ilə iş ləğv edilə bilər.
+        """
+        task = QueryTask(job, args, kwargs)
+        self._tasks.add(task)
+
+        def deliver(result):
+            self._tasks.discard(task)
+            if not task.is_cancelled() and on_result:
+                on_result(result)
+
+        def fail(message):
+            self._tasks.discard(task)
+            if task.is_cancelled():
+                return
+            if task.offline and on_offline:
+                on_offline()
+            elif on_error:
+                on_error(message)
+            else:
+                print(f"Arxa fon sorğu xətası: {message}")
+
+        task.signals.finished.connect(deliver)
+        task.signals.failed.connect(fail)
+        query_thread_pool().start(task)
+        return task
+
+    def cancel_all(self):
+        """Gözləyən və işləyən bütün işləri ləğv et"""
+        for task in list(self._tasks):
+            task.cancel()
+        self._tasks.clear()
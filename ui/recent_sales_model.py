@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+class RecentSalesModel(QAbstractListModel):
+    """Son satışlar - dispensing_logs.id ilə saxlanılır.
+
+    Siyahı boşdursa və ya yüklənirsə seçilə bilməyən bir məlumat sətri
+    göstərilir.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._sales = []
+        self._placeholder = None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._sales) if self._sales else int(self._placeholder is not None)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if not self._sales:
+            return self._placeholder if role == Qt.DisplayRole else None
+
+        sale = self._sales[index.row()]
+        if role == Qt.DisplayRole:
+            return self.format_sale(sale)
+        if role == Qt.UserRole:
+            return sale['id']
+        return None
+
+    def flags(self, index):
+        if not self._sales:
+            return Qt.ItemIsEnabled
+        return super().flags(index)
+
+    @staticmethod
+    def format_sale(sale):
+        return f"{sale['patient_name']} - {sale['total_price']:.2f} ₼ ({sale['dispensed_at'].strftime('%d.%m.%Y %H:%M')})"
+
+    def sale(self, sale_id):
+        """ID üzrə yüklənmiş satış sətri"""
+        for sale in self._sales:
+            if sale['id'] == sale_id:
+                return sale
+        return None
+
+    def set_sales(self, sales, empty_text="Hələ ki satış əməliyyatı yoxdur"):
+        """Satışları dəyiş"""
+        self.beginResetModel()
+        self._sales = list(sales or [])
+        self._placeholder = empty_text
+        self.endResetModel()
+
+    def last_id(self):
+        """Yüklənmiş ən böyük dispensing_logs.id (satış yoxdursa 0)"""
+        return max((sale['id'] for sale in self._sales), default=0)
+
+    def prepend_sales(self, sales, keep=10):
+        """Yeni satışları başa əlavə et və siyahını keep sətrə qədər kəs"""
+        sales = list(sales or [])
+        if not sales:
+            return
+        if not self._sales:
+            self.set_sales(sales[:keep])
+            return
+
+        self.beginInsertRows(QModelIndex(), 0, len(sales) - 1)
+        self._sales[0:0] = sales
+        self.endInsertRows()
+
+        if len(self._sales) > keep:
+            self.beginRemoveRows(QModelIndex(), keep, len(self._sales) - 1)
+            del self._sales[keep:]
+            self.endRemoveRows()
+
+    def set_placeholder(self, text):
+        """Satışları təmizlə və yalnız məlumat sətri göstər"""
+        self.beginResetModel()
+        self._sales = []
+        self._placeholder = text
+        self.endResetModel()
@@ -2,22 +2,41 @@
 # -*- coding: utf-8 -*-
 
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
-                            QListWidget, QListWidgetItem, QWidget, QCheckBox,
+                            QListView, QWidget, QCheckBox,
                             QLineEdit, QMessageBox, QScrollArea, QFrame)
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont, QPalette, QBrush, QLinearGradient, QColor
+import uuid
 from datetime import datetime
+from ui.query_worker import QueryExecutor
+from ui.prescription_model import ActivePrescriptionsModel
+from database import queries
+from database.local_store import local_store
+from database.sale_sync import SALE_CONFLICT, SALE_QUEUED, record_sale
+from database import audit
 
 class SalesDialog(QDialog):
-    def __init__(self, user_data, db, parent=None):
+    def __init__(self, user_data, db, parent=None, patient_id=None):
         super().__init__(parent)
         self.user_data = user_data
         self.db = db
         self.selected_prescription = None
+        self.sale_key = None  # təkrar kliklərdə satış ikiqat yazılmasın
+        self.saving_sale = False
         self.medication_items = []
+        self.items_cache = {}         # resept_id -> dərmanlar (səhifə ilə birlikdə yüklənir)
+        self.pending_item_ids = set()  # dərmanları hazırda yüklənən reseptlər
         self.total_price = 0.0
+        self.query_executor = QueryExecutor(self)
         self.init_ui()
-        self.load_active_prescriptions()
+        if patient_id:
+            # Barmaq izi ilə tanınmış pasiyent - yalnız onun reseptləri, dəqiq filtr ilə
+            self.patient_label.setText(f"👆 Barmaq izi ilə tanınmış pasiyent: {patient_id}")
+            self.patient_label.show()
+            self.search_input.hide()
+            self.prescriptions_model.set_patient(patient_id)
+        else:
+            self.load_active_prescriptions()
         
     def init_ui(self):
         """Satış dialoqu UI-ni hazırla"""
@@ -44,29 +63,82 @@ class SalesDialog(QDialog):
         title_label.setStyleSheet("color: #00BCD4; padding: 10px;")
         title_label.setAlignment(Qt.AlignCenter)
         
-        # Resept siyahısı
-        self.prescriptions_list = QListWidget()
+        # Pasiyent axtarışı - FİN kodu, pasiyent ID-si və ya adın əvvəli
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("🔍 Pasiyent axtar: FİN kod, pasiyent ID və ya ad")
+        self.search_input.setFont(QFont("Segoe UI", 11))
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.setStyleSheet("""
+            QLineEdit {
+                padding: 10px;
+                border: 2px solid #E0E0E0;
+                border-radius: 8px;
+                background: white;
+            }
+            QLineEdit:focus {
+                border-color: #00BCD4;
+            }
+        """)
+        
+        # Barmaq izi ilə tanınmış pasiyent - dəyişdirilə bilməyən yazı
+        self.patient_label = QLabel()
+        self.patient_label.setFont(QFont("Segoe UI", 11, QFont.Bold))
+        self.patient_label.setStyleSheet("""
+            QLabel {
+                padding: 10px;
+                border: 2px solid #00BCD4;
+                border-radius: 8px;
+                background: #E0F7FA;
+                color: #00838F;
+            }
+        """)
+        self.patient_label.hide()
+        
+        # Hər hərfdə deyil, yazı dayandıqdan sonra sorğu göndər
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.apply_search)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_input.returnPressed.connect(self.apply_search)
+        
+        # Resept siyahısı - model səhifə-səhifə yüklənir, yalnız görünən sətirlər çəkilir
+        self.prescriptions_model = ActivePrescriptionsModel(self.query_executor,
+                                                             local_store=local_store(), parent=self)
+        self.prescriptions_model.loading_changed.connect(self.update_prescriptions_status)
+        self.prescriptions_model.load_failed.connect(self.on_prescriptions_failed)
+        self.prescriptions_model.rows_loaded.connect(self.prefetch_prescription_items)
+        
+        self.prescriptions_list = QListView()
+        self.prescriptions_list.setModel(self.prescriptions_model)
+        self.prescriptions_list.setUniformItemSizes(True)
         self.prescriptions_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 border: 2px solid #E0E0E0;
                 border-radius: 10px;
                 background: white;
                 font-size: 12pt;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 15px;
                 border-bottom: 1px solid #EEEEEE;
                 background: white;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background: #E3F2FD;
                 color: #1976D2;
             }
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background: #F5F5F5;
             }
         """)
-        self.prescriptions_list.itemClicked.connect(self.on_prescription_selected)
+        self.prescriptions_list.clicked.connect(self.on_prescription_selected)
+        
+        # Yüklənmə / boş siyahı vəziyyəti
+        self.prescriptions_status_label = QLabel()
+        self.prescriptions_status_label.setAlignment(Qt.AlignCenter)
+        self.prescriptions_status_label.setFont(QFont("Segoe UI", 10))
+        self.prescriptions_status_label.setStyleSheet("color: #666;")
         
         # Dərman siyahısı bölməsi (başlanğıcda gizli)
         self.medications_frame = QFrame()
@@ -123,10 +195,10 @@ class SalesDialog(QDialog):
         self.total_label.setFont(QFont("Segoe UI", 16, QFont.Bold))
         self.total_label.setStyleSheet("color: #2E7D32;")
         
-        sell_button = QPushButton("💰 SATIŞI TƏSDİQLƏ")
-        sell_button.setFixedSize(200, 50)
-        sell_button.setFont(QFont("Segoe UI", 12, QFont.Bold))
-        sell_button.setStyleSheet("""
+        self.sell_button = QPushButton("💰 SATIŞI TƏSDİQLƏ")
+        self.sell_button.setFixedSize(200, 50)
+        self.sell_button.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        self.sell_button.setStyleSheet("""
             QPushButton {
                 background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
                     stop:0 #4CAF50, stop:1 #388E3C);
@@ -139,11 +211,11 @@ class SalesDialog(QDialog):
                     stop:0 #66BB6A, stop:1 #4CAF50);
             }
         """)
-        sell_button.clicked.connect(self.complete_sale)
+        self.sell_button.clicked.connect(self.complete_sale)
         
         total_layout.addWidget(self.total_label)
         total_layout.addStretch()
-        total_layout.addWidget(sell_button)
+        total_layout.addWidget(self.sell_button)
         
         # Bağla düyməsi
         close_button = QPushButton("❌ Bağla")
@@ -162,7 +234,10 @@ class SalesDialog(QDialog):
         
         # Layout-a əlavə et
         main_layout.addWidget(title_label)
+        main_layout.addWidget(self.search_input)
+        main_layout.addWidget(self.patient_label)
         main_layout.addWidget(self.prescriptions_list, 1)
+        main_layout.addWidget(self.prescriptions_status_label)
         main_layout.addWidget(self.medications_frame)
         main_layout.addWidget(self.total_frame)
         
@@ -172,84 +247,136 @@ class SalesDialog(QDialog):
         main_layout.addLayout(button_layout)
         
     def load_active_prescriptions(self):
-        """Aktiv reseptləri yüklə"""
-        if not self.db.connect():
-            QMessageBox.critical(self, "Xəta", "Verilənlər bazasına qoşula bilmədi!")
-            return
-            
-        query = """
-            SELECT p.*, pat.name as patient_name, d.name as doctor_name, h.name as hospital_name
-            FROM prescriptions p
-            JOIN patients pat ON p.patient_id = pat.id  
-            JOIN doctors d ON p.doctor_id = d.id
-            JOIN hospitals h ON p.hospital_id = h.id
-            WHERE p.status = 'active'
-            ORDER BY p.issued_at DESC
-        """
-        
-        prescriptions = self.db.execute_query(query)
-        
-        self.prescriptions_list.clear()
-        
-        if prescriptions:
-            for prescription in prescriptions:
-                item_text = f"📋 Resept #{prescription['id']} - {prescription['patient_name']}\n"
-                item_text += f"   👨‍⚕️ Dr. {prescription['doctor_name']} ({prescription['hospital_name']})\n"
-                item_text += f"   📅 {prescription['issued_at'].strftime('%d.%m.%Y %H:%M')}"
-                
-                if prescription['diagnosis']:
-                    item_text += f"\n   🩺 Diaqnoz: {prescription['diagnosis']}"
-                
-                item = QListWidgetItem(item_text)
-                item.setData(Qt.UserRole, prescription)
-                self.prescriptions_list.addItem(item)
+        """Aktiv reseptlərin ilk səhifəsini arxa fonda yüklə"""
+        self.prescriptions_model.reload()
+        
+    def apply_search(self):
+        """Axtarış mətnini modelə ötür"""
+        self.search_timer.stop()
+        self.prescriptions_model.set_search(self.search_input.text())
+        
+    def update_prescriptions_status(self, loading):
+        """Siyahının altındakı vəziyyət yazısını yenilə"""
+        if loading:
+            self.prescriptions_status_label.setText("⏳ Aktiv reseptlər yüklənir...")
+        elif self.prescriptions_model.rowCount() == 0:
+            if self.prescriptions_model.search_text() or self.prescriptions_model.patient_id() is not None:
+                self.prescriptions_status_label.setText("Bu pasiyent üçün aktiv resept tapılmadı")
+            else:
+                self.prescriptions_status_label.setText("Aktiv resept tapılmadı")
+        elif self.prescriptions_model.is_offline():
+            self.prescriptions_status_label.setText("📴 Oflayn rejim - reseptlər yerli surətdən göstərilir")
         else:
-            item = QListWidgetItem("Aktiv resept tapılmadı")
-            item.setFlags(item.flags() & ~Qt.ItemIsSelectable)
-            self.prescriptions_list.addItem(item)
-            
-        self.db.disconnect()
+            self.prescriptions_status_label.setText("")
+        
+    def on_prescriptions_failed(self, message):
+        """Reseptlər yüklənmədikdə"""
+        print(f"Aktiv reseptlər yüklənmədi: {message}")
+        self.prescriptions_status_label.setText("Reseptlər yüklənə bilmədi")
+        QMessageBox.critical(self, "Xəta", "Verilənlər bazasına qoşula bilmədi!")
         
-    def on_prescription_selected(self, item):
+    def on_prescription_selected(self, index):
         """Resept seçildikdə"""
-        prescription_data = item.data(Qt.UserRole)
+        prescription_data = index.data(Qt.UserRole)
         if not prescription_data:
             return
             
         self.selected_prescription = prescription_data
+        # Yeni resept - yeni satış açarı
+        self.sale_key = str(uuid.uuid4())
         self.load_prescription_medications(prescription_data['id'])
         
+    def prefetch_prescription_items(self, prescriptions):
+        """Yeni yüklənmiş səhifənin bütün dərmanlarını bir sorğu ilə əvvəlcədən yüklə"""
+        ids = [p['id'] for p in prescriptions
+               if p['id'] not in self.items_cache and p['id'] not in self.pending_item_ids]
+        if not ids:
+            return
+        if self.prescriptions_model.is_offline():
+            self.load_local_items(ids)
+            return
+        self.pending_item_ids.update(ids)
+        self.query_executor.submit(queries.fetch_prescription_items, ids,
+                                   on_result=self.on_items_loaded,
+                                   on_error=lambda message: self.on_items_failed(ids, message))
+        
+    def on_items_loaded(self, items):
+        """Dərmanları keşə yaz; gözlənilən resept seçilibsə göstər"""
+        self.items_cache.update(items)
+        self.pending_item_ids.difference_update(items)
+        
+        if self.selected_prescription and self.selected_prescription['id'] in items:
+            if not self.medication_items:
+                self.show_medications(items[self.selected_prescription['id']])
+                
+    def load_local_items(self, ids):
+        """MySQL əlçatmaz olduqda dərmanları yerli surətdən oxu"""
+        try:
+            items = self.prescriptions_model.local_store.prescription_items(ids)
+        except Exception as e:
+            print(f"Yerli surət oxunmadı: {e}")
+            return False
+        self.on_items_loaded(items)
+        return True
+        
+    def on_items_failed(self, ids, message):
+        """Dərmanlar yüklənmədikdə - növbəti klikdə ayrıca sorğulanacaq"""
+        print(f"Resept dərmanları yüklənmədi: {message}")
+        self.pending_item_ids.difference_update(ids)
+        if self.prescriptions_model.is_offline() and self.load_local_items(ids):
+            return
+        if self.selected_prescription and self.selected_prescription['id'] in ids:
+            self.load_prescription_medications(self.selected_prescription['id'])
+        
     def load_prescription_medications(self, prescription_id):
-        """Reseptin dərmanlarını yüklə"""
-        if not self.db.connect():
+        """Reseptin dərmanlarını göstər (keşdə yoxdursa yüklə)"""
+        self.clear_medications()
+        
+        if prescription_id in self.items_cache:
+            self.show_medications(self.items_cache[prescription_id])
+            return
+        if prescription_id in self.pending_item_ids:
+            # Səhifə ilə birlikdə artıq yüklənir - cavab gələndə göstəriləcək
+            return
+        if self.prescriptions_model.is_offline():
+            self.load_local_items([prescription_id])
             return
             
-        query = """
-            SELECT * FROM prescription_items 
-            WHERE prescription_id = %s
-        """
-        
-        medications = self.db.execute_query(query, (prescription_id,))
+        self.pending_item_ids.add(prescription_id)
+        self.query_executor.submit(queries.fetch_prescription_items, [prescription_id],
+                                   on_result=self.on_items_loaded,
+                                   on_error=lambda message: self.on_prescription_items_failed(prescription_id, message))
+        
+    def on_prescription_items_failed(self, prescription_id, message):
+        """Tək reseptin dərmanları yüklənmədikdə"""
+        print(f"Resept dərmanları yüklənmədi: {message}")
+        self.pending_item_ids.discard(prescription_id)
+        if self.prescriptions_model.is_offline() and self.load_local_items([prescription_id]):
+            return
+        QMessageBox.warning(self, "Xəta", "Resept dərmanları yüklənə bilmədi!")
         
-        # Köhnə dərmanları təmizlə
+    def clear_medications(self):
+        """Göstərilən dərmanları təmizlə"""
         for i in reversed(range(self.medications_layout.count())):
             self.medications_layout.itemAt(i).widget().setParent(None)
             
         self.medication_items = []
+        self.update_total()
         
-        if medications:
-            for med in medications:
-                med_item = MedicationItem(med, self)
-                med_item.price_changed.connect(self.update_total)
-                self.medications_layout.addWidget(med_item)
-                self.medication_items.append(med_item)
+    def show_medications(self, medications):
+        """Seçilmiş reseptin dərmanlarını göstər"""
+        self.clear_medications()
+        
+        for med in medications:
+            med_item = MedicationItem(med, self)
+            med_item.price_changed.connect(self.update_total)
+            self.medications_layout.addWidget(med_item)
+            self.medication_items.append(med_item)
                 
         self.medications_frame.setVisible(True)
         self.total_frame.setVisible(True)
         self.update_total()
         
-        self.db.disconnect()
-        
     def update_total(self):
         """Yekun qiyməti yenilə"""
         self.total_price = 0.0
@@ -287,65 +414,77 @@ class SalesDialog(QDialog):
             QMessageBox.warning(self, "Xəta", "Yekun qiymət sıfırdan böyük olmalıdır!")
             return
             
-        # Satışı bazaya yaz
-        if self.save_sale():
-            QMessageBox.information(self, "Uğur", f"Satış uğurla tamamlandı!\nYekun: {self.total_price:.2f} ₼")
-            # Dashboard-ı yenilə
-            if hasattr(self.parent(), 'refresh_stats'):
-                self.parent().refresh_stats()
-            self.accept()
-        else:
-            QMessageBox.critical(self, "Xəta", "Satış yadda saxlanarkən xəta yarandı!")
-            
-    def save_sale(self):
-        """Satışı verilənlər bazasına yaz"""
-        if not self.db.connect():
-            return False
+        # Satışı bazaya yaz (təsdiq gözlənilərkən ikinci klik qəbul edilmir)
+        self.sell_button.setEnabled(False)
+        self.saving_sale = True
+        sale = self.build_sale()
+        self.query_executor.submit(record_sale, local_store(), sale,
+                                   on_result=lambda status: self.on_sale_recorded(sale, status),
+                                   on_error=self.on_sale_failed,
+                                   on_offline=lambda: self.queue_sale(sale))
             
+    def build_sale(self):
+        """Satış sətri - təkrar cəhd eyni client_sale_key ilə gedir, satış ikiqat yazılmır"""
+        # Komisyon məbləği hesabla (3%)
+        commission_rate = float(self.user_data.get('commission_rate', 3.0))
+        commission = float(self.total_price) * (commission_rate / 100.0)
+        return {
+            'client_sale_key': self.sale_key,
+            'prescription_id': self.selected_prescription['id'],
+            'pharmacy_id': self.user_data['pharmacy_id'],
+            'staff_id': self.user_data['id'],
+            'patient_id': self.selected_prescription['patient_id'],
+            'total_price': round(float(self.total_price), 2),
+            'commission_amount': round(commission, 2),
+            'dispensed_at': datetime.now().replace(microsecond=0),
+        }
+        
+    def queue_sale(self, sale):
+        """Server əlçatmazdır - satış yerli növbəyə, bağlantı bərpa olunanda göndərilir"""
         try:
-            # Komisyon məbləği hesabla (3%)
-            commission_rate = float(self.user_data.get('commission_rate', 3.0))
-            commission = float(self.total_price) * (commission_rate / 100.0)
-            
-            # dispensing_logs cədvəlinə əlavə et
-            insert_query = """
-                INSERT INTO dispensing_logs 
-                (prescription_id, pharmacy_id, staff_id, patient_id, total_price, commission_amount)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            
-            self.db.execute_insert(insert_query, (
-                self.selected_prescription['id'],
-                self.user_data['pharmacy_id'],
-                self.user_data['id'],
-                self.selected_prescription['patient_id'],
-                float(self.total_price),
-                float(commission)
-            ))
-            
-            # Reseptin statusunu yenilə
-            status_query = """
-                UPDATE prescriptions 
-                SET status = 'partially_dispensed'
-                WHERE id = %s
-            """
-            self.db.execute_query(status_query, (self.selected_prescription['id'],))
-            
-            # Aptekin komisyon məbləğini yenilə  
-            commission_query = """
-                UPDATE pharmacies 
-                SET current_month_commission = current_month_commission + %s
-                WHERE id = %s
-            """
-            self.db.execute_query(commission_query, (float(commission), self.user_data['pharmacy_id']))
-            
-            return True
-            
+            local_store().enqueue_sale(sale)
         except Exception as e:
-            print(f"Satış saxlanarkən xəta: {e}")
-            return False
-        finally:
-            self.db.disconnect()
+            print(f"Satış növbəyə yazılmadı: {e}")
+            self.on_sale_failed(str(e))
+            return
+        self.on_sale_recorded(sale, SALE_QUEUED)
+        
+    def on_sale_recorded(self, sale, status):
+        """Server satışı qəbul etdi, rədd etdi və ya satış növbəyə yazıldı"""
+        self.saving_sale = False
+        self.sell_button.setEnabled(True)
+        if status == SALE_CONFLICT:
+            QMessageBox.critical(self, "Satış qeydə alınmadı",
+                                 f"Resept #{sale['prescription_id']} artıq başqa terminalda satılıb "
+                                 "və ya aktiv deyil. Dərmanları verməyin!")
+            self.selected_prescription = None
+            self.medications_frame.setVisible(False)
+            self.total_frame.setVisible(False)
+            self.prescriptions_model.reload()
+            return
+        
+        audit.log_action(self.user_data.get('username'), 'sale', sale)
+        if status == SALE_QUEUED:
+            QMessageBox.information(self, "Oflayn satış",
+                                    f"Server əlçatmazdır - satış yerli yadda saxlanıldı və əlaqə "
+                                    f"bərpa olunanda göndəriləcək.\nYekun: {self.total_price:.2f} ₼")
+        else:
+            QMessageBox.information(self, "Uğur", f"Satış uğurla tamamlandı!\nYekun: {self.total_price:.2f} ₼")
+        # Dashboard qəbul edilmiş dialoqdan sonra özü yenilənir
+        self.accept()
+        
+    def on_sale_failed(self, message):
+        self.saving_sale = False
+        self.sell_button.setEnabled(True)
+        print(f"Satış saxlanarkən xəta: {message}")
+        QMessageBox.critical(self, "Xəta", "Satış yadda saxlanarkən xəta yarandı!")
+            
+    def done(self, result):
+        """Dialoq bağlananda arxa fon sorğularını ləğv et"""
+        if self.saving_sale and result != QDialog.Accepted:
+            return  # satışın nəticəsi gözlənilir - əczaçı onu görməlidir
+        self.query_executor.cancel_all()
+        super().done(result)
 
 
 class MedicationItem(QWidget):
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+import time
+
+import pymysql
+from PyQt5.QtCore import QThread, pyqtSignal
+from database.connection import DatabaseConnection
+from database.sale_sync import sync_pending, refresh_mirror
+
+
+class SaleSyncWorker(QThread):
+    """Yerli satış növbəsini MySQL-ə ötürən və yerli surəti yeniləyən thread"""
+
+    synced = pyqtSignal(int)            # MySQL-ə yeni yazılan satış sayı
+    pending_changed = pyqtSignal(int)   # növbədə qalan satış sayı
+    online_changed = pyqtSignal(bool)
+    mirror_refreshed = pyqtSignal(int)  # yerli surətdəki resept sayı
+    conflicted = pyqtSignal(list)       # resepti başqa terminalda satılmış satışlar
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.interval = float(os.getenv('SALE_SYNC_INTERVAL', '5'))
+        self.mirror_interval = float(os.getenv('LOCAL_MIRROR_INTERVAL', '900'))
+        self.batch_size = int(os.getenv('SALE_SYNC_BATCH_SIZE', '200'))
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._online = None
+        self._next_mirror = 0.0
+
+    def nudge(self):
+        """Növbəni gözləmədən indi göndər (yeni satışdan sonra)"""
+        self._wake.set()
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                print(f"Sinxronizasiya xətası: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def sync_once(self):
+        """Növbəni boşalt, vaxtı çatıbsa yerli surəti yenilə"""
+        pending = self.store.pending_count()
+        mirror_due = time.monotonic() >= self._next_mirror
+        if not pending and not mirror_due:
+            return  # boş dövrdə MySQL-ə müraciət yoxdur
+
+        db = DatabaseConnection()
+        if not db.connect():
+            self._set_online(False)
+            self.pending_changed.emit(pending)
+            return
+
+        try:
+            written = 0
+            while not self._stopping.is_set():
+                new, taken = sync_pending(db, self.store, self.batch_size)
+                written += new
+                # Tam olmayan paket növbənin bitdiyini göstərir; heç nə yazılmayıbsa
+                # qalanlar rədd edilmiş satışlardır - növbəti dövrdə yenidən cəhd olunur
+                if taken < self.batch_size or new == 0:
+                    break
+            if written:
+                self.synced.emit(written)
+            conflicts = self.store.take_conflicts()
+            if conflicts:
+                self.conflicted.emit(conflicts)
+
+            if mirror_due:
+                # Uğursuz yeniləmə ağır sorğunu hər dövrdə təkrarlamasın
+                self._next_mirror = time.monotonic() + min(60.0, self.mirror_interval)
+                count = refresh_mirror(db, self.store)
+                self._next_mirror = time.monotonic() + self.mirror_interval
+                self.mirror_refreshed.emit(count)
+            self._set_online(True)
+        except pymysql.err.OperationalError as e:
+            print(f"MySQL əlçatmazdır, satışlar növbədə qalır: {e}")
+            self._set_online(False)
+        finally:
+            db.disconnect()
+            self.pending_changed.emit(self.store.pending_count())
+
+    def _set_online(self, online):
+        if online != self._online:
+            self._online = online
+            self.online_changed.emit(online)